@@ -99,7 +99,8 @@ class ChatAgent:
         system_prompt = SystemMessage(content="""You are a highly capable AI Personal Assistant.
 You have access to a variety of tools:
 - Google Calendar (calendar_tool): Use this for 'list', 'create', 'update', and 'delete' actions on the user's Google Calendar. This is the preferred way to manage meetings.
-- Local Scheduler (schedule_meeting, list_meetings, delete_meeting): Use these for local JSON-based meeting management (secondary).
+- Local Scheduler (schedule_meeting, list_meetings, delete_meeting, reschedule_meeting): Use these for local JSON-based meeting management (secondary).
+- Free time (find_free_slots): Use this when asked when the user is free; it checks both calendars.
 - Email (send_email_tool): Use this to send emails.
 - Memory: You automatically remember past context.
 
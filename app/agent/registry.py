@@ -2,7 +2,7 @@ from typing import List
 from langchain.tools import BaseTool
 
 # Import tools
-from app.agent.scheduler_tools import schedule_meeting, list_meetings, delete_meeting
+from app.agent.scheduler_tools import schedule_meeting, list_meetings, delete_meeting, reschedule_meeting, find_free_slots
 from app.agent.email_tools import send_email_tool
 from app.tools.calendar_tool import calendar_tool
 
@@ -11,6 +11,8 @@ ALL_TOOLS = [
     schedule_meeting,
     list_meetings,
     delete_meeting,
+    reschedule_meeting,
+    find_free_slots,
     send_email_tool,
     calendar_tool
 ]
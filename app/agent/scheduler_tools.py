@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from langchain.tools import tool
 from app.scheduler import meeting_scheduler
+from app.services.free_slots import free_slots_between, format_slots, upcoming_window_start
 from app.services.whatsapp_service import whatsapp_service
 
 @tool
@@ -8,9 +9,10 @@ def schedule_meeting(text: str) -> str:
     """
     Schedules a meeting. Input text should clarify title, date, time, and duration.
     Expected format in text for simplicity (or extracted by agent before calling):
-    "YYYY-MM-DD HH:MM|Title|Duration"
+    "YYYY-MM-DD HH:MM|Title|Duration|Recurrence(opt)"
     
     Example: "2023-10-27 15:00|Projects Sync|30"
+    Recurring example (RRULE): "2023-10-30 09:00|Standup|15|FREQ=WEEKLY;BYDAY=MO,WE,FR"
     
     If the agent cannot determine exact date/time, it should ask the user first.
     """
@@ -24,9 +26,10 @@ def schedule_meeting(text: str) -> str:
         
         start_str = parts[0].strip()
         title = parts[1].strip()
-        duration = int(parts[2].strip()) if len(parts) > 2 else 30
+        duration = int(parts[2].strip()) if len(parts) > 2 and parts[2].strip() else 30
+        rrule = parts[3].strip() if len(parts) > 3 and parts[3].strip() else None
         
-        res = meeting_scheduler.add_meeting(title, start_str, duration)
+        res = meeting_scheduler.add_meeting(title, start_str, duration, rrule=rrule)
         
         if res.startswith("✅"):
             whatsapp_service.send_message(f"📅 Meeting Scheduled: {title}\nTime: {start_str}\nDuration: {duration} mins")
@@ -42,14 +45,75 @@ def list_meetings() -> str:
     """
     return meeting_scheduler.list_meetings()
 
+@tool
+def find_free_slots(text: str) -> str:
+    """
+    Finds free time across the local scheduler and Google Calendar, within working hours.
+    Use this for questions like "when am I free this week" instead of listing meetings.
+    Input format: "YYYY-MM-DD|YYYY-MM-DD|Duration(opt)" (first day, last day inclusive, minutes)
+
+    Example: "2023-10-23|2023-10-27|60"
+    """
+    try:
+        parts = text.split('|')
+        first_day = datetime.strptime(parts[0].strip(), "%Y-%m-%d")
+        last_day = datetime.strptime(parts[1].strip(), "%Y-%m-%d") if len(parts) > 1 and parts[1].strip() else first_day
+        duration = int(parts[2].strip()) if len(parts) > 2 and parts[2].strip() else 30
+
+        window_start = upcoming_window_start(first_day)
+        slots = free_slots_between(window_start, last_day + timedelta(days=1), duration)
+        return format_slots(slots, duration)
+    except ValueError:
+        return "❌ Please provide details in format: 'YYYY-MM-DD|YYYY-MM-DD|Duration(opt)'"
+    except Exception as e:
+        return f"❌ Error finding free slots: {e}"
+
 @tool
 def delete_meeting(index_str: str) -> str:
     """
     Deletes a meeting by its index number (retrieved from list_meetings).
     Input should be a simple integer string, e.g., "1".
+    Recurring meetings use their R-number: "R3" deletes the whole series,
+    "R3@2023-11-06 09:00" cancels just that occurrence.
     """
     try:
-        index = int(index_str.strip())
+        ref = index_str.strip()
+        if ref.upper().startswith("R"):
+            series_ref, _, occurrence = ref[1:].partition("@")
+            if occurrence:
+                return meeting_scheduler.cancel_occurrence(int(series_ref), occurrence.strip())
+            return meeting_scheduler.delete_series(int(series_ref))
+        index = int(ref)
         return meeting_scheduler.delete_meeting(index)
     except ValueError:
-        return "❌ Invalid index format. Please provide an integer."
+        return "❌ Invalid index format. Please provide an integer (or R<number> for recurring meetings)."
+
+@tool
+def reschedule_meeting(text: str) -> str:
+    """
+    Moves a meeting to a new time (optionally with a new duration).
+    Input format: "Ref|YYYY-MM-DD HH:MM|Duration(opt)"
+    Ref is the index from list_meetings, or for one occurrence of a recurring
+    meeting its R-number and current start: "R3@2023-11-06 09:00".
+    The rest of the series stays where it is.
+
+    Example: "2|2023-10-27 16:00" or "R3@2023-11-06 09:00|2023-11-06 11:00|45"
+    """
+    try:
+        parts = text.split('|')
+        if len(parts) < 2:
+            return "❌ Please provide details in format: 'Ref|YYYY-MM-DD HH:MM|Duration(opt)'"
+        ref = parts[0].strip()
+        new_start = parts[1].strip()
+        duration = int(parts[2].strip()) if len(parts) > 2 and parts[2].strip() else None
+
+        if ref.upper().startswith("R"):
+            series_ref, _, occurrence = ref[1:].partition("@")
+            if not occurrence:
+                return "❌ Give the occurrence to move, e.g. 'R3@2023-11-06 09:00'. Whole series cannot be moved."
+            return meeting_scheduler.reschedule_occurrence(int(series_ref), occurrence.strip(), new_start, duration)
+        return meeting_scheduler.update_meeting(int(ref), start_time_str=new_start, duration_minutes=duration)
+    except ValueError:
+        return "❌ Invalid reference. Use the meeting index, or R<number>@YYYY-MM-DD HH:MM for one occurrence."
+    except Exception as e:
+        return f"❌ Error rescheduling meeting: {e}"
@@ -1,13 +1,25 @@
+import io
 import logging
 import os
+import shutil
+from itertools import chain
+from datetime import datetime, timedelta
+from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.api.schemas import ChatRequest, ChatResponse, EmailRequest, HealthResponse
+from app.api.schemas import ChatRequest, ChatResponse, EmailRequest, HealthResponse, IngestionJobResponse
 from app.agent.chat_agent import ChatAgent
 from app.scheduler import meeting_scheduler
+from app.services.free_slots import free_slots_between, format_slots, upcoming_window_start
+from app.services.ics import iter_calendar, iter_events
+from app.services.meeting import parse_local
 from app.agent.email_service import email_service
+from app.services.ingestion_service import ingestion_service
+from app.rag.loaders import SUPPORTED_EXTENSIONS
+from app.rag.collection_names import resolve_name
 
 
 # --------------------------------------------------
@@ -44,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # read by the sidebar to revalidate /meetings
 )
 
 
@@ -79,22 +92,137 @@ async def chat_endpoint(request: ChatRequest):
 # --------------------------------------------------
 # Get Meetings
 # --------------------------------------------------
+def _parse_range_bound(value: str, is_end: bool) -> float:
+    """"YYYY-MM-DD HH:MM" or "YYYY-MM-DD" (a date-only end covers that whole day) to epoch seconds."""
+    value = value.strip()
+    if len(value) == 10:
+        day = parse_local(f"{value} 00:00")
+        return (day + timedelta(days=1)).timestamp() if is_end else day.timestamp()
+    return parse_local(value).timestamp()
+
+
+def _encode_cursor(position) -> Optional[str]:
+    return f"{position[0]!r}_{position[1]}" if position else None
+
+
+def _decode_cursor(cursor: str):
+    start_ts, meeting_id = cursor.split("_")
+    return float(start_ts), int(meeting_id)
+
+
 @app.get("/meetings")
-async def get_meetings():
+async def get_meetings(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    formatted: bool = True,
+):
     """
-    Returns scheduled meetings.
+    Returns scheduled meetings, optionally overlapping a date range and paged
+    with limit/cursor (pass back `next_cursor`). `formatted=false` skips the
+    text listing. Responses carry an ETag of the meeting state; a request
+    whose If-None-Match still matches gets 304 Not Modified. Listings that
+    show each series' next occurrence (no range, or formatted text) also
+    change when the clock passes an occurrence, so their ETag includes the
+    soonest one.
     """
+    shows_next = formatted or (start is None and end is None)
+    qualifiers = ["text" if formatted else "data", meeting_scheduler.occurrence_boundary() if shows_next else None]
+    etag = meeting_scheduler.etag_for(meeting_scheduler.version, *qualifiers)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
     try:
-        meetings_text = meeting_scheduler.list_meetings()
-        return {
-            "meetings": meeting_scheduler.meetings,
-            "formatted_text": meetings_text
+        start_ts = _parse_range_bound(start, is_end=False) if start else None
+        end_ts = _parse_range_bound(end, is_end=True) if end else None
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Use YYYY-MM-DD or 'YYYY-MM-DD HH:MM' dates and a cursor from next_cursor.")
+
+    try:
+        meetings, next_position, version = meeting_scheduler.page(start_ts, end_ts, after, limit)
+        body = {
+            "meetings": [m.to_dict() for m in meetings],
+            "next_cursor": _encode_cursor(next_position),
         }
+        if formatted:
+            body["formatted_text"] = meeting_scheduler.list_meetings()
+        return JSONResponse(body, headers={"ETag": meeting_scheduler.etag_for(version, *qualifiers), "Cache-Control": "no-cache"})
     except Exception as e:
         logger.error(f"Error serving meetings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# --------------------------------------------------
+# Free Slots
+# --------------------------------------------------
+@app.get("/meetings/free")
+def get_free_slots(start: str, end: Optional[str] = None, duration: int = 30, include_google: bool = True):
+    """
+    Free slots of at least `duration` minutes between two dates (YYYY-MM-DD,
+    end inclusive), within working hours, across local and Google calendars.
+    """
+    try:
+        first_day = datetime.strptime(start, "%Y-%m-%d")
+        last_day = datetime.strptime(end, "%Y-%m-%d") if end else first_day
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD.")
+    try:
+        # Like the agent tool, never offer slots that have already started.
+        window_start = upcoming_window_start(first_day)
+        slots = free_slots_between(window_start, last_day + timedelta(days=1), duration, include_google)
+        return {
+            "slots": [{"start": s.strftime("%Y-%m-%d %H:%M"), "end": e.strftime("%Y-%m-%d %H:%M")} for s, e in slots],
+            "formatted_text": format_slots(slots, duration),
+        }
+    except Exception as e:
+        logger.error(f"Error finding free slots: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --------------------------------------------------
+# ICS Import / Export
+# --------------------------------------------------
+@app.post("/meetings/import")
+def import_meetings(file: UploadFile = File(...), skip_conflicts: bool = True):
+    """
+    Imports the events of an .ics file. The upload is parsed line by line as
+    it is read, validated and conflict-checked in bulk, and stored in one
+    transaction. Conflicting or unreadable events are reported and skipped;
+    with skip_conflicts=false any of them rejects the whole file (409).
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", errors="replace", newline="")
+    try:
+        report = meeting_scheduler.import_meetings(iter_events(lines), skip_conflicts=skip_conflicts)
+    except Exception as e:
+        logger.error(f"Error importing meetings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        lines.detach()  # the upload closes its own file
+    if not skip_conflicts and (report["conflicts"] or report["errors"]):
+        return JSONResponse(report, status_code=409)
+    return report
+
+
+@app.get("/meetings/export")
+def export_meetings():
+    """
+    Streams all meetings and recurring series as an .ics file, written from
+    one snapshot of the meeting state.
+    """
+    state = meeting_scheduler.state
+    return StreamingResponse(
+        iter_calendar(chain(state.meetings, state.series.values())),
+        media_type="text/calendar; charset=utf-8",
+        headers={
+            "Content-Disposition": 'attachment; filename="meetings.ics"',
+            "ETag": meeting_scheduler.etag_for(state.version),
+        },
+    )
+
+
 # --------------------------------------------------
 # Send Email
 # --------------------------------------------------
@@ -120,6 +248,59 @@ async def send_email_endpoint(request: EmailRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# --------------------------------------------------
+# Document Ingestion
+# --------------------------------------------------
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@app.post("/documents", response_model=IngestionJobResponse, status_code=202)
+def upload_documents(files: List[UploadFile] = File(...), collection: Optional[str] = Form(None)):
+    """
+    Streams uploaded documents to disk and queues them for background ingestion
+    into a collection (the default one if not given). Returns immediately with
+    a job id; poll /documents/jobs/{id} for progress. A plain `def`, so the
+    blocking file copies run in the threadpool instead of the event loop.
+    """
+    try:
+        # "default" and an omitted collection are the same one, stored in the same folder.
+        collection = resolve_name(collection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    names = []
+    for upload in files:
+        name = os.path.basename(upload.filename or "")
+        if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {upload.filename}")
+        names.append(name)
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Duplicate file names in upload.")
+
+    job_id, staging = ingestion_service.new_job_dir()
+    try:
+        for upload, name in zip(files, names):
+            with open(os.path.join(staging, name), "wb") as out:
+                shutil.copyfileobj(upload.file, out, UPLOAD_CHUNK_BYTES)
+    except Exception as e:
+        logger.error(f"Error receiving upload: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    job = ingestion_service.submit(job_id, names, collection)
+    return job.to_dict()
+
+
+@app.get("/documents/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(job_id: str):
+    """
+    Reports the status of an ingestion job (chunks parsed and embedded so far).
+    """
+    job = ingestion_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
 # --------------------------------------------------
 # Static File Mounting (Catch-all)
 # --------------------------------------------------
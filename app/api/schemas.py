@@ -15,3 +15,19 @@ class EmailRequest(BaseModel):
 
 class HealthResponse(BaseModel):
     status: str
+
+class IngestionJobResponse(BaseModel):
+    id: str
+    status: str
+    files: List[str]
+    collection: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    files_total: int = 0
+    files_done: int = 0
+    files_failed: int = 0
+    chunks_parsed: int = 0
+    chunks_embedded: int = 0
+    chunks_deduplicated: int = 0
+    errors: List[str] = []
@@ -33,9 +33,57 @@ class Config:
     SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
     SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
     
+    # Timezone meeting times are entered and shown in
+    TIMEZONE = os.getenv("TIMEZONE", "Asia/Kolkata")
+
     # Reminder Settings
     REMINDER_OFFSET_MINUTES = int(os.getenv("REMINDER_OFFSET_MINUTES", "10"))
+    # How far ahead a new recurring series is conflict-checked
+    RECURRENCE_HORIZON_DAYS = int(os.getenv("RECURRENCE_HORIZON_DAYS", "90"))
+    # Span returned by GET /meetings when only a range start is given
+    MEETINGS_MAX_RANGE_DAYS = int(os.getenv("MEETINGS_MAX_RANGE_DAYS", "366"))
+    # Working hours for the free-slot finder
+    WORK_DAY_START = os.getenv("WORK_DAY_START", "09:00")
+    WORK_DAY_END = os.getenv("WORK_DAY_END", "18:00")
+    WORK_DAYS = tuple(int(d) for d in os.getenv("WORK_DAYS", "0,1,2,3,4").split(","))  # Monday = 0
     
+    # RAG / Ingestion Settings
+    RAG_INDEX_PATH = os.getenv("RAG_INDEX_PATH", "rag/faiss_index")  # the default collection
+    RAG_COLLECTIONS_DIR = os.getenv("RAG_COLLECTIONS_DIR", "rag/collections")
+    RAG_DEFAULT_COLLECTION = os.getenv("RAG_DEFAULT_COLLECTION", "default")
+    RAG_COLLECTIONS_MEMORY_MB = int(os.getenv("RAG_COLLECTIONS_MEMORY_MB", "1024"))  # LRU eviction cap
+    RAG_CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1000"))
+    RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+    RAG_INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", "0"))  # 0 = one per CPU core
+    RAG_EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    RAG_EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+    RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+    RAG_HYBRID_SEARCH = os.getenv("RAG_HYBRID_SEARCH", "true").lower() == "true"
+    RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+    RAG_QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "1024"))
+    RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1500"))
+    RAG_MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))  # 1.0 disables MMR
+    # Near-duplicate chunks (MinHash/LSH): off | drop | link (drop, but cite the duplicate's source)
+    RAG_DEDUP_MODE = os.getenv("RAG_DEDUP_MODE", "link").lower()
+    RAG_DEDUP_THRESHOLD = float(os.getenv("RAG_DEDUP_THRESHOLD", "0.9"))  # estimated Jaccard similarity
+    RAG_DEDUP_NUM_PERM = int(os.getenv("RAG_DEDUP_NUM_PERM", "128"))
+    RAG_DEDUP_SHINGLE_SIZE = int(os.getenv("RAG_DEDUP_SHINGLE_SIZE", "5"))  # words per shingle
+
+    # FAISS index layout: flat | ivf_flat | hnsw | ivf_pq
+    RAG_INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "flat").lower()
+    RAG_IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))  # 0 = auto (~4 * sqrt(n))
+    RAG_PQ_M = int(os.getenv("RAG_PQ_M", "48"))
+    RAG_PQ_NBITS = int(os.getenv("RAG_PQ_NBITS", "8"))
+    RAG_HNSW_M = int(os.getenv("RAG_HNSW_M", "32"))
+    RAG_HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "80"))
+    RAG_NPROBE = int(os.getenv("RAG_NPROBE", "16"))
+    RAG_EF_SEARCH = int(os.getenv("RAG_EF_SEARCH", "64"))
+    RAG_INDEX_TRAIN_SAMPLE = int(os.getenv("RAG_INDEX_TRAIN_SAMPLE", "100000"))
+    RAG_INDEX_MMAP = os.getenv("RAG_INDEX_MMAP", "true").lower() == "true"
+    # Each ingest writes a new immutable segment; segments are merged in the background.
+    RAG_MAX_SEGMENTS = int(os.getenv("RAG_MAX_SEGMENTS", "8"))
+    RAG_SEGMENT_MAX_DELETED = float(os.getenv("RAG_SEGMENT_MAX_DELETED", "0.3"))  # compact above this ratio
+
     # Google Calendar Cloud Support
     GOOGLE_CREDENTIALS_JSON = os.getenv("GOOGLE_CREDENTIALS_JSON")
     
@@ -43,6 +91,11 @@ class Config:
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATA_DIR = os.path.join(BASE_DIR, "data")
     MEETINGS_FILE = os.path.join(DATA_DIR, "meetings.json")
+    MEETINGS_DB = os.getenv("MEETINGS_DB", os.path.join(DATA_DIR, "meetings.db"))
+    SCHEDULER_JOBS_DB_URL = os.getenv("SCHEDULER_JOBS_DB_URL", f"sqlite:///{os.path.join(DATA_DIR, 'jobs.db')}")
+    EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(DATA_DIR, "embedding_cache"))
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(DATA_DIR, "uploads"))
+    PARSED_TEXT_CACHE_DIR = os.getenv("PARSED_TEXT_CACHE_DIR", os.path.join(DATA_DIR, "parsed_cache"))  # "" disables
 
     @classmethod
     def validate(cls):
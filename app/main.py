@@ -25,15 +25,10 @@ async def startup_event():
             meeting_scheduler.scheduler.start()
             logger.info("Background scheduler started.")
         
+        # Reminders are dispatched by their own thread, sleeping until the next one is due
+        meeting_scheduler.reminder_service.start()
+
         # Periodic jobs
-        if not meeting_scheduler.scheduler.get_job("check_meeting_reminders"):
-            meeting_scheduler.scheduler.add_job(
-                meeting_scheduler.reminder_service.check_reminders,
-                "interval",
-                minutes=1,
-                id="check_meeting_reminders"
-            )
-        
         if not meeting_scheduler.scheduler.get_job("cleanup_old_meetings"):
             meeting_scheduler.scheduler.add_job(
                 meeting_scheduler.cleanup_meetings,
@@ -49,6 +44,7 @@ async def startup_event():
 async def shutdown_event():
     """Graceful shutdown."""
     logger.info("Shutting down AI Personal Assistant...")
+    meeting_scheduler.reminder_service.stop()
     if meeting_scheduler.scheduler.running:
         meeting_scheduler.scheduler.shutdown()
         logger.info("Background scheduler shut down.")
@@ -0,0 +1,150 @@
+import os
+import re
+import math
+import heapq
+import pickle
+import logging
+from collections import Counter
+from typing import AbstractSet, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Identifiers such as "INV-2041", "2024-05-01" or "v1.2" are kept whole; their
+# alphanumeric parts are indexed as well so partial matches still score.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./:][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        parts = _PART_RE.findall(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 index over chunk texts, keyed by chunk id.
+
+    Postings are kept as term -> {chunk_id: term frequency}, so chunks can be
+    added and removed individually as documents are re-ingested.
+    """
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.doc_len
+
+    def add(self, chunk_id: str, text: str):
+        if chunk_id in self.doc_len:
+            self.remove(chunk_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[chunk_id] = tf
+        length = sum(counts.values())
+        self.doc_len[chunk_id] = length
+        self.doc_terms[chunk_id] = list(counts)
+        self.total_len += length
+
+    def remove(self, chunk_id: str):
+        if chunk_id not in self.doc_len:
+            return
+        for term in self.doc_terms.pop(chunk_id):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(chunk_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(chunk_id)
+
+    def memory_bytes(self) -> int:
+        """Rough size of the postings (about 100 bytes per term/chunk pair)."""
+        return 100 * sum(len(posting) for posting in self.postings.values())
+
+    def copy(self) -> "BM25Index":
+        clone = BM25Index(self.k1, self.b)
+        clone.postings = {term: dict(posting) for term, posting in self.postings.items()}
+        clone.doc_len = dict(self.doc_len)
+        clone.doc_terms = dict(self.doc_terms)
+        clone.total_len = self.total_len
+        return clone
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """Returns up to k (chunk_id, score) pairs, best first."""
+        return BM25View([(self, frozenset())], self.k1, self.b).search(query, k)
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        index = cls()
+        with open(path, "rb") as f:
+            index.__dict__.update(pickle.load(f))
+        logger.info(f"Loaded BM25 index with {len(index)} chunks from {path}")
+        return index
+
+
+class BM25View:
+    """
+    Read-only BM25 over several BM25Index parts, each paired with the chunk
+    ids deleted from it (one part per index segment). The parts are shared,
+    never copied, between index versions. Scores use corpus-wide statistics
+    (document count, average length, document frequency) over live chunks,
+    exactly as a single merged index would.
+    """
+    def __init__(self, parts: Sequence[Tuple[BM25Index, AbstractSet[str]]], k1: float = 1.5, b: float = 0.75):
+        self.parts = list(parts)
+        self.k1 = k1
+        self.b = b
+
+    def __len__(self) -> int:
+        return sum(len(index) - sum(1 for c in deleted if c in index) for index, deleted in self.parts)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return any(chunk_id in index and chunk_id not in deleted for index, deleted in self.parts)
+
+    def memory_bytes(self) -> int:
+        return sum(index.memory_bytes() for index, _ in self.parts)
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """Returns up to k (chunk_id, score) pairs, best first."""
+        n_docs = len(self)
+        if n_docs == 0:
+            return []
+        total_len = sum(
+            index.total_len - sum(index.doc_len.get(c, 0) for c in deleted)
+            for index, deleted in self.parts
+        )
+        avgdl = total_len / n_docs or 1.0
+
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            hits = [
+                (chunk_id, tf, index.doc_len[chunk_id])
+                for index, deleted in self.parts
+                for chunk_id, tf in index.postings.get(term, {}).items()
+                if chunk_id not in deleted
+            ]
+            if not hits:
+                continue
+            idf = math.log(1 + (n_docs - len(hits) + 0.5) / (len(hits) + 0.5))
+            for chunk_id, tf, length in hits:
+                norm = self.k1 * (1 - self.b + self.b * length / avgdl)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,207 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from app.config import Config
+from app.rag.collection_names import is_valid_name, resolve_name, validate_name
+from app.rag.rag_pipeline import RAGPipeline, create_embeddings, create_llm, generate_answer
+from app.rag.retrieval import reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+class CollectionManager:
+    """
+    Named knowledge bases (per user, per project, ...), each with its own index
+    directory and RAGPipeline.
+
+    Collections are opened lazily on first use and kept in an LRU; when the
+    estimated RAM of the open ones exceeds the cap, the least recently used
+    idle collections are closed (they reopen from disk on the next request).
+    Every query and ingest holds a lease on its collection for its whole
+    duration; a leased collection is never evicted, so a pipeline is not closed
+    under a caller and no second pipeline can open the same index meanwhile.
+    All collections share one embedding model/cache and one LLM client.
+    """
+    def __init__(self, root: str = Config.RAG_COLLECTIONS_DIR, memory_cap_mb: int = Config.RAG_COLLECTIONS_MEMORY_MB):
+        self.root = root
+        self.memory_cap = memory_cap_mb * 1024 * 1024
+        self._open: "OrderedDict[str, RAGPipeline]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._leases: Dict[str, int] = {}  # collection -> callers currently using it
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._embeddings = None
+        self._llm = None
+        self._query_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-collections")
+
+    validate_name = staticmethod(validate_name)  # see app.rag.collection_names
+
+    def index_path(self, name: str) -> str:
+        # The default collection keeps the original single-index location.
+        if name == Config.RAG_DEFAULT_COLLECTION:
+            return Config.RAG_INDEX_PATH
+        return os.path.join(self.root, name)
+
+    def list_collections(self) -> List[str]:
+        names = {Config.RAG_DEFAULT_COLLECTION}
+        if os.path.isdir(self.root):
+            names.update(n for n in os.listdir(self.root) if is_valid_name(n))
+        return sorted(names)
+
+    def loaded(self) -> Dict[str, int]:
+        """Open collections (least recently used first) and their estimated bytes."""
+        with self._lock:
+            return {name: self._sizes.get(name, 0) for name in self._open}
+
+    # ------------------------------------------------------------------
+    # Loading / eviction
+    # ------------------------------------------------------------------
+    @contextmanager
+    def lease(self, name: Optional[str] = None) -> Iterator[RAGPipeline]:
+        """The collection's pipeline (loaded from disk if needed), kept open until the block exits."""
+        name, pipeline = self._acquire(name)
+        try:
+            yield pipeline
+        finally:
+            with self._lock:
+                self._leases[name] -= 1
+                if not self._leases[name]:
+                    del self._leases[name]
+
+    def _take(self, name: str) -> Optional[RAGPipeline]:
+        """Open pipeline of a collection with one more lease on it. Caller holds _lock."""
+        pipeline = self._open.get(name)
+        if pipeline is not None:
+            self._open.move_to_end(name)
+            self._leases[name] = self._leases.get(name, 0) + 1
+        return pipeline
+
+    def _acquire(self, name: Optional[str]) -> Tuple[str, RAGPipeline]:
+        name = resolve_name(name)
+        with self._lock:
+            pipeline = self._take(name)
+            if pipeline is not None:
+                return name, pipeline
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        # Per-collection lock: concurrent first requests load the index once,
+        # without blocking requests for other collections.
+        with loading:
+            with self._lock:
+                pipeline = self._take(name)
+                if pipeline is not None:
+                    return name, pipeline
+                if self._embeddings is None:
+                    self._embeddings = create_embeddings()
+                    self._llm = create_llm()
+
+            pipeline = RAGPipeline(self.index_path(name), embeddings=self._embeddings, llm=self._llm)
+            logger.info(f"Opened RAG collection '{name}' ({len(pipeline.vector_store)} chunks).")
+
+            with self._lock:
+                self._open[name] = pipeline
+                self._leases[name] = self._leases.get(name, 0) + 1
+                self._sizes[name] = pipeline.memory_bytes()
+                self._evict(keep=name)
+            return name, pipeline
+
+    def refresh_size(self, name: str):
+        """Re-estimates a collection's memory after it changed, evicting others if over the cap."""
+        with self._lock:
+            pipeline = self._open.get(name)
+            if pipeline is not None:
+                self._sizes[name] = pipeline.memory_bytes()
+                self._evict(keep=name)
+
+    def _evict(self, keep: str):
+        """
+        Closes least recently used idle collections until under the memory cap.
+        Leased or busy collections are skipped, so nothing is closed while in use. Caller holds _lock.
+        """
+        total = sum(self._sizes.values())
+        for name in list(self._open):
+            if total <= self.memory_cap:
+                break
+            pipeline = self._open[name]
+            if name == keep or name in self._leases or pipeline.is_busy():
+                continue
+            del self._open[name]
+            total -= self._sizes.pop(name, 0)
+            threading.Thread(target=pipeline.close, name=f"rag-close-{name}", daemon=True).start()
+            logger.info(f"Evicted RAG collection '{name}' from memory.")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def ingest_documents(self, file_paths: List[str], collection: Optional[str] = None, progress=None):
+        name = collection or Config.RAG_DEFAULT_COLLECTION
+        # The lease keeps this pipeline the only writer of the index until the ingest is done.
+        with self.lease(name) as pipeline:
+            report = pipeline.ingest_documents(file_paths, progress=progress)
+            self.refresh_size(name)
+        return report
+
+    def _retrieve_one(self, name: str, query: str, k: int) -> List[Document]:
+        with self.lease(name) as pipeline:
+            return pipeline.retrieve(query, k=k)
+
+    def retrieve(self, query: str, collections: Optional[Sequence[str]] = None, k: int = Config.RAG_TOP_K) -> List[Document]:
+        """
+        Top-k chunks across one or several collections. Each collection is
+        searched in parallel and the per-collection rankings are merged with
+        Reciprocal Rank Fusion; every chunk is tagged with its `collection`.
+        """
+        names = list(collections or [Config.RAG_DEFAULT_COLLECTION])
+        if len(names) == 1:
+            return [self._tag(doc, names[0]) for doc in self._retrieve_one(names[0], query, k)]
+
+        futures = {name: self._query_pool.submit(self._retrieve_one, name, query, k) for name in names}
+        docs_by_key: Dict[str, Document] = {}
+        rankings = []
+        for name, future in futures.items():
+            try:
+                docs = future.result()
+            except Exception as e:
+                logger.error(f"Retrieval failed for collection '{name}': {e}")
+                continue
+            ranking = []
+            for doc in docs:
+                key = f"{name}:{doc.metadata.get('chunk_id')}"
+                docs_by_key[key] = self._tag(doc, name)
+                ranking.append(key)
+            rankings.append(ranking)
+
+        fused = reciprocal_rank_fusion(rankings, k=Config.RAG_RRF_K)
+        return [docs_by_key[key] for key, _ in fused[:k]]
+
+    @staticmethod
+    def _tag(doc: Document, collection: str) -> Document:
+        return Document(page_content=doc.page_content, metadata={**doc.metadata, "collection": collection})
+
+    def answer(self, query: str, collections: Optional[Sequence[str]] = None) -> str:
+        """Answers from the given collections (default collection if none)."""
+        names = list(collections or [Config.RAG_DEFAULT_COLLECTION])
+        if len(names) == 1:
+            with self.lease(names[0]) as pipeline:
+                return pipeline.answer_from_docs(query)
+
+        docs = self.retrieve(query, names, k=Config.RAG_TOP_K)
+        if not docs:
+            return "Knowledge base is empty. Please upload documents first."
+        if self._llm is None:
+            return "LLM not configured. Cannot generate answer."
+        try:
+            return generate_answer(self._llm, query, docs)
+        except Exception as e:
+            logger.error(f"Error in RAG pipeline: {e}")
+            return f"Error answering query: {e}"
+
+
+# Singleton instance
+collection_manager = CollectionManager()
@@ -0,0 +1,23 @@
+import re
+from typing import Optional
+
+from app.config import Config
+
+# Kept free of the RAG stack (FAISS, LangChain, NumPy): the API validates
+# names on every upload without loading it.
+_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_name(name: str) -> bool:
+    return bool(_NAME_RE.match(name or ""))
+
+
+def validate_name(name: str) -> str:
+    if not is_valid_name(name):
+        raise ValueError("Collection names may only contain letters, digits, '-' and '_' (max 64).")
+    return name
+
+
+def resolve_name(name: Optional[str]) -> str:
+    """The collection a request refers to: the default one when omitted. Raises ValueError."""
+    return validate_name(name or Config.RAG_DEFAULT_COLLECTION)
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Rough chars-per-token ratio for English text; Gemini has no local tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def overlap_length(left: str, right: str, max_overlap: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    for size in range(min(len(left), len(right), max_overlap), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def mmr_select(query_vector: Sequence[float], doc_vectors: np.ndarray, k: int, lambda_mult: float = 0.7) -> List[int]:
+    """
+    Maximal Marginal Relevance: greedily picks k rows that are relevant to the
+    query but not redundant with rows already picked. Returns row indices.
+    """
+    if len(doc_vectors) == 0:
+        return []
+    docs = doc_vectors / (np.linalg.norm(doc_vectors, axis=1, keepdims=True) + 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / (np.linalg.norm(query) + 1e-12)
+    relevance = docs @ query
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = docs @ docs[selected[0]]
+    while len(selected) < min(k, len(docs)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, docs @ docs[best])
+    return selected
+
+
+@dataclass
+class _Span:
+    source: Optional[str]
+    first: int
+    last: int
+    text: str
+    score: float
+    members: List[int] = field(default_factory=list)
+
+
+def pack_context(docs: List[Document], token_budget: int, max_overlap: int = 200) -> str:
+    """
+    Builds the prompt context from retrieved chunks (best first).
+
+    Adjacent chunks of the same source are merged in reading order with their
+    duplicated splitter overlap removed; the merged spans are ordered by their
+    best retrieval rank and added until the token budget is spent. The last
+    span that does not fit is cut at a sentence/line boundary.
+    """
+    if not docs:
+        return ""
+
+    # Best rank first -> higher score.
+    ranked = [(1.0 / (rank + 1), doc) for rank, doc in enumerate(docs)]
+
+    # Sort by (source, chunk_index) to find runs of consecutive chunks.
+    positioned = [(s, d) for s, d in ranked if d.metadata.get("chunk_index") is not None]
+    loose = [(s, d) for s, d in ranked if d.metadata.get("chunk_index") is None]
+    positioned.sort(key=lambda item: (str(item[1].metadata.get("source")), item[1].metadata["chunk_index"]))
+
+    spans: List[_Span] = []
+    for score, doc in positioned:
+        source = doc.metadata.get("source")
+        index = doc.metadata["chunk_index"]
+        prev = spans[-1] if spans else None
+        if prev and prev.source == source and index == prev.last:
+            prev.score = max(prev.score, score)  # same chunk retrieved twice
+        elif prev and prev.source == source and index == prev.last + 1:
+            cut = overlap_length(prev.text, doc.page_content, max_overlap)
+            prev.text = prev.text + doc.page_content[cut:] if cut else f"{prev.text}\n{doc.page_content}"
+            prev.last = index
+            prev.score = max(prev.score, score)
+        else:
+            spans.append(_Span(source, index, index, doc.page_content, score))
+    spans.extend(_Span(d.metadata.get("source"), -1, -1, d.page_content, s) for s, d in loose)
+
+    spans.sort(key=lambda span: span.score, reverse=True)
+
+    parts: List[str] = []
+    seen = set()
+    remaining = token_budget
+    for span in spans:
+        text = span.text.strip()
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        cost = estimate_tokens(text)
+        if cost <= remaining:
+            parts.append(text)
+            remaining -= cost
+            continue
+        # Partial fill: keep whole sentences/lines that fit, then stop.
+        limit = remaining * CHARS_PER_TOKEN
+        clipped = text[:limit]
+        boundary = max(clipped.rfind(". "), clipped.rfind("\n"))
+        if boundary > limit // 2:
+            parts.append(clipped[:boundary + 1].strip())
+        break
+
+    return "\n\n".join(parts)
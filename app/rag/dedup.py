@@ -0,0 +1,115 @@
+import re
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+DEDUP_MODES = ("off", "drop", "link")
+
+_WORD_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text: str, size: int = 5) -> Set[bytes]:
+    """Overlapping word n-grams of a text (case-folded, punctuation ignored)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words).encode("utf-8")} if words else set()
+    return {" ".join(words[i:i + size]).encode("utf-8") for i in range(len(words) - size + 1)}
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows <= num_perm whose LSH S-curve threshold
+    (1 / bands) ** (1 / rows) is closest to the requested Jaccard similarity.
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, vectorized with numpy."""
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+
+    def signature(self, text: str) -> np.ndarray:
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g, digest_size=4).digest(), "little") for g in grams),
+            dtype=np.uint64, count=len(grams),
+        )
+        # (a * h + b) mod p, truncated to 32 bits; uint64 wrap-around is intended.
+        with np.errstate(over="ignore"):
+            permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+def estimated_jaccard(left: np.ndarray, right: np.ndarray) -> float:
+    return float(np.count_nonzero(left == right)) / len(left)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures keyed by chunk id.
+
+    Signatures are split into bands; chunks sharing any band bucket become
+    candidates, and a candidate counts as a near-duplicate when the estimated
+    Jaccard similarity of the two signatures reaches the threshold.
+    """
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 5):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, chunk_id: str, text: str, signature: Optional[np.ndarray] = None):
+        if chunk_id in self.signatures:
+            self.remove(chunk_id)
+        signature = self.hasher.signature(text) if signature is None else signature
+        self.signatures[chunk_id] = signature
+        for band, key in self._band_keys(signature):
+            self.buckets[band].setdefault(key, set()).add(chunk_id)
+
+    def remove(self, chunk_id: str):
+        signature = self.signatures.pop(chunk_id, None)
+        if signature is None:
+            return
+        for band, key in self._band_keys(signature):
+            bucket = self.buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(chunk_id)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def find(self, signature: np.ndarray) -> Optional[str]:
+        """The most similar indexed chunk at or above the threshold, if any."""
+        candidates: Set[str] = set()
+        for band, key in self._band_keys(signature):
+            candidates |= self.buckets[band].get(key, set())
+        best, best_score = None, self.threshold
+        for chunk_id in candidates:
+            score = estimated_jaccard(signature, self.signatures[chunk_id])
+            if score >= best_score:
+                best, best_score = chunk_id, score
+        return best
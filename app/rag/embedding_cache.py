@@ -0,0 +1,163 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.rag.retrieval import LRUCache, normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_key(model_name: str, text: str) -> str:
+    """Cache key for a chunk: hash of (model name, chunk text)."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent, append-only embedding store.
+
+    Vectors live in `vectors.f32` (raw float32 rows, read through a memory map)
+    and their keys in `keys.txt` (one hex key per line, line number == row).
+    Vectors are always written before keys, so a crash can only leave unused
+    trailing rows, never a key pointing at a missing vector.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self.keys_path = os.path.join(cache_dir, "keys.txt")
+        self.meta_path = os.path.join(cache_dir, "meta.json")
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        if self.dim is None or not os.path.exists(self.keys_path):
+            return
+
+        max_rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        keys = []
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if len(keys) >= max_rows or not line.endswith("\n"):
+                    break
+                keys.append(line[:-1])
+        self.rows = {k: row for row, k in enumerate(keys)}
+
+        # Drop a torn tail so the next append stays aligned with its vector rows.
+        if os.path.getsize(self.keys_path) != sum(len(k) + 1 for k in keys):
+            with open(self.keys_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"{k}\n" for k in keys))
+        logger.info(f"Embedding cache loaded with {len(self.rows)} vectors from {self.cache_dir}")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _view(self) -> np.memmap:
+        """Memory map covering every row written so far (re-mapped as the file grows)."""
+        needed = len(self.rows)
+        if self._mmap is None or self._mmap.shape[0] < needed:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(needed, self.dim))
+        return self._mmap
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            hits = [k for k in keys if k in self.rows]
+            if not hits:
+                return {}
+            view = self._view()
+            return {k: np.array(view[self.rows[k]]) for k in hits}
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+
+            new = [(k, v) for k, v in zip(keys, vectors) if k not in self.rows]
+            if not new:
+                return
+
+            # Rows beyond the last key (torn write) are overwritten, keeping row == line number.
+            start = len(self.rows)
+            with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                f.seek(start * 4 * self.dim)
+                f.write(np.stack([v for _, v in new]).tobytes())
+                f.truncate()
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{k}\n" for k, _ in new))
+
+            for offset, (k, _) in enumerate(new):
+                self.rows[k] = start + offset
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that batches model calls and caches document vectors on
+    disk keyed by hash(model_name, chunk_text). Query vectors are kept in an
+    in-memory LRU keyed by normalized query text. The underlying HuggingFace
+    model is only loaded when a cache miss actually needs inference.
+    """
+    def __init__(self, model_name: str, cache_dir: str, batch_size: int = 64, query_cache_size: int = 1024):
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.cache = EmbeddingCache(os.path.join(cache_dir, safe_name))
+        self.query_cache = LRUCache(query_cache_size)
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [chunk_key(self.model_name, t) for t in texts]
+        found = self.cache.get_many(keys)
+
+        # Unique misses only: identical chunks in one call are embedded once.
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            miss_keys = list(missing)
+            for i in range(0, len(miss_keys), self.batch_size):
+                batch_keys = miss_keys[i:i + self.batch_size]
+                vectors = np.asarray(
+                    self.model.embed_documents([missing[k] for k in batch_keys]),
+                    dtype=np.float32,
+                )
+                self.cache.put_many(batch_keys, vectors)
+                found.update(zip(batch_keys, vectors))
+            logger.info(f"Embedded {len(missing)} new chunks ({len(texts) - len(missing)} served from cache).")
+
+        return [found[k].tolist() for k in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = self.model.embed_query(" ".join(text.split()))
+            self.query_cache.put(key, vector)
+        return vector
@@ -0,0 +1,127 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Dict
+
+from langchain_core.documents import Document
+from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.rag.manifest import file_sha256
+from app.rag.text_cache import ParsedTextCache
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+@dataclass
+class FileResult:
+    """Outcome of loading and splitting a single file in a worker process."""
+    path: str
+    sha256: Optional[str] = None
+    chunks: List[Document] = field(default_factory=list)
+    unchanged: bool = False
+    from_text_cache: bool = False
+    error: Optional[str] = None
+
+
+def load_file(path: str) -> Optional[List[Document]]:
+    """Loads a single supported file into LangChain documents (None if unsupported)."""
+    lower = path.lower()
+    if lower.endswith(".pdf"):
+        loader = PyPDFLoader(path)
+    elif lower.endswith(".docx"):
+        loader = Docx2txtLoader(path)
+    elif lower.endswith(".txt"):
+        loader = TextLoader(path, encoding='utf-8')
+    else:
+        return None
+    return loader.load()
+
+
+def load_and_split(
+    path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    known_sha256: Optional[str] = None,
+    text_cache_dir: Optional[str] = None,
+) -> FileResult:
+    """
+    Hashes, parses and chunks one file. Runs inside a worker process, so it must
+    stay a top-level function and never raise: errors are returned in the result.
+    If the content hash equals known_sha256 the file is not parsed at all; with
+    a text cache, previously extracted text is reused and only re-split.
+    """
+    result = FileResult(path=path)
+    try:
+        result.sha256 = file_sha256(path)
+        if known_sha256 and result.sha256 == known_sha256:
+            result.unchanged = True
+            return result
+
+        cache = ParsedTextCache(text_cache_dir) if text_cache_dir else None
+        docs = cache.get(result.sha256, path) if cache else None
+        if docs is not None:
+            result.from_text_cache = True
+        else:
+            docs = load_file(path)
+            if docs is None:
+                result.error = "Unsupported file type"
+                return result
+            if cache:
+                try:
+                    cache.put(result.sha256, path, docs)
+                except OSError as e:
+                    logger.warning(f"Could not cache parsed text for {path}: {e}")
+
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=["\n\n", "\n", " ", ""]
+        )
+        result.chunks = splitter.split_documents(docs)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def iter_load_and_split(
+    jobs: Dict[str, Optional[str]],
+    chunk_size: int,
+    chunk_overlap: int,
+    max_workers: int = 0,
+    text_cache_dir: Optional[str] = None,
+) -> Iterator[FileResult]:
+    """
+    Yields a FileResult per file as soon as it is ready.
+
+    `jobs` maps file path -> previously known content hash (or None). Work is
+    fanned out over a process pool; with a single file or worker it runs inline
+    to avoid the pool start-up cost. Workers are spawned, not forked: the
+    server process has scheduler, reminder and ingestion threads (and FAISS/
+    OpenMP pools) whose locks a forked child could inherit held.
+    """
+    paths = list(jobs)
+    workers = max_workers or os.cpu_count() or 1
+    workers = min(workers, len(paths))
+
+    if workers <= 1:
+        for path in paths:
+            yield load_and_split(path, chunk_size, chunk_overlap, jobs[path], text_cache_dir)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(load_and_split, path, chunk_size, chunk_overlap, jobs[path], text_cache_dir): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                # Worker crashed (e.g. BrokenProcessPool); isolate it to this file.
+                yield FileResult(path=path, error=f"{type(e).__name__}: {e}")
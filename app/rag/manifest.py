@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """Returns the hex SHA-256 digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id_for(path: str, position: int) -> str:
+    """
+    Stable chunk id derived from the source file and the chunk's position in
+    it, so re-ingesting a file addresses the same ids instead of minting new ones.
+    """
+    source = os.path.abspath(path)
+    return hashlib.sha256(f"{source}\0{position}".encode("utf-8")).hexdigest()[:32]
+
+
+class IngestManifest:
+    """
+    Tracks which source files have been ingested into the vector store.
+
+    Each entry is keyed by absolute file path and records the file size, mtime,
+    content hash and the ids of the chunks it produced, so re-ingestion can skip
+    unchanged files and replace or remove the chunks of changed/deleted ones.
+    """
+    def __init__(self, index_path: str):
+        self.path = os.path.join(index_path, MANIFEST_FILENAME)
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        return os.path.abspath(path)
+
+    def load(self):
+        """Loads the manifest from disk if present."""
+        if not os.path.exists(self.path):
+            self.entries = {}
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+            logger.info(f"Loaded ingest manifest with {len(self.entries)} files.")
+        except Exception as e:
+            logger.error(f"Failed to load ingest manifest: {e}")
+            self.entries = {}
+
+    def save(self, directory: Optional[str] = None):
+        """Writes the manifest next to the index, or into `directory` (temp file + rename)."""
+        path = os.path.join(directory, MANIFEST_FILENAME) if directory else self.path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.entries}, f)
+        os.replace(tmp_path, path)
+
+    def copy(self) -> "IngestManifest":
+        """
+        Shallow clone: entries are never modified in place (record/touch replace
+        them), so both manifests share every unchanged entry.
+        """
+        clone = IngestManifest.__new__(IngestManifest)
+        clone.path = self.path
+        clone.entries = dict(self.entries)
+        return clone
+
+    def get(self, path: str) -> Optional[Dict]:
+        return self.entries.get(self.normalize(path))
+
+    def is_unchanged(self, path: str, stat: os.stat_result) -> bool:
+        """Cheap check: same size and mtime as the recorded entry."""
+        entry = self.get(path)
+        return bool(entry) and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+    def same_chunking(self, path: str, chunking: Tuple[int, int]) -> bool:
+        """Whether the file was split with these (chunk_size, chunk_overlap) settings."""
+        entry = self.get(path)
+        # Entries written before chunk settings were tracked are assumed current.
+        return bool(entry) and tuple(entry.get("chunking", chunking)) == tuple(chunking)
+
+    def record(self, path: str, stat: os.stat_result, sha256: str, chunk_ids: List[str],
+               chunking: Optional[Tuple[int, int]] = None, duplicates: Optional[Dict[str, str]] = None):
+        entry = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256,
+            "chunk_ids": list(chunk_ids),
+        }
+        if chunking is not None:
+            entry["chunking"] = list(chunking)
+        if duplicates:
+            # Chunks skipped as near-duplicates: chunk id -> id of the indexed copy.
+            entry["duplicates"] = dict(duplicates)
+        self.entries[self.normalize(path)] = entry
+
+    def touch(self, path: str, stat: os.stat_result):
+        """Refreshes size/mtime for a file whose content hash did not change."""
+        entry = self.get(path)
+        if entry:
+            self.entries[self.normalize(path)] = {**entry, "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def remove(self, path: str) -> List[str]:
+        """Drops a file from the manifest and returns its chunk ids."""
+        entry = self.entries.pop(self.normalize(path), None)
+        return entry["chunk_ids"] if entry else []
+
+    def files_under(self, directory: str) -> List[str]:
+        prefix = os.path.join(self.normalize(directory), "")
+        return [p for p in self.entries if p.startswith(prefix)]
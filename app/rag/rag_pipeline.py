@@ -1,149 +1,600 @@
 
 import os
 import logging
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+import numpy as np
+from langchain_core.documents import Document
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 
+from app.config import Config
+from app.rag.manifest import IngestManifest, chunk_id_for
+from app.rag.loaders import SUPPORTED_EXTENSIONS, iter_load_and_split
+from app.rag.embedding_cache import CachedEmbeddings
+from app.rag.bm25 import BM25View
+from app.rag.snapshot import IndexSnapshot, load_snapshot, publish_snapshot
+from app.rag.retrieval import LRUCache, normalize_query, reciprocal_rank_fusion
+from app.rag.segments import SegmentedIndex
+from app.rag.vector_index import IndexSpec
+from app.rag.context_packer import mmr_select, pack_context
+from app.rag.dedup import NearDuplicateIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+@dataclass
+class IngestProgress:
+    """Running counters for an ingestion, passed to progress callbacks."""
+    files_total: int = 0
+    files_done: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    files_from_text_cache: int = 0
+    chunks_parsed: int = 0
+    chunks_embedded: int = 0
+    chunks_deduplicated: int = 0
+    errors: List[str] = field(default_factory=list)
+
+def create_llm():
+    """Gemini chat model used for answer generation (same config as ChatAgent)."""
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not google_api_key:
+        logger.warning("GOOGLE_API_KEY not found. RAG generation will fail.")
+        return None
+    return ChatGoogleGenerativeAI(
+        model="gemini-flash-latest",
+        google_api_key=google_api_key,
+        temperature=0.3, # Lower temperature for factual Q&A
+        max_retries=2,
+        convert_system_message_to_human=True
+    )
+
+
+def create_embeddings() -> CachedEmbeddings:
+    # Batched, disk-cached embeddings: re-ingesting known chunks needs no model inference.
+    return CachedEmbeddings(
+        model_name=Config.RAG_EMBEDDING_MODEL,
+        cache_dir=Config.EMBEDDING_CACHE_DIR,
+        batch_size=Config.RAG_EMBED_BATCH_SIZE,
+        query_cache_size=Config.RAG_QUERY_CACHE_SIZE,
+    )
+
+
+def generate_answer(llm, query: str, docs: List) -> str:
+    """Answers `query` from retrieved chunks (best first) with the LLM."""
+    # Construct context string: merge adjacent chunks, drop overlap, fit the budget
+    context = pack_context(docs, Config.RAG_CONTEXT_TOKEN_BUDGET, Config.RAG_CHUNK_OVERLAP)
+
+    # Construct Prompt
+    prompt_template = """Answer the question based only on the following context:
+{context}
+
+Question: {question}
+"""
+    prompt = ChatPromptTemplate.from_template(prompt_template)
+
+    # Generate Answer
+    chain = prompt | llm | StrOutputParser()
+    return chain.invoke({"context": context, "question": query})
+
+
 class RAGPipeline:
-    def __init__(self, index_path: str = "rag/faiss_index"):
+    """
+    Retrieval-augmented QA over ingested documents.
+
+    Queries read an immutable IndexSnapshot; ingestion (serialized by a write
+    lock) clones it, applies changes off to the side, persists the new version
+    crash-safely and then swaps the snapshot reference in one step, so readers
+    never observe a half-applied ingest and are never blocked by one.
+    """
+    def __init__(self, index_path: str = Config.RAG_INDEX_PATH, embeddings: Optional[CachedEmbeddings] = None, llm=None):
         self.index_path = index_path
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        self.vector_store = None
-        self._load_vector_store()
-        
-        # Initialize LLM (same config as ChatAgent)
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if google_api_key:
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-flash-latest",
-                google_api_key=google_api_key,
-                temperature=0.3, # Lower temperature for factual Q&A
-                max_retries=2,
-                convert_system_message_to_human=True
-            )
-        else:
-            logger.warning("GOOGLE_API_KEY not found. RAG generation will fail.")
-            self.llm = None
-
-    def _load_vector_store(self):
-        """Loads existing FAISS index if available."""
-        if os.path.exists(self.index_path):
-            try:
-                self.vector_store = FAISS.load_local(
-                    self.index_path, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True # Local file, safe
-                )
-                logger.info(f"Loaded existing vector store from {self.index_path}")
-            except Exception as e:
-                logger.error(f"Failed to load vector store: {e}")
-        else:
-            logger.info("No existing vector store found. A new one will be created upon ingestion.")
+        # Collections share one embedding model/cache and one LLM client.
+        self.embeddings = embeddings or create_embeddings()
+        # Retrieval results are cached per snapshot version.
+        self.results_cache = LRUCache(Config.RAG_QUERY_CACHE_SIZE)
+        self.index_spec = IndexSpec.from_config(Config)
+        self._write_lock = threading.RLock()
+        self._snapshot: IndexSnapshot = load_snapshot(index_path, self.index_spec, mmap=Config.RAG_INDEX_MMAP)
+        # Vector and lexical searches run side by side for hybrid retrieval.
+        self._search_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-search")
+        # Segment merges run one at a time in the background.
+        self._merge_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-merge")
+        self._merge_pending = False
+        self._merging = False
+        # Writer-side near-duplicate state, built lazily (guarded by the write lock).
+        self._dedup: Optional[NearDuplicateIndex] = None
+        self._dedup_refs: Optional[Dict[str, Set[str]]] = None
+        self._orphans: Set[str] = set()
+        self._alias_sources: Tuple[int, Dict[str, List[str]]] = (-1, {})
+        self.llm = llm if llm is not None else create_llm()
+
+    def memory_bytes(self) -> int:
+        """Approximate RAM held by the loaded index (memory-mapped vectors are not counted)."""
+        snapshot = self._snapshot
+        return snapshot.vector_store.memory_bytes() + snapshot.bm25.memory_bytes()
+
+    def is_busy(self) -> bool:
+        """True while a write or background merge is in progress."""
+        if self._merge_pending or self._merging:
+            return True
+        if not self._write_lock.acquire(blocking=False):
+            return True
+        self._write_lock.release()
+        return False
+
+    def close(self):
+        """Releases worker threads; the on-disk index is untouched."""
+        self._search_pool.shutdown(wait=False)
+        self._merge_pool.shutdown(wait=True)
+
+    # Read-only views of the current snapshot.
+    @property
+    def vector_store(self) -> SegmentedIndex:
+        return self._snapshot.vector_store
+
+    @property
+    def bm25(self) -> BM25View:
+        return self._snapshot.bm25
+
+    @property
+    def manifest(self) -> IngestManifest:
+        return self._snapshot.manifest
+
+    @property
+    def index_version(self) -> int:
+        return self._snapshot.version
+
+    # ------------------------------------------------------------------
+    # Writes (always on a private clone of the current snapshot)
+    # ------------------------------------------------------------------
+    def _commit(self, work: IndexSnapshot):
+        """
+        Persists a modified snapshot as the next version and swaps it in for
+        readers. Only the chunks added since the last version are written (as
+        a new segment), so the cost follows the size of the change.
+        """
+        work.version = self._snapshot.version + 1
+        try:
+            directory = publish_snapshot(self.index_path, work)
+            logger.info(f"Vector store version {work.version} saved to {directory}")
+        except Exception as e:
+            logger.error(f"Failed to save vector store: {e}")
+        self._snapshot = work
+        self.results_cache.clear()
+        self._schedule_merge()
+
+    def _schedule_merge(self):
+        if self._merge_pending or not self._snapshot.vector_store.plan_merge():
+            return
+        self._merge_pending = True
+        self._merge_pool.submit(self._merge_segments)
 
-    def ingest_documents(self, file_paths: List[str]):
+    def _merge_segments(self, force: bool = False):
+        """
+        Merges segments chosen by the merge policy. The merged index is built
+        without holding the write lock (ingests continue meanwhile); only the
+        swap of the segment list is serialized with other writers.
+        """
+        self._merging = True
+        try:
+            with self._write_lock:
+                self._merge_pending = False
+                store = self._snapshot.vector_store
+                names = store.plan_merge(force=force)
+            if not names:
+                return
+            merged, seen = store.build_merged(names, self.embeddings.embed_documents)
+            with self._write_lock:
+                work = self._snapshot.clone()
+                if work.vector_store.commit_merge(merged, seen):
+                    self._commit(work)
+        except Exception as e:
+            logger.error(f"Index segment merge failed: {e}")
+        finally:
+            self._merging = False
+
+    def _delete_chunks(self, work: IndexSnapshot, chunk_ids: List[str]):
+        """Removes previously ingested chunks from the vector store."""
+        if not chunk_ids:
+            return
+        refs = self._duplicate_refs(work)
+        for chunk_id in chunk_ids:
+            if self._dedup is not None:
+                self._dedup.remove(chunk_id)
+            self._orphans |= refs.pop(chunk_id, set())
+        removed = work.vector_store.delete(chunk_ids)
+        if removed < len(chunk_ids):
+            logger.warning(f"{len(chunk_ids) - removed} chunks were already missing from the index.")
+
+    def _duplicate_refs(self, work: IndexSnapshot) -> Dict[str, Set[str]]:
+        """Indexed chunk id -> files that skipped a near-duplicate of it (built from the manifest once)."""
+        if self._dedup_refs is None:
+            self._dedup_refs = {}
+            for path, entry in work.manifest.entries.items():
+                for canonical in entry.get("duplicates", {}).values():
+                    self._dedup_refs.setdefault(canonical, set()).add(path)
+        return self._dedup_refs
+
+    def _dedup_index(self, work: IndexSnapshot) -> NearDuplicateIndex:
+        """MinHash/LSH index over all indexed chunks (built on first use, then kept up to date)."""
+        if self._dedup is None:
+            self._dedup = NearDuplicateIndex(Config.RAG_DEDUP_THRESHOLD, Config.RAG_DEDUP_NUM_PERM, Config.RAG_DEDUP_SHINGLE_SIZE)
+            for chunk_id, doc in work.vector_store.chunks():
+                self._dedup.add(chunk_id, doc.page_content)
+            logger.info(f"Built near-duplicate index over {len(self._dedup)} chunks.")
+        return self._dedup
+
+    def _release_file(self, work: IndexSnapshot, path: str, entry: Dict):
+        """Forgets a file's previous chunks for dedup purposes, before it is re-indexed or removed."""
+        refs = self._duplicate_refs(work)
+        path = work.manifest.normalize(path)
+        for canonical in entry.get("duplicates", {}).values():
+            refs.get(canonical, set()).discard(path)
+        for chunk_id in entry["chunk_ids"]:
+            if self._dedup is not None:
+                self._dedup.remove(chunk_id)
+            # Files that deduplicated against this chunk must be indexed again.
+            self._orphans |= refs.pop(chunk_id, set()) - {path}
+
+    def _remove_file(self, work: IndexSnapshot, path: str) -> List[str]:
+        entry = work.manifest.get(path)
+        if entry is None:
+            return []
+        self._release_file(work, path, entry)
+        chunk_ids = work.manifest.remove(path)
+        self._delete_chunks(work, chunk_ids)
+        return chunk_ids
+
+    def _reingest_orphans(self, work: IndexSnapshot, report: IngestProgress, progress=None) -> bool:
+        """
+        Re-indexes files whose chunks were skipped as duplicates of chunks that
+        have since changed or been removed, so their content is not lost.
+        """
+        changed = False
+        while self._orphans:
+            paths = sorted(p for p in self._orphans if work.manifest.get(p) is not None)
+            self._orphans.clear()
+            if not paths:
+                break
+            logger.info(f"Re-indexing {len(paths)} files whose duplicate chunks lost their original.")
+            sub_report, sub_changed = self._ingest(work, paths, progress, force=paths)
+            for name in ("files_failed", "chunks_parsed", "chunks_embedded", "chunks_deduplicated"):
+                setattr(report, name, getattr(report, name) + getattr(sub_report, name))
+            report.errors.extend(sub_report.errors)
+            changed = changed or sub_changed
+        return changed
+
+    def ingest_documents(self, file_paths: List[str], progress: Optional[Callable[[IngestProgress], None]] = None) -> IngestProgress:
         """
         Loads documents, splits them, and updates the vector store.
         Supported formats: .pdf, .txt, .docx
+
+        Files already recorded in the ingest manifest with the same content are
+        skipped; changed files have their previous chunks replaced. Parsing and
+        splitting run in a process pool and each file's chunks are embedded as
+        soon as they arrive. `progress` is called after every file. Queries keep
+        using the previous index version until the ingest is committed.
         """
-        all_docs = []
+        with self._write_lock:
+            work = self._snapshot.clone()
+            report, changed = self._ingest(work, file_paths, progress)
+            if changed:
+                self._commit(work)
+            return report
+
+    def _ingest(self, work: IndexSnapshot, file_paths: List[str], progress,
+                force: Iterable[str] = ()) -> Tuple[IngestProgress, bool]:
+        report = IngestProgress()
+        force = {work.manifest.normalize(p) for p in force}
+
+        # Resolve which files actually need work (path -> previously known hash).
+        # Files split with other chunk settings are re-split; their extracted
+        # text normally comes from the parsed-text cache.
+        chunking = (Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP)
+        jobs = {}
         for path in file_paths:
             if not os.path.exists(path):
                 logger.warning(f"File not found: {path}")
                 continue
-            
-            try:
-                if path.lower().endswith(".pdf"):
-                    loader = PyPDFLoader(path)
-                elif path.lower().endswith(".docx"):
-                    loader = Docx2txtLoader(path)
-                elif path.lower().endswith(".txt"):
-                    loader = TextLoader(path, encoding='utf-8')
-                else:
-                    logger.warning(f"Unsupported file type: {path}")
+            if not path.lower().endswith(SUPPORTED_EXTENSIONS):
+                logger.warning(f"Unsupported file type: {path}")
+                continue
+            rechunk = work.manifest.get(path) is not None and not work.manifest.same_chunking(path, chunking)
+            rechunk = rechunk or work.manifest.normalize(path) in force
+            if not rechunk and work.manifest.is_unchanged(path, os.stat(path)):
+                report.files_skipped += 1
+                continue
+            entry = work.manifest.get(path)
+            jobs[path] = entry["sha256"] if entry and not rechunk else None
+
+        report.files_total = len(jobs) + report.files_skipped
+        report.files_done = report.files_skipped
+        if progress:
+            progress(report)
+
+        changed = False
+        for result in iter_load_and_split(jobs, *chunking, Config.RAG_INGEST_WORKERS, Config.PARSED_TEXT_CACHE_DIR):
+            report.files_done += 1
+            path = result.path
+
+            if result.error:
+                report.files_failed += 1
+                report.errors.append(f"{path}: {result.error}")
+                logger.error(f"Error loading {path}: {result.error}")
+            elif result.unchanged:
+                # Touched but identical content: just refresh size/mtime.
+                work.manifest.touch(path, os.stat(path))
+                report.files_skipped += 1
+                changed = True
+            else:
+                report.chunks_parsed += len(result.chunks)
+                report.files_from_text_cache += int(result.from_text_cache)
+                if progress:
+                    progress(report)
+                try:
+                    duplicates = self._index_file(work, path, result.sha256, result.chunks)
+                    report.chunks_embedded += len(result.chunks) - duplicates
+                    report.chunks_deduplicated += duplicates
+                    changed = True
+                except Exception as e:
+                    report.files_failed += 1
+                    report.errors.append(f"{path}: {e}")
+                    logger.error(f"Error indexing {path}: {e}")
+
+            if progress:
+                progress(report)
+
+        if not force and self._reingest_orphans(work, report, progress):
+            changed = True
+
+        if report.files_skipped:
+            logger.info(f"Skipped {report.files_skipped} unchanged files.")
+
+        if not changed:
+            logger.info("Vector store is up to date; nothing to ingest.")
+        else:
+            logger.info(
+                f"Ingestion finished: {report.files_done}/{report.files_total} files, "
+                f"{report.chunks_embedded} chunks embedded, {report.files_failed} failed, "
+                f"{report.files_from_text_cache} re-split from cached text, "
+                f"{report.chunks_deduplicated} near-duplicate chunks skipped."
+            )
+        return report, changed
+
+    def _index_file(self, work: IndexSnapshot, path: str, sha256: str, splits: List) -> int:
+        """
+        Embeds one file's chunks, replacing whatever the file contributed before.
+        Chunks that near-duplicate an indexed chunk (RAG_DEDUP_MODE) are not
+        embedded; the manifest links them to the copy that was kept. Returns
+        the number of chunks skipped as duplicates.
+        """
+        chunk_ids = [chunk_id_for(path, i) for i in range(len(splits))]
+        for position, (chunk_id, doc) in enumerate(zip(chunk_ids, splits)):
+            doc.metadata["chunk_id"] = chunk_id
+            doc.metadata["chunk_index"] = position
+
+        entry = work.manifest.get(path)
+        if entry:
+            self._release_file(work, path, entry)
+
+        kept_ids, kept_docs, duplicates = chunk_ids, splits, {}
+        if Config.RAG_DEDUP_MODE != "off" and splits:
+            dedup = self._dedup_index(work)
+            kept_ids, kept_docs, batch = [], [], set()
+            for chunk_id, doc in zip(chunk_ids, splits):
+                signature = dedup.hasher.signature(doc.page_content)
+                original = dedup.find(signature)
+                if original is not None and (original in batch or work.vector_store.get(original) is not None):
+                    duplicates[chunk_id] = original
                     continue
-                
-                docs = loader.load()
-                all_docs.extend(docs)
-                logger.info(f"Loaded {len(docs)} pages/chunks from {path}")
-            except Exception as e:
-                logger.error(f"Error loading {path}: {e}")
-
-        if not all_docs:
-            logger.warning("No documents loaded.")
-            return
+                dedup.add(chunk_id, doc.page_content, signature)
+                batch.add(chunk_id)
+                kept_ids.append(chunk_id)
+                kept_docs.append(doc)
 
-        # Split text
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", " ", ""]
-        )
-        splits = text_splitter.split_documents(all_docs)
-        logger.info(f"Created {len(splits)} chunks from loaded documents.")
+        # Same positions map to the same ids and are replaced in place by add();
+        # old chunks that are not re-added (beyond the new count, or now duplicates) are deleted.
+        if entry:
+            kept = set(kept_ids)
+            self._delete_chunks(work, [c for c in entry["chunk_ids"] if c not in kept])
 
-        # Create or Update Vector Store
-        if self.vector_store is None:
-            self.vector_store = FAISS.from_documents(splits, self.embeddings)
+        if kept_docs:
+            vectors = np.asarray(self.embeddings.embed_documents([d.page_content for d in kept_docs]), dtype=np.float32)
+            work.vector_store.add(kept_docs, vectors, kept_ids)  # also indexes them for BM25
+
+        work.manifest.record(path, os.stat(path), sha256, kept_ids, (Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP), duplicates)
+        refs = self._duplicate_refs(work)
+        for original in duplicates.values():
+            refs.setdefault(original, set()).add(work.manifest.normalize(path))
+        if duplicates:
+            logger.info(f"Indexed {len(kept_docs)} chunks from {path} ({len(duplicates)} near-duplicates skipped)")
         else:
-            self.vector_store.add_documents(splits)
+            logger.info(f"Indexed {len(splits)} chunks from {path}")
+        return len(duplicates)
 
-        # Save index
-        try:
-            self.vector_store.save_local(self.index_path)
-            logger.info(f"Vector store saved to {self.index_path}")
-        except Exception as e:
-            logger.error(f"Failed to save vector store: {e}")
+    def upsert_document(self, path: str) -> IngestProgress:
+        """
+        Inserts a document or replaces its chunks in place. Only this file is
+        parsed and embedded; the rest of the corpus is untouched.
+        """
+        return self.ingest_documents([path])
+
+    def delete_document(self, path: str) -> bool:
+        """Removes every chunk a document contributed. Returns False if it was never ingested."""
+        with self._write_lock:
+            if self._snapshot.manifest.get(path) is None:
+                logger.warning(f"Document not in index: {path}")
+                return False
+            work = self._snapshot.clone()
+            chunk_ids = self._remove_file(work, path)
+            self._reingest_orphans(work, IngestProgress())
+            self._commit(work)
+        logger.info(f"Deleted {len(chunk_ids)} chunks for {path}")
+        return True
+
+    def sync_directory(self, directory: str) -> IngestProgress:
+        """
+        Brings the index in line with a folder: ingests new/changed files and
+        removes the chunks of files that were deleted from it, as one version.
+        """
+        present = []
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    present.append(os.path.abspath(os.path.join(root, name)))
+
+        with self._write_lock:
+            work = self._snapshot.clone()
+            removed = 0
+            present_set = set(present)
+            for path in work.manifest.files_under(directory):
+                if path not in present_set:
+                    self._remove_file(work, path)
+                    removed += 1
+            if removed:
+                logger.info(f"Removed chunks for {removed} deleted files under {directory}.")
+
+            report, changed = self._ingest(work, sorted(present), None)
+            if changed or removed:
+                self._commit(work)
+            return report
+
+    def reindex(self) -> IngestProgress:
+        """
+        Re-splits every ingested file whose chunks were made with different
+        RAG_CHUNK_SIZE/RAG_CHUNK_OVERLAP settings. Extracted text is read from
+        the parsed-text cache, so documents are not parsed again.
+        """
+        return self.ingest_documents(list(self.manifest.entries))
+
+    def rebuild_index(self):
+        """
+        Merges all segments into one index of the configured type, retraining
+        on the current corpus. Vectors come from the embedding cache, so this
+        does essentially no model inference.
+        """
+        self._merge_segments(force=True)
+
+    # ------------------------------------------------------------------
+    # Reads (lock-free: each query pins the snapshot it started with)
+    # ------------------------------------------------------------------
+    def retrieve(self, query: str, k: int = Config.RAG_TOP_K) -> List:
+        """
+        Returns the k most relevant chunks. With hybrid retrieval enabled the
+        FAISS and BM25 searches run in parallel and are merged with Reciprocal
+        Rank Fusion, which helps exact identifiers (invoice numbers, names,
+        dates) that dense MiniLM embeddings tend to miss.
+        """
+        snapshot = self._snapshot
+        if len(snapshot.vector_store) == 0:
+            return []
+
+        # Repeated questions skip embedding and search entirely until the index changes.
+        cache_key = (normalize_query(query), k, snapshot.version)
+        cached = self.results_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        results = self._retrieve_uncached(snapshot, query, k)
+        if Config.RAG_DEDUP_MODE == "link":
+            results = self._with_duplicate_sources(snapshot, results)
+        self.results_cache.put(cache_key, tuple(results))
+        return results
+
+    def _with_duplicate_sources(self, snapshot: IndexSnapshot, docs: List) -> List:
+        """Adds `duplicate_sources` metadata: other files whose near-identical chunk was linked to this one."""
+        version, sources = self._alias_sources
+        if version != snapshot.version:
+            sources = {}
+            for path, entry in snapshot.manifest.entries.items():
+                for original in entry.get("duplicates", {}).values():
+                    if path not in sources.setdefault(original, []):
+                        sources[original].append(path)
+            self._alias_sources = (snapshot.version, sources)
+
+        linked = []
+        for doc in docs:
+            also = sources.get(doc.metadata.get("chunk_id"))
+            if also:
+                doc = Document(page_content=doc.page_content, metadata={**doc.metadata, "duplicate_sources": list(also)})
+            linked.append(doc)
+        return linked
+
+    def _vector_search(self, snapshot: IndexSnapshot, query: str, k: int) -> List:
+        return [doc for doc, _ in snapshot.vector_store.search(self.embeddings.embed_query(query), k)]
+
+    def _retrieve_uncached(self, snapshot: IndexSnapshot, query: str, k: int) -> List:
+        if not Config.RAG_HYBRID_SEARCH or len(snapshot.bm25) == 0:
+            return self._vector_search(snapshot, query, k)
+
+        fetch_k = max(k * 4, 20)
+        vector_future = self._search_pool.submit(self._vector_search, snapshot, query, fetch_k)
+        lexical_future = self._search_pool.submit(snapshot.bm25.search, query, fetch_k)
+        vector_docs = vector_future.result()
+        lexical_hits = lexical_future.result()
+
+        docs_by_id = {doc.metadata.get("chunk_id"): doc for doc in vector_docs}
+        fused = reciprocal_rank_fusion(
+            [list(docs_by_id), [chunk_id for chunk_id, _ in lexical_hits]],
+            k=Config.RAG_RRF_K,
+        )
+
+        results = []
+        for chunk_id, _ in fused:
+            doc = docs_by_id.get(chunk_id)
+            if doc is None:
+                doc = snapshot.vector_store.get(chunk_id)
+                if doc is None:
+                    continue
+            results.append(doc)
+            if len(results) == k:
+                break
+        return results
+
+    def _select_context_docs(self, query: str) -> List:
+        """
+        Retrieves candidates for the prompt. With MMR enabled (lambda < 1) twice
+        as many chunks are fetched and narrowed down to a diverse top-k, so
+        near-identical chunks do not crowd out other relevant content.
+        """
+        k = Config.RAG_TOP_K
+        if Config.RAG_MMR_LAMBDA >= 1.0:
+            return self.retrieve(query, k=k)
+
+        candidates = self.retrieve(query, k=k * 2)
+        if len(candidates) <= k:
+            return candidates
+        # Candidate vectors come straight from the embedding cache.
+        vectors = np.asarray(self.embeddings.embed_documents([d.page_content for d in candidates]), dtype=np.float32)
+        picked = mmr_select(self.embeddings.embed_query(query), vectors, k, Config.RAG_MMR_LAMBDA)
+        return [candidates[i] for i in sorted(picked)]
 
     def answer_from_docs(self, query: str) -> str:
         """
         Retrieves relevant context and uses LLM to answer the query.
         """
-        if self.vector_store is None:
+        if len(self.vector_store) == 0:
             return "Knowledge base is empty. Please upload documents first."
         
         if self.llm is None:
             return "LLM not configured. Cannot generate answer."
 
         try:
-            # 1. Retrieve relevat documents
-            # k=4 is a good default
-            docs = self.vector_store.similarity_search(query, k=4)
-            
-            # 2. Construct context string
-            context = "\n\n".join([doc.page_content for doc in docs])
-            
-            # 3. Construct Prompt
-            prompt_template = """Answer the question based only on the following context:
-{context}
-
-Question: {question}
-"""
-            prompt = ChatPromptTemplate.from_template(prompt_template)
-            
-            # 4. Generate Answer
-            chain = prompt | self.llm | StrOutputParser()
-            response = chain.invoke({"context": context, "question": query})
-            
-            return response
+            # Retrieve relevant documents (hybrid vector + BM25), then generate
+            docs = self._select_context_docs(query)
+            return generate_answer(self.llm, query, docs)
             
         except Exception as e:
             logger.error(f"Error in RAG pipeline: {e}")
             return f"Error answering query: {e}"
-
-# Singleton instance
-rag_pipeline = RAGPipeline()
@@ -0,0 +1,303 @@
+import os
+import json
+import heapq
+import shutil
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.rag.bm25 import BM25Index, BM25View
+from app.rag.vector_index import IndexSpec, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS_DIRNAME = "segments"
+SEGMENTS_FILENAME = "segments.json"
+SEGMENT_BM25_FILENAME = "bm25.pkl"
+
+
+@dataclass
+class Segment:
+    """An immutable on-disk VectorIndex and its BM25 postings, plus the ids deleted from it since it was written."""
+    name: str
+    store: VectorIndex
+    deleted: Set[str] = field(default_factory=set)
+    bm25: BM25Index = field(default_factory=BM25Index)
+
+    @property
+    def live(self) -> int:
+        return len(self.store) - len(self.deleted)
+
+    @property
+    def deleted_ratio(self) -> float:
+        return len(self.deleted) / max(len(self.store), 1)
+
+    def live_chunks(self, skip: Optional[Set[str]] = None) -> Iterator[Tuple[str, Document]]:
+        skip = self.deleted if skip is None else skip
+        for chunk_id, doc in self.store.docstore.items():
+            if chunk_id not in skip:
+                yield chunk_id, doc
+
+
+class SegmentedIndex:
+    """
+    Vector index stored as a list of immutable segments.
+
+    Chunks added by an ingest go into an in-memory `pending` index that save()
+    writes out as one new segment, so persisting an ingest costs O(change)
+    rather than rewriting the whole corpus. Deletes and upserts only record
+    the chunk id against the segment holding it. Searches query every segment
+    and merge by distance; merge() later folds small or delete-heavy segments
+    into one (and retrains IVF/PQ layouts on the larger data).
+
+    Segment files live under <root>; a version directory only holds the
+    segment list (segments.json), so versions share segments on disk.
+    The lexical (BM25) index is split the same way: every segment keeps its
+    own postings and `lexical` is a view over them, so copy() shares the
+    postings of written segments and only copies the pending ones.
+    """
+    def __init__(self, root: str, spec: IndexSpec, mmap: bool = True):
+        self.root = root
+        self.spec = spec
+        self.mmap = mmap
+        self.segments: List[Segment] = []
+        self.pending: Optional[VectorIndex] = None
+        self.pending_bm25 = BM25Index()
+        self.next_segment = 1
+
+    def __len__(self) -> int:
+        return sum(segment.live for segment in self.segments) + (len(self.pending) if self.pending else 0)
+
+    def memory_bytes(self) -> int:
+        stores = [s.store for s in self.segments] + ([self.pending] if self.pending is not None else [])
+        return sum(store.memory_bytes() for store in stores)
+
+    def copy(self) -> "SegmentedIndex":
+        """Writable clone; segment files are shared, deletion sets are copied."""
+        clone = SegmentedIndex(self.root, self.spec, self.mmap)
+        clone.segments = [Segment(s.name, s.store, set(s.deleted), s.bm25) for s in self.segments]
+        clone.pending = self.pending.copy() if self.pending is not None else None
+        clone.pending_bm25 = self.pending_bm25.copy()
+        clone.next_segment = self.next_segment
+        return clone
+
+    @property
+    def lexical(self) -> BM25View:
+        """BM25 over the live chunks of every segment and the pending ones."""
+        parts = [(s.bm25, s.deleted) for s in self.segments]
+        return BM25View(parts + [(self.pending_bm25, frozenset())])
+
+    def chunks(self) -> Iterator[Tuple[str, Document]]:
+        """Every live (chunk_id, document)."""
+        for segment in self.segments:
+            yield from segment.live_chunks()
+        if self.pending is not None:
+            yield from self.pending.docstore.items()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, SEGMENTS_FILENAME))
+
+    @classmethod
+    def load(cls, root: str, directory: str, spec: IndexSpec, mmap: bool = True) -> "SegmentedIndex":
+        """Opens the segments listed in `directory`, each with its BM25 postings."""
+        with open(os.path.join(directory, SEGMENTS_FILENAME), "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        index = cls(root, spec, mmap)
+        index.next_segment = state["next_segment"]
+        for entry in state["segments"]:
+            segment_dir = os.path.join(root, entry["name"])
+            store = VectorIndex.load(segment_dir, spec, mmap=mmap)
+            index.segments.append(Segment(entry["name"], store, set(entry["deleted"]), _load_segment_bm25(segment_dir, store)))
+        logger.info(f"Loaded {len(index.segments)} index segments with {len(index)} live chunks.")
+        return index
+
+    def _write_segment(self, store: VectorIndex, bm25: Optional[BM25Index] = None) -> Segment:
+        """Writes a new segment directory (temp dir + rename) and opens it memory-mapped."""
+        name = f"seg-{self.next_segment:08d}"
+        self.next_segment += 1
+        segment_dir = os.path.join(self.root, name)
+        tmp_dir = f"{segment_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        store.save(tmp_dir)
+        if bm25 is None:
+            bm25 = BM25Index()
+            for chunk_id, doc in store.docstore.items():
+                bm25.add(chunk_id, doc.page_content)
+        bm25.save(os.path.join(tmp_dir, SEGMENT_BM25_FILENAME))
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        os.replace(tmp_dir, segment_dir)
+        if self.mmap:
+            store.remap(segment_dir)
+        logger.info(f"Wrote index segment {name} with {len(store)} chunks.")
+        return Segment(name, store, bm25=bm25)
+
+    def save(self, directory: str):
+        """Flushes pending chunks as a new segment and writes the segment list into `directory`."""
+        if self.pending is not None and len(self.pending):
+            self.segments.append(self._write_segment(self.pending, self.pending_bm25))
+        self.pending = None
+        self.pending_bm25 = BM25Index()
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, SEGMENTS_FILENAME)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "next_segment": self.next_segment,
+                "segments": [{"name": s.name, "deleted": sorted(s.deleted)} for s in self.segments],
+            }, f)
+        os.replace(f"{path}.tmp", path)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def _segment_of(self, chunk_id: str) -> Optional[Segment]:
+        for segment in self.segments:
+            if chunk_id in segment.store.chunk_to_int and chunk_id not in segment.deleted:
+                return segment
+        return None
+
+    def add(self, docs: List[Document], vectors: np.ndarray, chunk_ids: List[str]):
+        """Adds chunks to the pending segment; older copies of the same ids are marked deleted."""
+        if not docs:
+            return
+        for chunk_id in chunk_ids:
+            segment = self._segment_of(chunk_id)
+            if segment is not None:
+                segment.deleted.add(chunk_id)
+        if self.pending is None:
+            self.pending = VectorIndex.build(docs, vectors, chunk_ids, self.spec)
+        else:
+            self.pending.add(docs, vectors, chunk_ids)
+        for chunk_id, doc in zip(chunk_ids, docs):
+            self.pending_bm25.add(chunk_id, doc.page_content)
+
+    def delete(self, chunk_ids: List[str]) -> int:
+        """Removes chunks by id; unknown ids are ignored. Returns how many were removed."""
+        removed = 0
+        for chunk_id in chunk_ids:
+            if self.pending is not None and self.pending.delete([chunk_id]):
+                self.pending_bm25.remove(chunk_id)
+                removed += 1
+                continue
+            segment = self._segment_of(chunk_id)
+            if segment is not None:
+                segment.deleted.add(chunk_id)
+                removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+    # Merging
+    # ------------------------------------------------------------------
+    def plan_merge(self, force: bool = False) -> List[str]:
+        """
+        Names of the segments to merge next (empty if none). Delete-heavy
+        segments and segments whose layout is outdated are always compacted;
+        beyond max_segments the smallest ones are merged together. `force`
+        merges everything into a single segment.
+        """
+        if force:
+            return [s.name for s in self.segments] if self.segments else []
+
+        picked = {s.name for s in self.segments if s.deleted_ratio > self.spec.max_deleted_ratio}
+        picked.update(s.name for s in self.segments if s.live and s.store.needs_rebuild())
+        excess = len(self.segments) - self.spec.max_segments
+        if excess > 0:
+            smallest = sorted(self.segments, key=lambda s: s.live)[:max(excess + 1, 2)]
+            picked.update(s.name for s in smallest)
+        return [s.name for s in self.segments if s.name in picked]
+
+    def build_merged(self, names: List[str], embed: Callable[[List[str]], List[List[float]]]) -> Tuple[Optional[VectorIndex], Dict[str, Set[str]]]:
+        """
+        Builds the replacement for the named segments from their live chunks.
+        Runs without any lock: it only reads immutable segment data. Vectors
+        come from `embed` (the embedding cache). Returns the merged index and
+        the deletion sets it was built against, for commit_merge().
+        """
+        segments = [s for s in self.segments if s.name in names]
+        seen = {s.name: set(s.deleted) for s in segments}
+        chunk_ids, docs = [], []
+        for segment in segments:
+            for chunk_id, doc in segment.live_chunks(seen[segment.name]):
+                chunk_ids.append(chunk_id)
+                docs.append(doc)
+        if not docs:
+            return None, seen
+        vectors = np.asarray(embed([d.page_content for d in docs]), dtype=np.float32)
+        return VectorIndex.build(docs, vectors, chunk_ids, self.spec), seen
+
+    def commit_merge(self, merged: Optional[VectorIndex], seen: Dict[str, Set[str]]) -> bool:
+        """
+        Swaps the merged segment in for its sources. Chunks deleted from the
+        sources while the merge was running are carried over as deletions.
+        Returns False if the sources are gone (e.g. a concurrent full merge).
+        """
+        positions = [i for i, s in enumerate(self.segments) if s.name in seen]
+        if len(positions) != len(seen):
+            return False
+
+        late_deletes: Set[str] = set()
+        for i in positions:
+            late_deletes |= self.segments[i].deleted - seen[self.segments[i].name]
+
+        replacement = []
+        if merged is not None:
+            segment = self._write_segment(merged)
+            segment.deleted = {c for c in late_deletes if c in merged.chunk_to_int}
+            replacement = [segment]
+        first = positions[0]
+        remaining = [s for s in self.segments if s.name not in seen]
+        self.segments = remaining[:first] + replacement + remaining[first:]
+        logger.info(f"Merged {len(seen)} index segments into {replacement[0].name if replacement else 'nothing'}.")
+        return True
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get(self, chunk_id: str) -> Optional[Document]:
+        if self.pending is not None and chunk_id in self.pending.docstore:
+            return self.pending.docstore[chunk_id]
+        segment = self._segment_of(chunk_id)
+        return segment.store.get(chunk_id) if segment else None
+
+    def search(self, query_vector: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """Returns up to k (document, L2 distance) pairs across all segments, nearest first."""
+        candidates = []
+        for segment in self.segments:
+            if not segment.live:
+                continue
+            for doc, distance in segment.store.search(query_vector, k + len(segment.deleted)):
+                if doc.metadata.get("chunk_id") not in segment.deleted:
+                    candidates.append((doc, distance))
+        if self.pending is not None:
+            candidates.extend(self.pending.search(query_vector, k))
+        return heapq.nsmallest(k, candidates, key=lambda item: item[1])
+
+
+def _load_segment_bm25(segment_dir: str, store: VectorIndex) -> BM25Index:
+    path = os.path.join(segment_dir, SEGMENT_BM25_FILENAME)
+    if os.path.exists(path):
+        try:
+            return BM25Index.load(path)
+        except Exception as e:
+            logger.error(f"Failed to load segment BM25 index, rebuilding: {e}")
+    bm25 = BM25Index()
+    for chunk_id, doc in store.docstore.items():
+        bm25.add(chunk_id, doc.page_content)
+    return bm25
+
+
+def referenced_segments(directory: str) -> Set[str]:
+    """Segment names listed by a version directory."""
+    path = os.path.join(directory, SEGMENTS_FILENAME)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {entry["name"] for entry in json.load(f)["segments"]}
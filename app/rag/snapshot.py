@@ -0,0 +1,178 @@
+import os
+import shutil
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.rag.bm25 import BM25Index, BM25View
+from app.rag.manifest import IngestManifest
+from app.rag.segments import SEGMENTS_DIRNAME, SegmentedIndex, referenced_segments
+from app.rag.vector_index import IndexSpec, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+BM25_FILENAME = "bm25.pkl"  # pre-segment layouts only
+KEEP_VERSIONS = 2
+
+
+@dataclass
+class IndexSnapshot:
+    """
+    One consistent version of the index state: vectors, lexical index and
+    ingest manifest. Published snapshots are never mutated; writers clone()
+    the current one, change the clone and publish it as a new version.
+    A clone shares everything unchanged with its source: written segments
+    (vectors and BM25 postings) and manifest entries. Only deletion sets,
+    pending chunks and the manifest's file table are copied.
+    """
+    vector_store: SegmentedIndex
+    manifest: IngestManifest
+    version: int = 0
+
+    @property
+    def bm25(self) -> BM25View:
+        """Lexical index over the same live chunks as the vector store."""
+        return self.vector_store.lexical
+
+    def clone(self) -> "IndexSnapshot":
+        return IndexSnapshot(
+            vector_store=self.vector_store.copy(),
+            manifest=self.manifest.copy(),
+            version=self.version,
+        )
+
+    def write(self, directory: str):
+        # Only new segments are written; their BM25 postings are stored with them.
+        self.vector_store.save(directory)
+        self.manifest.save(directory)
+
+
+def _version_name(version: int) -> str:
+    return f"v{version:08d}"
+
+
+def current_dir(index_path: str) -> Optional[str]:
+    """Directory holding the published version, or the legacy flat layout if there is one."""
+    pointer = os.path.join(index_path, CURRENT_FILENAME)
+    if os.path.exists(pointer):
+        with open(pointer, "r", encoding="utf-8") as f:
+            name = f.read().strip()
+        directory = os.path.join(index_path, VERSIONS_DIRNAME, name)
+        if os.path.isdir(directory):
+            return directory
+        logger.error(f"CURRENT points at missing index version {name}.")
+    if VectorIndex.exists(index_path):
+        return index_path
+    return None
+
+
+def load_snapshot(index_path: str, spec: IndexSpec, mmap: bool = True) -> IndexSnapshot:
+    """Loads the published snapshot (empty if nothing has been ingested yet)."""
+    segments_root = os.path.join(index_path, SEGMENTS_DIRNAME)
+    empty = SegmentedIndex(segments_root, spec, mmap)
+    directory = current_dir(index_path)
+    if directory is None:
+        logger.info("No existing vector store found. A new one will be created upon ingestion.")
+        return IndexSnapshot(empty, IngestManifest(index_path))
+
+    manifest = IngestManifest(directory)
+    version = 0
+    if directory != index_path:
+        version = int(os.path.basename(directory).lstrip("v") or 0)
+
+    try:
+        if SegmentedIndex.exists(directory):
+            vector_store = SegmentedIndex.load(segments_root, directory, spec, mmap=mmap)
+            return IndexSnapshot(vector_store, manifest, version)
+        if VectorIndex.exists(directory):
+            return _migrate_single_index(index_path, directory, empty, manifest, version)
+    except Exception as e:
+        logger.error(f"Failed to load vector store: {e}")
+
+    if manifest.entries:
+        # Manifest without an index (e.g. index deleted by hand): re-ingest everything.
+        logger.warning("Ingest manifest found without a vector store; resetting manifest.")
+        manifest.entries = {}
+    return IndexSnapshot(empty, manifest, version)
+
+
+def _migrate_single_index(index_path: str, directory: str, empty: SegmentedIndex,
+                          manifest: IngestManifest, version: int) -> IndexSnapshot:
+    """Republishes a pre-segment (single index) layout as one segment."""
+    store = VectorIndex.load(directory, empty.spec, mmap=False)
+    bm25 = _load_bm25(directory, store)
+    empty.pending = store
+    empty.pending_bm25 = bm25
+    snapshot = IndexSnapshot(empty, manifest, version + 1)
+    publish_snapshot(index_path, snapshot)
+    logger.info(f"Migrated single-file vector index with {len(store)} chunks to the segmented layout.")
+    return snapshot
+
+
+def _load_bm25(directory: str, vector_store: VectorIndex) -> BM25Index:
+    """Loads the lexical index saved alongside FAISS, rebuilding it from the docstore if missing."""
+    bm25_path = os.path.join(directory, BM25_FILENAME)
+    if os.path.exists(bm25_path):
+        try:
+            return BM25Index.load(bm25_path)
+        except Exception as e:
+            logger.error(f"Failed to load BM25 index, rebuilding: {e}")
+
+    bm25 = BM25Index()
+    for chunk_id, doc in vector_store.docstore.items():
+        bm25.add(chunk_id, doc.page_content)
+    logger.info(f"Rebuilt BM25 index with {len(bm25)} chunks.")
+    return bm25
+
+
+def publish_snapshot(index_path: str, snapshot: IndexSnapshot) -> str:
+    """
+    Crash-safe save: the snapshot is written to a temp directory, renamed to
+    versions/vNNNNNNNN and only then made current by atomically replacing the
+    CURRENT pointer file. A crash at any point leaves the previous version intact.
+    """
+    versions = os.path.join(index_path, VERSIONS_DIRNAME)
+    name = _version_name(snapshot.version)
+    final_dir = os.path.join(versions, name)
+    tmp_dir = f"{final_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    snapshot.write(tmp_dir)
+    os.replace(tmp_dir, final_dir)
+
+    pointer = os.path.join(index_path, CURRENT_FILENAME)
+    with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{pointer}.tmp", pointer)
+
+    kept = _prune_versions(versions, keep=KEEP_VERSIONS)
+    _prune_segments(os.path.join(index_path, SEGMENTS_DIRNAME), kept)
+    return final_dir
+
+
+def _prune_versions(versions: str, keep: int) -> List[str]:
+    """Removes old versions and returns the directories kept. Memory-mapped files stay readable until unmapped."""
+    entries = os.listdir(versions)
+    stale = [n for n in entries if n.endswith(".tmp")]  # leftovers of a crashed save
+    names = sorted(n for n in entries if n.startswith("v") and not n.endswith(".tmp"))
+    for name in stale + names[:-keep]:
+        shutil.rmtree(os.path.join(versions, name), ignore_errors=True)
+    return [os.path.join(versions, name) for name in names[-keep:]]
+
+
+def _prune_segments(segments_root: str, kept_versions: List[str]):
+    """Removes segment directories no kept version refers to (merged away or left by a crash)."""
+    if not os.path.isdir(segments_root):
+        return
+    referenced = set()
+    for directory in kept_versions:
+        referenced |= referenced_segments(directory)
+    for name in os.listdir(segments_root):
+        if name not in referenced:
+            shutil.rmtree(os.path.join(segments_root, name), ignore_errors=True)
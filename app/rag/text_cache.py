@@ -0,0 +1,60 @@
+import os
+import gzip
+import json
+import logging
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Bump when loader output changes, so stale extractions are not reused.
+TEXT_CACHE_VERSION = 1
+
+
+class ParsedTextCache:
+    """
+    Extracted document text keyed by file content hash.
+
+    Each entry is a gzip-compressed JSON list of the loader's pages (text plus
+    metadata such as page numbers), stored at <dir>/<hash[:2]>/<hash>.json.gz.
+    Re-chunking a file with different splitter settings then starts from the
+    cached pages instead of running PyPDFLoader/Docx2txtLoader again. Entries
+    are written to a temp file and renamed, so concurrent worker processes and
+    crashes never leave a partial entry behind.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, sha256: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, sha256[:2], f"{sha256}{extension}.json.gz")
+
+    def get(self, sha256: str, source: str) -> Optional[List[Document]]:
+        """Cached pages for this content, with `source` set to the file's current path."""
+        path = self._path(sha256, os.path.splitext(source)[1].lower())
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable parsed-text cache entry {path}: {e}")
+            return None
+        if payload.get("version") != TEXT_CACHE_VERSION:
+            return None
+        return [
+            Document(page_content=page["text"], metadata={**page["metadata"], "source": source})
+            for page in payload["pages"]
+        ]
+
+    def put(self, sha256: str, source: str, docs: List[Document]):
+        path = self._path(sha256, os.path.splitext(source)[1].lower())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        payload = {
+            "version": TEXT_CACHE_VERSION,
+            "pages": [{"text": d.page_content, "metadata": d.metadata} for d in docs],
+        }
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp_path, path)
@@ -0,0 +1,370 @@
+import os
+import math
+import pickle
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.faiss"
+STORE_FILENAME = "store.pkl"
+LEGACY_STORE_FILENAME = "index.pkl"  # LangChain FAISS.save_local docstore pickle
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# k-means wants roughly this many training points per centroid.
+MIN_POINTS_PER_CENTROID = 39
+
+_INT_ID_MASK = (1 << 63) - 1
+
+
+def stable_int_id(chunk_id: str) -> int:
+    """Deterministic non-negative int64 FAISS id for a chunk id."""
+    return int.from_bytes(hashlib.blake2b(chunk_id.encode("utf-8"), digest_size=8).digest(), "big") & _INT_ID_MASK
+
+
+@dataclass
+class IndexSpec:
+    """Index layout and search knobs (see the RAG_INDEX_* settings in Config)."""
+    index_type: str = "flat"
+    nlist: int = 0                # 0 = auto (about 4 * sqrt(n))
+    pq_m: int = 48
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 80
+    nprobe: int = 16
+    ef_search: int = 64
+    train_sample: int = 100_000
+    max_segments: int = 8
+    max_deleted_ratio: float = 0.3
+
+    @classmethod
+    def from_config(cls, config) -> "IndexSpec":
+        return cls(
+            index_type=config.RAG_INDEX_TYPE,
+            nlist=config.RAG_IVF_NLIST,
+            pq_m=config.RAG_PQ_M,
+            pq_nbits=config.RAG_PQ_NBITS,
+            hnsw_m=config.RAG_HNSW_M,
+            hnsw_ef_construction=config.RAG_HNSW_EF_CONSTRUCTION,
+            nprobe=config.RAG_NPROBE,
+            ef_search=config.RAG_EF_SEARCH,
+            train_sample=config.RAG_INDEX_TRAIN_SAMPLE,
+            max_segments=config.RAG_MAX_SEGMENTS,
+            max_deleted_ratio=config.RAG_SEGMENT_MAX_DELETED,
+        )
+
+
+def _pq_subquantizers(dim: int, m: int) -> int:
+    """Largest sub-quantizer count <= m that divides dim (PQ requirement)."""
+    m = max(1, min(m, dim))
+    while dim % m:
+        m -= 1
+    return m
+
+
+def resolve_index_type(spec: IndexSpec, n: int) -> Tuple[str, int]:
+    """
+    Picks the index type actually buildable for n vectors, and its nlist.
+    Trained types fall back to a simpler one when there is too little data
+    to train their quantizers.
+    """
+    if spec.index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{spec.index_type}'. Use one of {INDEX_TYPES}.")
+    if spec.index_type in ("flat", "hnsw"):
+        return spec.index_type, 0
+
+    nlist = spec.nlist or int(4 * math.sqrt(max(n, 1)))
+    nlist = min(nlist, n // MIN_POINTS_PER_CENTROID)
+    if nlist < 16:
+        return "flat", 0
+    if spec.index_type == "ivf_pq" and n < MIN_POINTS_PER_CENTROID * (2 ** spec.pq_nbits):
+        return "ivf_flat", nlist
+    return spec.index_type, nlist
+
+
+def build_faiss_index(vectors: np.ndarray, spec: IndexSpec) -> Tuple[faiss.Index, str]:
+    """Creates (and trains on a random sample, if needed) an empty ID-mapped index."""
+    n, dim = vectors.shape
+    index_type, nlist = resolve_index_type(spec, n)
+
+    if index_type == "flat":
+        base = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        base = faiss.IndexHNSWFlat(dim, spec.hnsw_m)
+        base.hnsw.efConstruction = spec.hnsw_ef_construction
+    else:
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            base = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            m = _pq_subquantizers(dim, spec.pq_m)
+            base = faiss.IndexIVFPQ(quantizer, dim, nlist, m, spec.pq_nbits)
+
+    if not base.is_trained:
+        sample = vectors
+        if n > spec.train_sample:
+            rows = np.random.default_rng(0).choice(n, spec.train_sample, replace=False)
+            sample = vectors[rows]
+        base.train(np.ascontiguousarray(sample, dtype=np.float32))
+        logger.info(f"Trained {index_type} index (nlist={nlist}) on {len(sample)} vectors.")
+
+    return faiss.IndexIDMap2(base), index_type
+
+
+class VectorIndex:
+    """
+    FAISS index plus the documents it points to.
+
+    The FAISS index is always wrapped in IndexIDMap2 so every vector carries an
+    explicit int64 id derived from its stable chunk id, valid across removals
+    and independent of the underlying layout (flat, IVF, HNSW, PQ). Adding an
+    existing chunk id replaces it. Index types that cannot remove vectors (HNSW)
+    get tombstones that are filtered out at query time.
+    """
+    def __init__(self, index: faiss.Index, index_type: str, spec: IndexSpec):
+        self.index = index
+        self.index_type = index_type
+        self.spec = spec
+        self.docstore: Dict[str, Document] = {}
+        self.id_map: Dict[int, str] = {}
+        self.chunk_to_int: Dict[str, int] = {}
+        self.tombstones: Set[int] = set()
+        self.trained_on = 0
+        self.mmapped = False
+        self.source_path: Optional[str] = None
+        self._apply_search_params()
+
+    def __len__(self) -> int:
+        return len(self.docstore)
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size: vectors (unless their IVF lists are memory-mapped) plus document text."""
+        vectors = 0 if self.mmapped else self.index.ntotal * self.index.d * 4
+        text = sum(len(doc.page_content) for doc in self.docstore.values())
+        return vectors + text + 256 * len(self.docstore)
+
+    @property
+    def base(self) -> faiss.Index:
+        return faiss.downcast_index(self.index.index)
+
+    def _apply_search_params(self):
+        base = self.base
+        if isinstance(base, faiss.IndexIVF):
+            base.nprobe = min(self.spec.nprobe, base.nlist)
+        elif isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = self.spec.ef_search
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        """Adjusts the recall/latency knobs at runtime (IVF nprobe, HNSW efSearch)."""
+        if nprobe:
+            self.spec.nprobe = nprobe
+        if ef_search:
+            self.spec.ef_search = ef_search
+        self._apply_search_params()
+
+    # ------------------------------------------------------------------
+    # Construction / persistence
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, docs: List[Document], vectors: np.ndarray, chunk_ids: List[str], spec: IndexSpec) -> "VectorIndex":
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        index, index_type = build_faiss_index(vectors, spec)
+        store = cls(index, index_type, spec)
+        store.trained_on = len(vectors)
+        store.add(docs, vectors, chunk_ids)
+        logger.info(f"Built {index_type} vector index with {len(docs)} chunks.")
+        return store
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        store_path = os.path.join(directory, STORE_FILENAME)
+        faiss.write_index(self.index, f"{index_path}.tmp")
+        with open(f"{store_path}.tmp", "wb") as f:
+            pickle.dump({
+                "index_type": self.index_type,
+                "docstore": self.docstore,
+                "id_map": self.id_map,
+                "tombstones": self.tombstones,
+                "trained_on": self.trained_on,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{index_path}.tmp", index_path)
+        os.replace(f"{store_path}.tmp", store_path)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, INDEX_FILENAME))
+
+    @staticmethod
+    def _read_index(path: str, mmap: bool) -> Tuple[faiss.Index, bool]:
+        """
+        Reads an index, memory-mapped if asked and supported. Returns (index,
+        mapped). FAISS only maps IVF inverted lists; other layouts (flat, HNSW)
+        accept the flag but are read into RAM, so they are reported as not mapped.
+        """
+        if mmap:
+            try:
+                index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+                if isinstance(base, faiss.IndexIVF):
+                    return index, True
+            except RuntimeError as e:
+                logger.info(f"Index type cannot be memory-mapped, reading into RAM: {e}")
+        return faiss.read_index(path), False
+
+    @classmethod
+    def load(cls, directory: str, spec: IndexSpec, mmap: bool = True) -> "VectorIndex":
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        store_path = os.path.join(directory, STORE_FILENAME)
+        if not os.path.exists(store_path) and os.path.exists(os.path.join(directory, LEGACY_STORE_FILENAME)):
+            return cls._load_legacy(directory, spec)
+
+        index, mmapped = cls._read_index(index_path, mmap)
+        with open(store_path, "rb") as f:
+            state = pickle.load(f)
+
+        store = cls(index, state["index_type"], spec)
+        store.docstore = state["docstore"]
+        store.id_map = state["id_map"]
+        store.chunk_to_int = {chunk_id: int_id for int_id, chunk_id in store.id_map.items()}
+        store.tombstones = state["tombstones"]
+        store.trained_on = state["trained_on"]
+        store.mmapped = mmapped
+        store.source_path = index_path
+        logger.info(f"Loaded {store.index_type} vector index with {len(store)} chunks (mmap={mmapped}).")
+        return store
+
+    @classmethod
+    def _load_legacy(cls, directory: str, spec: IndexSpec) -> "VectorIndex":
+        """Converts an index written by LangChain's FAISS.save_local into this layout."""
+        index = faiss.read_index(os.path.join(directory, INDEX_FILENAME))
+        with open(os.path.join(directory, LEGACY_STORE_FILENAME), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+
+        positions = sorted(index_to_docstore_id)
+        vectors = index.reconstruct_n(0, index.ntotal)[positions]
+        chunk_ids = [index_to_docstore_id[p] for p in positions]
+        docs = [docstore.search(chunk_id) for chunk_id in chunk_ids]
+        for chunk_id, doc in zip(chunk_ids, docs):
+            doc.metadata.setdefault("chunk_id", chunk_id)
+        logger.info(f"Migrating legacy LangChain FAISS index with {len(docs)} chunks.")
+        store = cls.build(docs, vectors, chunk_ids, spec)
+        store.save(directory)
+        return store
+
+    def copy(self) -> "VectorIndex":
+        """Independent writable copy (the FAISS index is cloned into RAM)."""
+        index = faiss.read_index(self.source_path) if self.mmapped else faiss.clone_index(self.index)
+        clone = VectorIndex(index, self.index_type, self.spec)
+        clone.docstore = dict(self.docstore)
+        clone.id_map = dict(self.id_map)
+        clone.chunk_to_int = dict(self.chunk_to_int)
+        clone.tombstones = set(self.tombstones)
+        clone.trained_on = self.trained_on
+        return clone
+
+    def remap(self, directory: str):
+        """Swaps the in-RAM FAISS index for a memory map of the copy just saved to `directory`."""
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        index, mmapped = self._read_index(index_path, True)
+        if mmapped:
+            self.index = index
+            self.mmapped = True
+            self.source_path = index_path
+            self._apply_search_params()
+
+    def _ensure_writable(self):
+        """Memory-mapped indexes are read-only; pull the index into RAM before mutating it."""
+        if self.mmapped:
+            self.index = faiss.read_index(self.source_path)
+            self.mmapped = False
+            self._apply_search_params()
+            logger.info("Loaded memory-mapped index into RAM for writing.")
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def _assign_int_id(self, chunk_id: str) -> int:
+        """Stable id for a new chunk, probing past tombstoned ids and (astronomically rare) collisions."""
+        int_id = stable_int_id(chunk_id)
+        while int_id in self.tombstones or int_id in self.id_map:
+            int_id = (int_id + 1) & _INT_ID_MASK
+        return int_id
+
+    def add(self, docs: List[Document], vectors: np.ndarray, chunk_ids: List[str]):
+        """Adds chunks; chunk ids that are already indexed are replaced (upsert)."""
+        if not docs:
+            return
+        self._ensure_writable()
+        self.delete([c for c in chunk_ids if c in self.chunk_to_int])
+        int_ids = np.asarray([self._assign_int_id(c) for c in chunk_ids], dtype=np.int64)
+        self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), int_ids)
+        for int_id, chunk_id, doc in zip(int_ids.tolist(), chunk_ids, docs):
+            self.docstore[chunk_id] = doc
+            self.id_map[int_id] = chunk_id
+            self.chunk_to_int[chunk_id] = int_id
+
+    def delete(self, chunk_ids: List[str]) -> int:
+        """Removes chunks by id; unknown ids are ignored. Returns how many were removed."""
+        int_ids = [self.chunk_to_int[c] for c in chunk_ids if c in self.chunk_to_int]
+        if not int_ids:
+            return 0
+        self._ensure_writable()
+        try:
+            self.index.remove_ids(np.asarray(int_ids, dtype=np.int64))
+        except RuntimeError:
+            # e.g. HNSW: the graph cannot drop nodes, hide them at query time instead.
+            self.tombstones.update(int_ids)
+        for int_id in int_ids:
+            chunk_id = self.id_map.pop(int_id)
+            del self.chunk_to_int[chunk_id]
+            del self.docstore[chunk_id]
+        return len(int_ids)
+
+    def needs_rebuild(self) -> bool:
+        """
+        True when the layout should be rebuilt: the configured type became
+        trainable since the last build, the corpus outgrew the training sample
+        by 4x, or tombstones make up a quarter of the index.
+        """
+        n = len(self.docstore)
+        target, _ = resolve_index_type(self.spec, n)
+        if target != self.index_type:
+            return True
+        if self.index_type in ("ivf_flat", "ivf_pq") and n > 4 * max(self.trained_on, 1):
+            return True
+        return len(self.tombstones) > max(1000, n // 4)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get(self, chunk_id: str) -> Optional[Document]:
+        return self.docstore.get(chunk_id)
+
+    def search(self, query_vector: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """Returns up to k (document, L2 distance) pairs, nearest first."""
+        if self.index.ntotal == 0:
+            return []
+        fetch_k = min(k + len(self.tombstones), self.index.ntotal)
+        query = np.asarray([query_vector], dtype=np.float32)
+        distances, ids = self.index.search(query, fetch_k)
+
+        results = []
+        for distance, int_id in zip(distances[0], ids[0]):
+            int_id = int(int_id)
+            if int_id < 0 or int_id in self.tombstones:
+                continue
+            chunk_id = self.id_map.get(int_id)
+            if chunk_id is None:
+                continue
+            results.append((self.docstore[chunk_id], float(distance)))
+            if len(results) == k:
+                break
+        return results
@@ -1,221 +1,726 @@
 
-import json
 import os
+import time
+import bisect
+import heapq
+import itertools
 import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
+from app.config import Config
 from app.services.whatsapp_service import whatsapp_service
 from app.services.reminder_service import ReminderService
+from app.services.chunked_collections import ChunkedSortedList, ShardedDict
+from app.services.interval_index import IntervalIndex
+from app.services import recurrence
+from app.services.free_slots import find_conflicts
+from app.services.meeting import LOCAL_TZ, Meeting, format_local, parse_local, to_timestamp
+from app.services.meeting_store import MeetingStore
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Legacy JSON storage, imported once into the SQLite store (Config.MEETINGS_DB).
 MEETINGS_FILE = os.path.join(os.path.dirname(__file__), 'meetings.json')
 
+# Reminder jobs survive restarts in this job store; internal interval jobs stay in memory.
+PERSISTENT_JOBSTORE = "persistent"
+REMINDER_LEAD = timedelta(minutes=10)
+
+
+def send_reminder(message: str):
+    """
+    Job callable for persisted reminders. Module-level (not a bound method or
+    lambda) so the job store can serialize it by reference.
+    """
+    logger.info(message)
+    whatsapp_service.send_message(message)
+
+
+def add_reminder_job(scheduler: BackgroundScheduler, job_id: str, run_date: datetime, message: str):
+    """Adds or replaces one persisted reminder job."""
+    scheduler.add_job(
+        send_reminder,
+        trigger=DateTrigger(run_date=run_date),
+        args=[message],
+        id=job_id,
+        jobstore=PERSISTENT_JOBSTORE,
+        replace_existing=True,
+        # Still deliver a reminder missed during a short downtime, up to the meeting start.
+        misfire_grace_time=int(REMINDER_LEAD.total_seconds()),
+    )
+
+
+def remove_reminder_job(scheduler: BackgroundScheduler, job_id: str):
+    try:
+        scheduler.remove_job(job_id, jobstore=PERSISTENT_JOBSTORE)
+    except JobLookupError:
+        pass
+
+
+def _reminder_job_id(meeting_id: int) -> str:
+    return f"meeting_reminder_{meeting_id}"
+
+
+def _start_key(meeting: Meeting) -> Tuple[float, int]:
+    # The id breaks ties, so (start_ts, id) is a stable position for pagination cursors.
+    return meeting.start_ts, meeting.id
+
+
+@dataclass
+class MeetingState:
+    """
+    One consistent view of the meetings: the start-ordered list, the interval
+    index and the recurring series. Published states are never mutated;
+    writers copy() the current one, change the copy and swap it in (Meeting
+    objects are immutable too), so readers can keep using whatever state
+    they picked up without taking a lock.
+
+    The list, the index and by_id are chunked collections: copy() only copies
+    their chunk tables and a write rebuilds the chunks it touches, so a write
+    stays O(sqrt(n))-ish rather than duplicating every meeting.
+    """
+    meetings: ChunkedSortedList = field(default_factory=lambda: ChunkedSortedList(key=_start_key))
+    index: IntervalIndex = field(default_factory=IntervalIndex)  # meeting id -> [start_ts, end_ts)
+    by_id: ShardedDict = field(default_factory=ShardedDict)  # meeting id -> Meeting
+    series: Dict[int, Meeting] = field(default_factory=dict)  # recurring series by id, one row each
+    version: int = 0
+
+    def copy(self) -> "MeetingState":
+        return MeetingState(self.meetings.copy(), self.index.copy(), self.by_id.copy(), dict(self.series), self.version)
+
+    def insert(self, meeting: Meeting):
+        """Inserts in start order and indexes the meeting's time span, without a full re-sort."""
+        self.meetings.add(meeting)
+        self.by_id[meeting.id] = meeting
+        self.index.add(meeting.id, meeting.start_ts, meeting.end_ts)
+
+    def extend(self, meetings: Iterable[Meeting]):
+        """Inserts many meetings with a single merge when they are a large share of the list."""
+        added = list(meetings)
+        self.meetings.update(added)
+        for meeting in added:
+            self.by_id[meeting.id] = meeting
+        self.index.add_many((m.id, m.start_ts, m.end_ts) for m in added)
+
+    def remove(self, meeting_ids: Iterable[int]) -> List[Meeting]:
+        removed = []
+        for meeting_id in set(meeting_ids):
+            meeting = self.by_id.pop(meeting_id, None)
+            if meeting is None:
+                continue
+            self.meetings.remove(meeting)
+            self.index.remove(meeting_id)
+            removed.append(meeting)
+        return removed
+
+    def replace(self, meeting: Meeting):
+        """Swaps in a new version of a meeting whose start and duration are unchanged."""
+        self.meetings.remove(self.by_id[meeting.id])
+        self.meetings.add(meeting)
+        self.by_id[meeting.id] = meeting
+
+
 class MeetingScheduler:
     """
     Handles meeting storage, conflict detection, and background reminders.
+
+    Writers (tools, API requests, the reminder and cleanup threads) are
+    serialized by one lock; readers work on the current immutable
+    MeetingState and never block.
     """
-    def __init__(self):
-        self.meetings: List[Dict] = []
-        self.scheduler = BackgroundScheduler()
+    def __init__(self, store: Optional[MeetingStore] = None):
+        self.store = store or MeetingStore()
+        self._state = MeetingState()
+        self._write_lock = threading.RLock()
+        self._instance_id = f"{time.time_ns():x}"  # keeps ETags from a previous process from matching
+        self.scheduler = BackgroundScheduler(jobstores={
+            "default": MemoryJobStore(),
+            PERSISTENT_JOBSTORE: SQLAlchemyJobStore(url=Config.SCHEDULER_JOBS_DB_URL),
+        })
         self.reminder_service = ReminderService(self)
         self.load_meetings()
         # Note: We don't start it here, we let the startup event handle it.
         # But we initialize it for tool usage.
 
+    # ------------------------------------------------------------------
+    # Snapshot access
+    # ------------------------------------------------------------------
+    @property
+    def state(self) -> MeetingState:
+        return self._state
+
+    @property
+    def meetings(self) -> ChunkedSortedList:
+        """One-off meetings sorted by start time (a snapshot; do not modify)."""
+        return self._state.meetings
+
+    @property
+    def series(self) -> Dict[int, Meeting]:
+        return self._state.series
+
+    @property
+    def version(self) -> int:
+        """Incremented on every change."""
+        return self._state.version
+
+    @property
+    def etag(self) -> str:
+        """Entity tag of the current meeting state."""
+        return self.etag_for(self._state.version)
+
+    def etag_for(self, version: int, *qualifiers) -> str:
+        """ETag of a state version, optionally narrowed by what else the response depends on."""
+        return '"' + "-".join([self._instance_id, str(version), *(str(q) for q in qualifiers)]) + '"'
+
+    @contextmanager
+    def _writing(self) -> Iterator[MeetingState]:
+        """Copy of the current state to change; published when the block exits without error."""
+        with self._write_lock:
+            work = self._state.copy()
+            yield work
+            work.version += 1
+            self._state = work
+
     def load_meetings(self):
-        """Loads meetings from JSON file."""
-        if os.path.exists(MEETINGS_FILE):
+        """Loads meetings from the SQLite store (importing a legacy meetings.json once)."""
+        with self._write_lock:
+            state = MeetingState(version=self._state.version + 1)
+            imported = 0
             try:
-                with open(MEETINGS_FILE, 'r') as f:
-                    self.meetings = json.load(f)
-                logger.info(f"Loaded {len(self.meetings)} meetings.")
+                imported = self.store.import_json(MEETINGS_FILE)
+                rows = self.store.all()
+                state.series = {m.id: m for m in rows if m.rrule}
+                state.extend(m for m in rows if not m.rrule)
+                logger.info(f"Loaded {len(state.meetings)} meetings and {len(state.series)} recurring series.")
             except Exception as e:
                 logger.error(f"Error loading meetings: {e}")
-                self.meetings = []
+            self._state = state
+
+            for meeting in state.meetings:
+                self.reminder_service.schedule(meeting)
+            for series in state.series.values():
+                self._schedule_series_reminder(series)
+            if imported:
+                # Legacy meetings never had persisted reminder jobs; create them once, as add_meeting would.
+                for meeting in state.meetings:
+                    if not meeting.reminded:
+                        self._schedule_reminder_job(meeting)
+
+    def get_meeting(self, meeting_id: int) -> Optional[Meeting]:
+        """A one-off meeting, or for a series id its next occurrence awaiting a reminder."""
+        state = self._state
+        series = state.series.get(meeting_id)
+        if series is not None:
+            return self._pending_occurrence(series)
+        return state.by_id.get(meeting_id)
+
+    # ------------------------------------------------------------------
+    # Reminders
+    # ------------------------------------------------------------------
+    def _pending_occurrence(self, series: Meeting) -> Optional[Meeting]:
+        """Next occurrence not yet reminded; occurrences missed while the server was down are skipped."""
+        after = time.time() - 5 * 60
+        if series.reminded_through is not None:
+            after = max(after, series.reminded_through)
+        occurrence = recurrence.next_occurrence(series, after)
+        return recurrence.occurrence_view(series, occurrence) if occurrence is not None else None
+
+    def _schedule_series_reminder(self, series: Meeting):
+        """Only the next occurrence of a series is queued; the following one is queued once it is reminded."""
+        occurrence = self._pending_occurrence(series)
+        if occurrence is not None:
+            self.reminder_service.schedule(occurrence)
         else:
-            self.meetings = []
+            self.reminder_service.cancel(series.id)
 
-    def save_meetings(self):
-        """Saves meetings to JSON file."""
-        try:
-            with open(MEETINGS_FILE, 'w') as f:
-                json.dump(self.meetings, f, indent=4)
-            logger.info("Meetings saved.")
-        except Exception as e:
-            logger.error(f"Error saving meetings: {e}")
-
-    def _reminder_job(self, title: str):
-        """Callback function for the reminder."""
-        msg = f"🔔 Reminder: Meeting '{title}' is starting soon!"
-        logger.info(msg)
-        
-        # Send WhatsApp Notification
-        whatsapp_service.send_message(msg)
-
-    def _reschedule_reminders(self):
-        """Re-adds reminders for all future meetings on startup."""
-        self.scheduler.remove_all_jobs()
-        now = datetime.now()
-        for meeting in self.meetings:
+    def set_reminded(self, meeting: Meeting, reminded: bool = True):
+        """Persists a meeting's reminded flag (single-row update)."""
+        if meeting.rrule:
+            self._set_series_reminded(meeting)
+            return
+        with self._write_lock:
+            current = self._state.by_id.get(meeting.id)
+            if current is None:
+                return
             try:
-                start_dt = datetime.strptime(meeting['start'], "%Y-%m-%d %H:%M")
-                # Schedule reminder 10 minutes before, or immediately if within window
-                reminder_time = start_dt - timedelta(minutes=10)
-                
-                if reminder_time > now:
-                    self.scheduler.add_job(
-                        self._reminder_job,
-                        trigger=DateTrigger(run_date=reminder_time),
-                        args=[meeting['title']],
-                        id=f"reminder_{meeting['start']}_{meeting['title']}"
-                    )
-            except ValueError:
-                continue
+                self.store.update(meeting.id, reminded=reminded)
+            except Exception as e:
+                logger.error(f"Error saving reminder state for '{meeting.title}': {e}")
+                return
+            with self._writing() as work:
+                work.replace(current.with_changes(reminded=reminded))
 
-    def check_conflicts(self, new_start: datetime, duration_minutes: int) -> bool:
+    def _set_series_reminded(self, occurrence: Meeting):
+        with self._write_lock:
+            series = self._state.series.get(occurrence.series_id)
+            if series is None:
+                return
+            try:
+                self.store.update(series.id, reminded_through=occurrence.start_ts)
+            except Exception as e:
+                # Not re-queued (it would fire again at once); the next load picks the series up.
+                logger.error(f"Error saving reminder state for '{series.title}': {e}")
+                return
+            with self._writing() as work:
+                series = work.series[series.id] = series.with_changes(reminded_through=occurrence.start_ts)
+            self._schedule_series_reminder(series)
+
+    def _schedule_reminder_job(self, meeting: Meeting) -> bool:
         """
-        Checks if a new meeting overlaps with existing ones.
-        Returns True if there is a conflict.
+        Adds (or replaces) the persisted WhatsApp reminder job of one meeting.
+        Returns False if the reminder time has already passed.
         """
-        new_end = new_start + timedelta(minutes=duration_minutes)
+        reminder_ts = meeting.start_ts - REMINDER_LEAD.total_seconds()
+        if reminder_ts <= time.time():
+            self._unschedule_reminder_job(meeting.id)
+            return False
+        add_reminder_job(
+            self.scheduler, _reminder_job_id(meeting.id), datetime.fromtimestamp(reminder_ts, LOCAL_TZ),
+            f"🔔 Reminder: Meeting '{meeting.title}' is starting soon!",
+        )
+        return True
 
-        for meeting in self.meetings:
-            try:
-                existing_start = datetime.strptime(meeting['start'], "%Y-%m-%d %H:%M")
-                existing_end = existing_start + timedelta(minutes=meeting['duration'])
+    def _unschedule_reminder_job(self, meeting_id: int):
+        remove_reminder_job(self.scheduler, _reminder_job_id(meeting_id))
 
-                # Overlap logic: (StartA < EndB) and (EndA > StartB)
-                if new_start < existing_end and new_end > existing_start:
-                    return True
-            except ValueError:
-                continue
-        return False
+    # ------------------------------------------------------------------
+    # Queries (lock-free, on one snapshot)
+    # ------------------------------------------------------------------
+    def _has_conflict(self, start_ts: float, end_ts: float, exclude_id: Optional[int] = None) -> bool:
+        state = self._state
+        # Overlap logic: (StartA < EndB) and (EndA > StartB), answered by the interval index
+        if state.index.has_overlap(start_ts, end_ts, exclude=exclude_id):
+            return True
+        # Recurring series are expanded for this window only.
+        return any(
+            recurrence.occurrences(series, start_ts, end_ts)
+            for series_id, series in state.series.items() if series_id != exclude_id
+        )
+
+    def check_conflicts(self, new_start: datetime, duration_minutes: int, exclude_id: Optional[int] = None) -> bool:
+        """
+        Checks if a new meeting overlaps with existing ones (optionally ignoring
+        one meeting, e.g. the one being moved). Returns True if there is a conflict.
+        Naive datetimes are local time.
+        """
+        start_ts = to_timestamp(new_start)
+        return self._has_conflict(start_ts, start_ts + duration_minutes * 60, exclude_id)
+
+    def meetings_between(self, start: datetime, end: datetime) -> List[Meeting]:
+        """Meetings and series occurrences overlapping [start, end), in start order."""
+        return self.meetings_in_range(to_timestamp(start), to_timestamp(end))
+
+    def meetings_in_range(self, start_ts: float, end_ts: float) -> List[Meeting]:
+        state = self._state
+        one_offs = [state.by_id[meeting_id] for meeting_id in state.index.overlapping(start_ts, end_ts)]
+        if not state.series:
+            return one_offs
+        return sorted(one_offs + recurrence.expand(state.series.values(), start_ts, end_ts), key=_start_key)
+
+    def page(self, start_ts: Optional[float] = None, end_ts: Optional[float] = None,
+             after: Optional[Tuple[float, int]] = None, limit: Optional[int] = None
+             ) -> Tuple[List[Meeting], Optional[Tuple[float, int]], int]:
+        """
+        One page of meetings in (start, id) order, read from a single snapshot.
+        Without a range this is the one-off meetings list plus the next upcoming
+        occurrence of each recurring series; with one, meetings and series
+        occurrences overlapping [start_ts, end_ts) from the interval index.
+        `after` is the (start_ts, id) of the last item already returned.
+        Returns (meetings, cursor for the next page or None, snapshot version).
+        """
+        state = self._state
+        if start_ts is None and end_ts is None:
+            sources = [state.meetings, self._upcoming_occurrences(state)]
+        else:
+            start_ts = start_ts if start_ts is not None else 0.0
+            end_ts = end_ts if end_ts is not None else start_ts + timedelta(days=Config.MEETINGS_MAX_RANGE_DAYS).total_seconds()
+            one_offs = [state.by_id[meeting_id] for meeting_id in state.index.overlapping(start_ts, end_ts)]
+            sources = [sorted(one_offs + recurrence.expand(state.series.values(), start_ts, end_ts), key=_start_key)]
+
+        # Each source is already in order: seek past the cursor in each and merge only one page.
+        streams = []
+        for items in sources:
+            position = bisect.bisect_right(items, after, key=_start_key) if after else 0
+            streams.append(map(items.__getitem__, range(position, len(items))))
+        merged = heapq.merge(*streams, key=_start_key)
+        result = list(itertools.islice(merged, limit + 1 if limit is not None else None))
+        cursor = None
+        if limit is not None and len(result) > limit:
+            result = result[:limit]
+            cursor = _start_key(result[-1])
+        return result, cursor, state.version
 
-    def add_meeting(self, title: str, start_time_str: str, duration_minutes: int = 30) -> str:
+    def _upcoming_occurrences(self, state: MeetingState) -> List[Meeting]:
+        """The next occurrence of each series (as list_meetings shows them), in start order."""
+        now = time.time()
+        views = []
+        for series in state.series.values():
+            upcoming = recurrence.next_occurrence(series, now)
+            if upcoming is not None:
+                views.append(recurrence.occurrence_view(series, upcoming))
+        views.sort(key=_start_key)
+        return views
+
+    def occurrence_boundary(self) -> Optional[float]:
+        """
+        Start of the soonest upcoming series occurrence. Listings that show
+        "next" occurrences change once the clock passes it, even though the
+        state version does not.
+        """
+        upcoming = self._upcoming_occurrences(self._state)
+        return min(m.start_ts for m in upcoming) if upcoming else None
+
+    # ------------------------------------------------------------------
+    # Changes (serialized by the write lock)
+    # ------------------------------------------------------------------
+    def add_meeting(self, title: str, start_time_str: str, duration_minutes: int = 30, rrule: Optional[str] = None) -> str:
         """
         Adds a new meeting if no conflict exists.
         start_time_str format: "YYYY-MM-DD HH:MM"
+        rrule: optional recurrence rule, e.g. "FREQ=WEEKLY;BYDAY=MO;COUNT=52"
         """
         try:
-            start_dt = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M")
+            start_ts = parse_local(start_time_str).timestamp()
         except ValueError:
             return "❌ Invalid date format. Please use 'YYYY-MM-DD HH:MM'."
 
-        if start_dt < datetime.now():
+        if start_ts < time.time():
             return "❌ Cannot schedule meetings in the past."
 
-        if self.check_conflicts(start_dt, duration_minutes):
-            return f"❌ Conflict detected. You already have a meeting around {start_time_str}."
-
-        # Add meeting
-        meeting = {
-            "title": title,
-            "start": start_time_str,
-            "duration": duration_minutes,
-            "reminded": False
-        }
-        self.meetings.append(meeting)
-        # Sort by start time
-        self.meetings.sort(key=lambda x: x['start'])
-        
-        self.save_meetings()
-
-        # Schedule reminder
-        reminder_time = start_dt - timedelta(minutes=10)
-        if reminder_time > datetime.now():
-            self.scheduler.add_job(
-                self._reminder_job,
-                trigger=DateTrigger(run_date=reminder_time),
-                args=[title],
-                id=f"reminder_{start_time_str}_{title}"
-            )
-            reminder_msg = " (Reminder set for 10 mins before)"
-        else:
-            reminder_msg = ""
+        if rrule:
+            return self._add_series(title, start_ts, duration_minutes, rrule)
 
-        return f"✅ Scheduled '{title}' on {start_time_str} for {duration_minutes} mins.{reminder_msg}"
+        # Check and insert under the lock, so two requests cannot both take the same slot.
+        with self._write_lock:
+            if self._has_conflict(start_ts, start_ts + duration_minutes * 60):
+                return f"❌ Conflict detected. You already have a meeting around {start_time_str}."
+
+            # Add meeting (one row insert, then kept in start order in memory)
+            try:
+                meeting = self.store.insert(title, start_ts, duration_minutes)
+            except Exception as e:
+                logger.error(f"Error saving meeting: {e}")
+                return f"❌ Could not save meeting: {e}"
+            with self._writing() as work:
+                work.insert(meeting)
+            self.reminder_service.schedule(meeting)
+
+            # Schedule reminder
+            if self._schedule_reminder_job(meeting):
+                reminder_msg = " (Reminder set for 10 mins before)"
+            else:
+                reminder_msg = ""
 
         return f"✅ Scheduled '{title}' on {start_time_str} for {duration_minutes} mins.{reminder_msg}"
 
+    def _add_series(self, title: str, start_ts: float, duration_minutes: int, rule: str) -> str:
+        try:
+            rule = recurrence.validate_rule(rule, start_ts)
+        except ValueError as e:
+            return f"❌ {e}"
+
+        with self._write_lock:
+            # Conflicts are checked over a bounded horizon, not the whole (possibly endless) series.
+            draft = Meeting(id=0, title=title, start_ts=start_ts, duration=duration_minutes, rrule=rule)
+            horizon = start_ts + timedelta(days=Config.RECURRENCE_HORIZON_DAYS).total_seconds()
+            for occurrence in recurrence.occurrences(draft, start_ts, horizon):
+                if self._has_conflict(occurrence, occurrence + duration_minutes * 60):
+                    return f"❌ Conflict detected. The occurrence on {format_local(occurrence)} overlaps an existing meeting."
+
+            try:
+                series = self.store.insert(title, start_ts, duration_minutes, rrule=rule)
+            except Exception as e:
+                logger.error(f"Error saving recurring meeting: {e}")
+                return f"❌ Could not save meeting: {e}"
+            with self._writing() as work:
+                work.series[series.id] = series
+            self._schedule_series_reminder(series)
+        return f"✅ Scheduled recurring '{title}' from {series.start} ({rule}) for {duration_minutes} mins."
+
+    def import_meetings(self, events: Iterable, skip_conflicts: bool = True) -> Dict:
+        """
+        Bulk import, e.g. the events of an .ics file (see app.services.ics.iter_events,
+        which yields events and per-event errors). Events are validated first,
+        then checked for conflicts in one sorted sweep against the existing
+        meetings and each other, and all accepted ones are stored in a single
+        transaction. Conflicting events are skipped, or with
+        skip_conflicts=False any conflict or error imports nothing.
+        Events starting in the past are skipped (skipped_past), as add_meeting
+        rejects them. Returns a report: imported, skipped_past, conflicts and errors.
+        """
+        now = time.time()
+        horizon = timedelta(days=Config.RECURRENCE_HORIZON_DAYS).total_seconds()
+        drafts: List[Meeting] = []
+        errors: List[str] = []
+        skipped_past = 0
+        for event in events:
+            if isinstance(event, Exception):
+                errors.append(str(event))
+                continue
+            # Same rule as add_meeting: nothing (one-off or series) may start in the past.
+            if event.start_ts < now:
+                skipped_past += 1
+                continue
+            try:
+                rule = recurrence.validate_rule(event.rrule, event.start_ts) if event.rrule else None
+            except ValueError as e:
+                errors.append(f"line {event.line}: {e}")
+                continue
+            drafts.append(Meeting(id=0, title=event.title, start_ts=event.start_ts, duration=event.duration,
+                                  rrule=rule, exdates=event.exdates if rule else frozenset()))
+
+        # (start, end, draft position); series contribute their occurrences over the horizon.
+        candidates = []
+        for position, draft in enumerate(drafts):
+            if draft.rrule:
+                candidates.extend((ts, ts + draft.duration * 60, position)
+                                  for ts in recurrence.occurrences(draft, draft.start_ts, draft.start_ts + horizon))
+            else:
+                candidates.append((draft.start_ts, draft.end_ts, position))
+
+        with self._write_lock:
+            state = self._state
+            busy = []
+            if candidates:
+                low = min(c[0] for c in candidates)
+                high = max(c[1] for c in candidates)
+                busy = [state.index.get(meeting_id) for meeting_id in state.index.overlapping(low, high)]
+                busy += [(o.start_ts, o.end_ts) for o in recurrence.expand(state.series.values(), low, high)]
+            conflicts = find_conflicts(candidates, busy)
+
+            report = {
+                "imported": 0,
+                "skipped_past": skipped_past,
+                "conflicts": [f"'{drafts[p].title}' at {drafts[p].start}" for p in sorted(conflicts)],
+                "errors": errors,
+            }
+            accepted = [draft for position, draft in enumerate(drafts) if position not in conflicts]
+            if not accepted or (not skip_conflicts and (conflicts or errors)):
+                return report
+
+            try:
+                stored = self.store.insert_many(accepted)
+            except Exception as e:
+                logger.error(f"Error saving imported meetings: {e}")
+                errors.append(f"Could not save meetings: {e}")
+                return report
+            with self._writing() as work:
+                work.extend(m for m in stored if not m.rrule)
+                work.series.update((m.id, m) for m in stored if m.rrule)
+            for meeting in stored:
+                if meeting.rrule:
+                    self._schedule_series_reminder(meeting)
+                else:
+                    self.reminder_service.schedule(meeting)
+                    self._schedule_reminder_job(meeting)
+
+        report["imported"] = len(stored)
+        logger.info(f"Imported {len(stored)} meetings ({len(conflicts)} conflicts, {len(errors)} errors).")
+        return report
+
+    def _find_occurrence(self, series_id: int, occurrence_str: str) -> Tuple[Optional[Meeting], Optional[float], str]:
+        """Resolves a series occurrence; returns (series, occurrence start, error message)."""
+        series = self._state.series.get(series_id)
+        if series is None:
+            return None, None, f"❌ No recurring meeting R{series_id}."
+        try:
+            occurrence = parse_local(occurrence_str).timestamp()
+        except ValueError:
+            return None, None, "❌ Invalid date format. Please use 'YYYY-MM-DD HH:MM'."
+        if occurrence not in recurrence.occurrences(series, occurrence, occurrence + 60):
+            return None, None, f"❌ '{series.title}' has no occurrence at {occurrence_str}."
+        return series, occurrence, ""
+
+    def cancel_occurrence(self, series_id: int, occurrence_str: str) -> str:
+        """Cancels a single occurrence of a recurring meeting (adds an exception date)."""
+        with self._write_lock:
+            series, occurrence, error = self._find_occurrence(series_id, occurrence_str)
+            if series is None:
+                return error
+            exdates = series.exdates | {occurrence}
+            try:
+                self.store.update(series_id, exdates=exdates)
+            except Exception as e:
+                logger.error(f"Error updating recurring meeting: {e}")
+                return f"❌ Could not update meeting: {e}"
+            with self._writing() as work:
+                series = work.series[series_id] = series.with_changes(exdates=exdates)
+            self._schedule_series_reminder(series)
+        return f"✅ Cancelled '{series.title}' on {occurrence_str}."
+
+    def reschedule_occurrence(self, series_id: int, occurrence_str: str, new_start_str: str,
+                              duration_minutes: Optional[int] = None, title: Optional[str] = None) -> str:
+        """Moves or edits a single occurrence: it becomes a one-off override linked to its series."""
+        try:
+            new_start = parse_local(new_start_str).timestamp()
+        except ValueError:
+            return "❌ Invalid date format. Please use 'YYYY-MM-DD HH:MM'."
+
+        with self._write_lock:
+            series, occurrence, error = self._find_occurrence(series_id, occurrence_str)
+            if series is None:
+                return error
+            duration = duration_minutes or series.duration
+            # Other occurrences of the same series are not checked against the override.
+            if self._has_conflict(new_start, new_start + duration * 60, exclude_id=series_id):
+                return f"❌ Conflict detected. You already have a meeting around {new_start_str}."
+
+            exdates = series.exdates | {occurrence}
+            try:
+                override = self.store.add_override(series_id, occurrence, exdates, title or series.title, new_start, duration)
+            except Exception as e:
+                logger.error(f"Error saving occurrence override: {e}")
+                return f"❌ Could not update meeting: {e}"
+            with self._writing() as work:
+                series = work.series[series_id] = series.with_changes(exdates=exdates)
+                work.insert(override)
+            self.reminder_service.schedule(override)
+            self._schedule_reminder_job(override)
+            self._schedule_series_reminder(series)
+        return f"✅ Moved '{series.title}' on {occurrence_str} to {new_start_str}."
+
+    def delete_series(self, series_id: int) -> str:
+        """Deletes a recurring meeting with all its overridden occurrences."""
+        with self._write_lock:
+            series = self._state.series.get(series_id)
+            if series is None:
+                return f"❌ No recurring meeting R{series_id}."
+            override_ids = [m.id for m in self._state.meetings if m.series_id == series_id]
+            try:
+                self.store.delete([series_id] + override_ids)
+            except Exception as e:
+                logger.error(f"Error deleting recurring meeting: {e}")
+                return f"❌ Could not delete meeting: {e}"
+            with self._writing() as work:
+                del work.series[series_id]
+                work.remove(override_ids)
+            for meeting_id in [series_id] + override_ids:
+                self.reminder_service.cancel(meeting_id)
+            for meeting_id in override_ids:
+                self._unschedule_reminder_job(meeting_id)
+        return f"✅ Deleted recurring meeting: '{series.title}'."
+
     def update_meeting(self, index: int, title: Optional[str] = None, start_time_str: Optional[str] = None, duration_minutes: Optional[int] = None) -> str:
         """
         Updates an existing meeting and resets the reminded flag if the start time changes.
         """
-        if not (1 <= index <= len(self.meetings)):
-            return f"❌ Invalid meeting index {index}."
+        with self._write_lock:
+            meetings = self._state.meetings
+            if not (1 <= index <= len(meetings)):
+                return f"❌ Invalid meeting index {index}."
+
+            meeting = meetings[index - 1]
+            new_start = meeting.start_ts
+            if start_time_str:
+                try:
+                    new_start = parse_local(start_time_str).timestamp()
+                except ValueError:
+                    return "❌ Invalid date format. Please use 'YYYY-MM-DD HH:MM'."
+            time_changed = new_start != meeting.start_ts
 
-        meeting = self.meetings[index - 1]
-        time_changed = False
+            new_duration = duration_minutes or meeting.duration
+            if time_changed or new_duration != meeting.duration:
+                # The meeting itself is excluded, so moving it within its own slot is fine.
+                if self._has_conflict(new_start, new_start + new_duration * 60, exclude_id=meeting.id):
+                    return f"❌ Conflict detected. You already have a meeting around {format_local(new_start)}."
 
-        if title:
-            meeting['title'] = title
-        if duration_minutes:
-            meeting['duration'] = duration_minutes
-        if start_time_str:
+            changes = {}
+            if title:
+                changes['title'] = title
+            if time_changed:
+                changes.update(start_ts=new_start, reminded=False)
+            if new_duration != meeting.duration:
+                changes['duration'] = new_duration
+            if not changes:
+                return f"✅ Updated meeting '{meeting.title}'."
             try:
-                new_start = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M")
-                if start_time_str != meeting['start']:
-                    if self.check_conflicts(new_start, duration_minutes or meeting['duration']):
-                        # Temp check: exclude current meeting from conflict if we were smarter, 
-                        # but simple check usually works for non-overlapping move
-                        pass 
-                    meeting['start'] = start_time_str
-                    time_changed = True
-            except ValueError:
-                return "❌ Invalid date format. Please use 'YYYY-MM-DD HH:MM'."
-
-        if time_changed:
-            meeting['reminded'] = False
-            logger.info(f"Meeting '{meeting['title']}' rescheduled. Reminded flag reset.")
-
-        self.save_meetings()
-        return f"✅ Updated meeting '{meeting['title']}'."
+                columns = {('start' if k == 'start_ts' else k): v for k, v in changes.items()}
+                self.store.update(meeting.id, **columns)
+            except Exception as e:
+                logger.error(f"Error updating meeting: {e}")
+                return f"❌ Could not update meeting: {e}"
+
+            updated = meeting.with_changes(**changes)
+            with self._writing() as work:
+                if time_changed or new_duration != meeting.duration:
+                    work.remove([meeting.id])
+                    work.insert(updated)
+                else:
+                    work.replace(updated)
+            if time_changed:
+                logger.info(f"Meeting '{updated.title}' rescheduled. Reminded flag reset.")
+            # Only this meeting's reminders are replaced (its title or time changed).
+            self.reminder_service.schedule(updated)
+            self._schedule_reminder_job(updated)
+
+        return f"✅ Updated meeting '{updated.title}'."
 
     def cleanup_meetings(self, hours_back: int = 24):
         """
         Removes meetings that ended more than hours_back ago.
         """
-        now = datetime.now()
-        original_count = len(self.meetings)
-        
-        updated_meetings = []
-        for m in self.meetings:
+        cutoff = time.time() - hours_back * 3600
+        with self._write_lock:
+            expired = set(self._state.index.ending_before(cutoff))
+            if not expired:
+                return
             try:
-                end_dt = datetime.strptime(m['start'], "%Y-%m-%d %H:%M") + timedelta(minutes=m['duration'])
-                if end_dt > (now - timedelta(hours=hours_back)):
-                    updated_meetings.append(m)
-            except Exception:
-                updated_meetings.append(m) # Keep if unparseable to be safe
-        
-        if len(updated_meetings) < original_count:
-            self.meetings = updated_meetings
-            self.save_meetings()
-            logger.info(f"Cleaned up {original_count - len(updated_meetings)} expired meetings.")
+                self.store.delete(expired)
+            except Exception as e:
+                logger.error(f"Error cleaning up meetings: {e}")
+                return
+            with self._writing() as work:
+                work.remove(expired)
+            for meeting_id in expired:
+                self.reminder_service.cancel(meeting_id)
+                self._unschedule_reminder_job(meeting_id)
+        logger.info(f"Cleaned up {len(expired)} expired meetings.")
 
     def list_meetings(self) -> str:
         """Returns a formatted list of upcoming meetings."""
-        if not self.meetings:
+        state = self._state
+        if not state.meetings and not state.series:
             return "No upcoming meetings scheduled."
 
         output = "📅 **Upcoming Meetings:**\n"
-        for idx, m in enumerate(self.meetings):
-            output += f"{idx + 1}. **{m['start']}** ({m['duration']} mins): {m['title']}\n"
+        for idx, m in enumerate(state.meetings):
+            output += f"{idx + 1}. **{m.start}** ({m.duration} mins): {m.title}\n"
+        if state.series:
+            output += "🔁 **Recurring Meetings:**\n"
+            now = time.time()
+            for s in sorted(state.series.values(), key=_start_key):
+                upcoming = recurrence.next_occurrence(s, now)
+                next_text = f"next **{format_local(upcoming)}**" if upcoming is not None else "no further occurrences"
+                output += f"R{s.id}. {s.title} ({s.duration} mins, {s.rrule}): {next_text}\n"
         return output
 
     def delete_meeting(self, index: int) -> str:
         """Deletes a meeting by its 1-based index from list_meetings."""
-        if 1 <= index <= len(self.meetings):
-            removed = self.meetings.pop(index - 1)
-            self.save_meetings()
-            self._reschedule_reminders() # Simple way to clean up jobs
-            return f"✅ Deleted meeting: '{removed['title']}' at {removed['start']}."
-        else:
-            return f"❌ Invalid meeting index. Please choose between 1 and {len(self.meetings)}."
+        with self._write_lock:
+            meetings = self._state.meetings
+            if not (1 <= index <= len(meetings)):
+                return f"❌ Invalid meeting index. Please choose between 1 and {len(meetings)}."
+            removed = meetings[index - 1]
+            try:
+                self.store.delete([removed.id])
+            except Exception as e:
+                logger.error(f"Error deleting meeting: {e}")
+                return f"❌ Could not delete meeting: {e}"
+            with self._writing() as work:
+                work.remove([removed.id])
+            self.reminder_service.cancel(removed.id)
+            self._unschedule_reminder_job(removed.id)
+        return f"✅ Deleted meeting: '{removed.title}' at {removed.start}."
 
 # Singleton instance
 meeting_scheduler = MeetingScheduler()
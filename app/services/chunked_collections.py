@@ -0,0 +1,221 @@
+import bisect
+import heapq
+from collections.abc import MutableMapping, Sequence
+from itertools import accumulate, chain, islice
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def _identity(item: Any) -> Any:
+    return item
+
+
+class ChunkedSortedList(Sequence):
+    """
+    List kept sorted by key(item), stored as immutable chunks (tuples) of at
+    most 2 * CHUNK_SIZE items.
+
+    copy() copies only the list of chunk references, O(n / CHUNK_SIZE); a
+    change rebuilds the one chunk it touches, so copies share every other
+    chunk and copy-then-write costs O(n / CHUNK_SIZE + CHUNK_SIZE) instead of
+    O(n). Positions are found through per-chunk start offsets, built on the
+    first positional read after a change.
+    """
+    CHUNK_SIZE = 256
+
+    def __init__(self, items: Iterable = (), key: Optional[Callable[[Any], Any]] = None):
+        self.key = key or _identity
+        self._set_items(sorted(items, key=self.key))
+
+    def _set_items(self, ordered: List):
+        size = self.CHUNK_SIZE
+        self._chunks: List[Tuple] = [tuple(ordered[i:i + size]) for i in range(0, len(ordered), size)]
+        self._len = len(ordered)
+        self._offsets: Optional[List[int]] = None
+
+    def copy(self) -> "ChunkedSortedList":
+        clone = ChunkedSortedList.__new__(ChunkedSortedList)
+        clone.key = self.key
+        clone._chunks = list(self._chunks)
+        clone._len = self._len
+        clone._offsets = self._offsets  # never modified in place, only dropped
+        return clone
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._chunks)
+
+    def __repr__(self) -> str:
+        return f"ChunkedSortedList({list(self)!r})"
+
+    def _offsets_list(self) -> List[int]:
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(map(len, self._chunks))]
+        return self._offsets
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """(chunk number, offset in chunk) of an absolute position."""
+        offsets = self._offsets_list()
+        chunk = bisect.bisect_right(offsets, position) - 1
+        return chunk, position - offsets[chunk]
+
+    def __getitem__(self, position: int):
+        if isinstance(position, slice):
+            return list(self)[position]
+        if position < 0:
+            position += self._len
+        if not 0 <= position < self._len:
+            raise IndexError("ChunkedSortedList index out of range")
+        chunk, offset = self._locate(position)
+        return self._chunks[chunk][offset]
+
+    def islice(self, start: int = 0, stop: Optional[int] = None) -> Iterator:
+        """Items from position start up to stop, without indexing each one."""
+        stop = self._len if stop is None else min(stop, self._len)
+        if start >= stop:
+            return iter(())
+        chunk, offset = self._locate(start)
+        rest = chain([self._chunks[chunk][offset:]], self._chunks[chunk + 1:])
+        return islice(chain.from_iterable(rest), stop - start)
+
+    def bisect_left(self, value, key: Optional[Callable[[Any], Any]] = None) -> int:
+        """
+        Position of the first item whose key is >= value. `key` may replace the
+        list's key with a coarser one that orders the items the same way
+        (e.g. only the first field of tuples).
+        """
+        key = key or self.key
+        chunk = bisect.bisect_left(self._chunks, value, key=lambda c: key(c[-1]))
+        if chunk == len(self._chunks):
+            return self._len
+        return self._offsets_list()[chunk] + bisect.bisect_left(self._chunks[chunk], value, key=key)
+
+    def bisect_right(self, value, key: Optional[Callable[[Any], Any]] = None) -> int:
+        """Position after the last item whose key is <= value (see bisect_left for `key`)."""
+        key = key or self.key
+        chunk = bisect.bisect_right(self._chunks, value, key=lambda c: key(c[-1]))
+        if chunk == len(self._chunks):
+            return self._len
+        return self._offsets_list()[chunk] + bisect.bisect_right(self._chunks[chunk], value, key=key)
+
+    # ------------------------------------------------------------------
+    # Changes
+    # ------------------------------------------------------------------
+    def _store(self, number: int, chunk: Tuple):
+        """Puts a rebuilt chunk back, splitting it when too large and folding it into a neighbour when small."""
+        size = self.CHUNK_SIZE
+        if len(chunk) > 2 * size:
+            self._chunks[number:number + 1] = [chunk[:size], chunk[size:]]
+        elif not chunk:
+            del self._chunks[number]
+        elif len(chunk) < size // 4 and number + 1 < len(self._chunks) and len(chunk) + len(self._chunks[number + 1]) <= 2 * size:
+            self._chunks[number:number + 2] = [chunk + self._chunks[number + 1]]
+        else:
+            self._chunks[number] = chunk
+        self._offsets = None
+
+    def add(self, item):
+        """Inserts after any items with an equal key."""
+        k = self.key(item)
+        if not self._chunks:
+            self._chunks = [(item,)]
+            self._len, self._offsets = 1, None
+            return
+        number = bisect.bisect_right(self._chunks, k, key=lambda c: self.key(c[-1]))
+        number = min(number, len(self._chunks) - 1)
+        chunk = self._chunks[number]
+        position = bisect.bisect_right(chunk, k, key=self.key)
+        self._store(number, chunk[:position] + (item,) + chunk[position:])
+        self._len += 1
+
+    def update(self, items: Iterable):
+        """Adds many items: one merge and rebuild when they are a large share of the list."""
+        added = sorted(items, key=self.key)
+        if len(added) * 8 < self._len:
+            for item in added:
+                self.add(item)
+        else:
+            self._set_items(list(heapq.merge(self, added, key=self.key)))
+
+    def remove(self, item) -> bool:
+        """Removes one item equal to `item`. Returns False if it is not in the list."""
+        k = self.key(item)
+        number = bisect.bisect_left(self._chunks, k, key=lambda c: self.key(c[-1]))
+        while number < len(self._chunks):
+            chunk = self._chunks[number]
+            position = bisect.bisect_left(chunk, k, key=self.key)
+            while position < len(chunk) and self.key(chunk[position]) == k:
+                if chunk[position] == item:
+                    self._store(number, chunk[:position] + chunk[position + 1:])
+                    self._len -= 1
+                    return True
+                position += 1
+            if position < len(chunk):
+                break
+            number += 1  # equal keys can continue in the next chunk
+        return False
+
+
+class ShardedDict(MutableMapping):
+    """
+    Dict split into SHARDS sub-dicts by hash(key). copy() copies only the
+    list of shards; the first change to a shard after a copy copies that
+    shard alone (O(n / SHARDS)), so copies share every untouched shard.
+    """
+    SHARDS = 256
+
+    def __init__(self, items: Iterable = ()):
+        self._shards: List[Dict] = [{} for _ in range(self.SHARDS)]
+        self._owned: Set[int] = set(range(self.SHARDS))  # shards this instance may change in place
+        self._len = 0
+        for key, value in dict(items).items():
+            self[key] = value
+
+    def copy(self) -> "ShardedDict":
+        clone = ShardedDict.__new__(ShardedDict)
+        clone._shards = list(self._shards)
+        clone._owned = set()
+        clone._len = self._len
+        self._owned = set()  # the shards are shared from now on
+        return clone
+
+    def _shard(self, key: Hashable) -> Dict:
+        return self._shards[hash(key) % self.SHARDS]
+
+    def _writable(self, key: Hashable) -> Dict:
+        number = hash(key) % self.SHARDS
+        if number not in self._owned:
+            self._shards[number] = dict(self._shards[number])
+            self._owned.add(number)
+        return self._shards[number]
+
+    def __getitem__(self, key: Hashable):
+        return self._shard(key)[key]
+
+    def get(self, key: Hashable, default=None):
+        return self._shard(key).get(key, default)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._shard(key)
+
+    def __setitem__(self, key: Hashable, value):
+        shard = self._writable(key)
+        if key not in shard:
+            self._len += 1
+        shard[key] = value
+
+    def __delitem__(self, key: Hashable):
+        if key not in self._shard(key):
+            raise KeyError(key)
+        del self._writable(key)[key]
+        self._len -= 1
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._shards)
+
+    def __len__(self) -> int:
+        return self._len
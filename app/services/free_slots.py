@@ -0,0 +1,148 @@
+import logging
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Hashable, Iterable, List, Sequence, Set, Tuple
+
+from app.config import Config
+from app.services.meeting import LOCAL_TZ, local_datetime, local_now
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+
+
+def parse_clock(value: str) -> time:
+    return datetime.strptime(value.strip(), "%H:%M").time()
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sorts busy intervals and merges overlapping or touching ones (sweep line)."""
+    merged: List[Interval] = []
+    for start, end in sorted(i for i in intervals if i[1] > i[0]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_conflicts(candidates: Iterable[Tuple[Any, Any, Hashable]], busy: Iterable[Interval]) -> Set[Hashable]:
+    """
+    Keys of candidate intervals (start, end, key) that overlap a busy interval
+    or an earlier accepted candidate. Both sides are sorted once and walked
+    together, so n candidates against m busy intervals cost
+    O((n + m) log(n + m)) instead of one lookup per candidate. Candidates are
+    taken first-come in start order; an interval accepted before its key is
+    rejected still blocks later ones, which errs on the side of a conflict.
+    """
+    merged = merge_intervals(busy)
+    conflicts: Set[Hashable] = set()
+    cursor = 0
+    accepted_end = None
+    for start, end, key in sorted(candidates, key=lambda c: (c[0], c[1])):
+        while cursor < len(merged) and merged[cursor][1] <= start:
+            cursor += 1
+        if (cursor < len(merged) and merged[cursor][0] < end) or (accepted_end is not None and start < accepted_end):
+            conflicts.add(key)
+        elif accepted_end is None or end > accepted_end:
+            accepted_end = end
+    return conflicts
+
+
+def find_free_slots(busy: Iterable[Interval], window_start: datetime, window_end: datetime,
+                    duration_minutes: int = 30,
+                    day_start: time = time(9, 0), day_end: time = time(18, 0),
+                    weekdays: Sequence[int] = (0, 1, 2, 3, 4)) -> List[Interval]:
+    """
+    Free gaps of at least `duration_minutes` inside working hours on working
+    days between window_start and window_end. Busy intervals are merged once;
+    a single pointer then walks them alongside the days, so the cost is
+    O(n log n) for the sort plus O(n + days) for the sweep.
+    """
+    merged = merge_intervals(busy)
+    needed = timedelta(minutes=duration_minutes)
+    slots: List[Interval] = []
+    cursor = 0
+    day = window_start.date()
+    while day <= window_end.date():
+        if day.weekday() in weekdays:
+            free_from = max(datetime.combine(day, day_start), window_start)
+            day_close = min(datetime.combine(day, day_end), window_end)
+            # Skip busy intervals that ended before this day's window opens.
+            while cursor < len(merged) and merged[cursor][1] <= free_from:
+                cursor += 1
+            position = cursor
+            while free_from < day_close:
+                if position < len(merged) and merged[position][0] < day_close:
+                    busy_start, busy_end = merged[position]
+                    if busy_start - free_from >= needed:
+                        slots.append((free_from, busy_start))
+                    free_from = max(free_from, busy_end)
+                    position += 1
+                else:
+                    if day_close - free_from >= needed:
+                        slots.append((free_from, day_close))
+                    break
+        day += timedelta(days=1)
+    return slots
+
+
+def format_slots(slots: List[Interval], duration_minutes: int) -> str:
+    """Compact one-line-per-day summary for the model."""
+    if not slots:
+        return f"No free slots of {duration_minutes}+ mins in that range."
+    lines = {}
+    for start, end in slots:
+        key = start.strftime("%a %Y-%m-%d")
+        lines.setdefault(key, []).append(f"{start:%H:%M}-{end:%H:%M}")
+    output = f"🟢 **Free slots ({duration_minutes}+ mins):**\n"
+    for day, ranges in lines.items():
+        output += f"{day}: {', '.join(ranges)}\n"
+    return output
+
+
+def local_to_utc_iso(value: datetime) -> str:
+    """Naive local time (Config.TIMEZONE) as an RFC 3339 UTC timestamp for the Google API."""
+    return value.replace(tzinfo=LOCAL_TZ).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def freebusy_to_local(busy: Iterable[dict]) -> List[Interval]:
+    """Google freebusy entries ({"start", "end"} with any UTC offset) as naive local intervals."""
+    def local(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(LOCAL_TZ).replace(tzinfo=None)
+    return [(local(b['start']), local(b['end'])) for b in busy]
+
+
+def collect_busy(window_start: datetime, window_end: datetime, include_google: bool = True) -> List[Interval]:
+    """Busy intervals from the local scheduler and, if available, Google Calendar freebusy."""
+    from app.scheduler import meeting_scheduler
+
+    busy = [
+        (local_datetime(m.start_ts), local_datetime(m.end_ts))
+        for m in meeting_scheduler.meetings_between(window_start, window_end)
+    ]
+    if include_google:
+        try:
+            from app.services.google_calendar_service import calendar_service
+            busy.extend(calendar_service.get_busy_intervals(window_start, window_end))
+        except Exception as e:
+            logger.error(f"Could not read Google Calendar busy times: {e}")
+    return busy
+
+
+def upcoming_window_start(first_day: datetime) -> datetime:
+    """Start of a search window from first_day, moved up to now so slots that already started are never offered."""
+    return max(first_day, local_now())
+
+
+def free_slots_between(window_start: datetime, window_end: datetime, duration_minutes: int = 30,
+                       include_google: bool = True) -> List[Interval]:
+    """Free slots across both calendars, using the configured working hours."""
+    return find_free_slots(
+        collect_busy(window_start, window_end, include_google),
+        window_start, window_end, duration_minutes,
+        day_start=parse_clock(Config.WORK_DAY_START),
+        day_end=parse_clock(Config.WORK_DAY_END),
+        weekdays=Config.WORK_DAYS,
+    )
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from app.services.free_slots import freebusy_to_local, local_to_utc_iso
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -89,6 +90,25 @@ class GoogleCalendarService:
             logger.error(f"Error checking conflicts: {e}")
             return False
 
+    def get_busy_intervals(self, start: datetime, end: datetime) -> list:
+        """
+        Busy (start, end) pairs of the primary calendar from the freebusy API.
+        The window and the results are naive local times (Config.TIMEZONE),
+        like the scheduler's, whatever zone the events were created in.
+        """
+        if not self.service: return []
+
+        try:
+            result = self.service.freebusy().query(body={
+                'timeMin': local_to_utc_iso(start),
+                'timeMax': local_to_utc_iso(end),
+                'items': [{'id': 'primary'}],
+            }).execute()
+            return freebusy_to_local(result.get('calendars', {}).get('primary', {}).get('busy', []))
+        except Exception as e:
+            logger.error(f"Error fetching free/busy: {e}")
+            return []
+
     def create_event(self, summary: str, start_time: str, end_time: str, description: str = "") -> str:
         """
         Creates a new event on the primary calendar.
@@ -0,0 +1,319 @@
+import re
+import calendar
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.config import Config
+from app.services.meeting import LOCAL_TZ, Meeting
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_DURATION_RE = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+_ESCAPED_RE = re.compile(r"\\([\\;,nN])")
+_UNTIL_UTC_RE = re.compile(r"UNTIL=(\d{8}T\d{6})Z", re.IGNORECASE)
+_ICS_STAMP = "%Y%m%dT%H%M%S"
+DEFAULT_DURATION_MINUTES = 30
+PRODID = "-//AI Personal Assistant//Meetings//EN"
+
+
+@dataclass
+class IcsEvent:
+    """A VEVENT reduced to what the scheduler stores."""
+    title: str
+    start_ts: float
+    duration: int
+    rrule: Optional[str] = None
+    exdates: FrozenSet[float] = field(default_factory=frozenset)
+    uid: Optional[str] = None
+    line: int = 0  # line of BEGIN:VEVENT, for error reports
+
+
+class IcsError(ValueError):
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+# ----------------------------------------------------------------------
+# Parsing
+# ----------------------------------------------------------------------
+def _unfolded(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Joins folded continuation lines (RFC 5545 3.1), yielding (line number, content line)."""
+    pending, pending_no = None, 0
+    for number, raw in enumerate(lines, start=1):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield pending_no, pending
+        pending, pending_no = line, number
+    if pending:
+        yield pending_no, pending
+
+
+def _split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """"NAME;PARAM=V:value" -> (NAME, {PARAM: V}, value)."""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, val = param.partition("=")
+        parameters[key.upper()] = val.strip('"')
+    return name.upper(), parameters, value
+
+
+def _unescape(text: str) -> str:
+    return _ESCAPED_RE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def _parse_time(value: str, params: Dict[str, str]) -> float:
+    """DATE-TIME value (UTC, TZID or floating local) to epoch seconds, truncated to the minute as stored."""
+    ts = _parse_datetime(value, params)
+    return ts - ts % 60
+
+
+def _parse_datetime(value: str, params: Dict[str, str]) -> float:
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        raise ValueError("all-day events are not imported")
+    if value.endswith("Z"):
+        return datetime.strptime(value[:-1], _ICS_STAMP).replace(tzinfo=timezone.utc).timestamp()
+    tz = LOCAL_TZ
+    if "TZID" in params:
+        try:
+            tz = ZoneInfo(params["TZID"])
+        except Exception:
+            logger.warning(f"Unknown TZID '{params['TZID']}', using {Config.TIMEZONE}.")
+    return datetime.strptime(value, _ICS_STAMP).replace(tzinfo=tz).timestamp()
+
+
+def _parse_duration(value: str) -> int:
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"invalid DURATION '{value}'")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0))
+    if sign == "-":
+        raise ValueError("negative DURATION")
+    return int(delta.total_seconds() // 60)
+
+
+def _localize_until(rule: str) -> str:
+    """Rewrites a UTC UNTIL (as calendar apps export it) in local time, since rules expand in naive local time."""
+    def convert(match):
+        ts = datetime.strptime(match.group(1), _ICS_STAMP).replace(tzinfo=timezone.utc).timestamp()
+        return f"UNTIL={_local_stamp(ts)}"
+    return _UNTIL_UTC_RE.sub(convert, rule)
+
+
+def _build_event(props: Dict[str, List[Tuple[Dict[str, str], str]]], line: int) -> IcsEvent:
+    if "DTSTART" not in props:
+        raise IcsError(line, "VEVENT without DTSTART")
+    try:
+        params, value = props["DTSTART"][0]
+        start_ts = _parse_time(value, params)
+        if "DTEND" in props:
+            params, value = props["DTEND"][0]
+            duration = int((_parse_time(value, params) - start_ts) // 60)
+        elif "DURATION" in props:
+            duration = _parse_duration(props["DURATION"][0][1])
+        else:
+            duration = DEFAULT_DURATION_MINUTES
+        exdates = set()
+        for params, value in props.get("EXDATE", []):
+            exdates.update(_parse_time(v, params) for v in value.split(",") if v)
+    except ValueError as e:
+        raise IcsError(line, str(e))
+    if duration <= 0:
+        raise IcsError(line, "event ends before it starts")
+
+    rrules = props.get("RRULE", [])
+    if rrules:
+        # Rules expand in Config.TIMEZONE wall-clock time; a rule from another zone
+        # would drift by its DST shifts (and BYDAY could land on the wrong day).
+        params, value = props["DTSTART"][0]
+        zone = "UTC" if value.endswith("Z") else params.get("TZID", Config.TIMEZONE)
+        if zone != Config.TIMEZONE:
+            raise IcsError(line, f"recurring events must use TZID={Config.TIMEZONE} or floating times, not {zone}")
+    return IcsEvent(
+        title=_unescape(props["SUMMARY"][0][1]).strip() if "SUMMARY" in props else "Meeting",
+        start_ts=start_ts,
+        duration=duration,
+        rrule=_localize_until(rrules[0][1]) if rrules else None,
+        exdates=frozenset(exdates),
+        uid=props["UID"][0][1] if "UID" in props else None,
+        line=line,
+    )
+
+
+def iter_events(lines: Iterable[str]) -> Iterator[object]:
+    """
+    Streams VEVENTs out of an iCalendar text, one at a time, so a large file
+    is never held in memory. Yields IcsEvent, or IcsError for events that
+    cannot be imported (the caller decides whether to skip or abort).
+    """
+    props: Optional[Dict[str, List[Tuple[Dict[str, str], str]]]] = None
+    begin_line, depth = 0, 0
+    for number, line in _unfolded(lines):
+        name, params, value = _split_property(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and props is None:
+                props, begin_line, depth = {}, number, 0
+            elif props is not None:
+                depth += 1  # nested component (e.g. VALARM): ignored
+            continue
+        if name == "END":
+            if props is not None and depth:
+                depth -= 1
+            elif props is not None and value.upper() == "VEVENT":
+                try:
+                    yield _build_event(props, begin_line)
+                except IcsError as e:
+                    yield e
+                props = None
+            continue
+        if props is not None and not depth:
+            props.setdefault(name, []).append((params, value))
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Folds a content line at 75 octets (RFC 5545 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, current = [], b""
+    for char in line:
+        piece = char.encode("utf-8")
+        if len(current) + len(piece) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += piece
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _local_stamp(ts: float) -> str:
+    return datetime.fromtimestamp(ts, LOCAL_TZ).strftime(_ICS_STAMP)
+
+
+def _utc_offset(delta: timedelta) -> str:
+    minutes = int(delta.total_seconds() // 60)
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+_WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+@lru_cache(maxsize=8)
+def _transitions(tzid: str, first_year: int, last_year: int) -> Tuple[Tuple[datetime, timedelta, timedelta, bool, str], ...]:
+    """
+    UTC offset changes of a zone from first_year through last_year, as
+    (local onset in the old offset, offset before, offset after, is DST after, name after).
+    Found by comparing offsets a day apart and bisecting to the minute.
+    """
+    tz = ZoneInfo(tzid)
+    ts = datetime(first_year, 1, 1, tzinfo=timezone.utc).timestamp()
+    end = datetime(last_year + 1, 1, 1, tzinfo=timezone.utc).timestamp()
+    found = []
+    offset = datetime.fromtimestamp(ts, tz).utcoffset()
+    while ts < end:
+        following = datetime.fromtimestamp(ts + 86400, tz).utcoffset()
+        if following != offset:
+            low, high = ts, ts + 86400  # offset at low is the old one, at high the new one
+            while high - low > 60:
+                middle = low + (high - low) // 120 * 60
+                if datetime.fromtimestamp(middle, tz).utcoffset() == offset:
+                    low = middle
+                else:
+                    high = middle
+            after = datetime.fromtimestamp(high, tz)
+            onset = datetime.fromtimestamp(high, timezone.utc).replace(tzinfo=None) + offset
+            found.append((onset, offset, following, bool(after.dst()), after.tzname()))
+            offset = following
+        ts += 86400
+    return tuple(found)
+
+
+def _yearly_rule(onset: datetime) -> str:
+    """RRULE naming the onset's weekday of its month: last (-1) when the month has no later one, else its ordinal."""
+    last_day = calendar.monthrange(onset.year, onset.month)[1]
+    nth = -1 if onset.day + 7 > last_day else (onset.day - 1) // 7 + 1
+    return f"FREQ=YEARLY;BYMONTH={onset.month};BYDAY={nth}{_WEEKDAYS[onset.weekday()]}"
+
+
+def _vtimezone(tzid: str) -> List[str]:
+    """
+    VTIMEZONE for the TZID the export references (RFC 5545 3.6.5), built from
+    the zone's offset changes around the current year. A zone without changes
+    (Asia/Kolkata) gets one fixed STANDARD offset. Otherwise each kind of
+    change that falls on the same weekday rule every year becomes a
+    STANDARD/DAYLIGHT component with a yearly RRULE, so clients get the offset
+    right on both sides of every DST switch; irregular changes are listed
+    one component each.
+    """
+    year = datetime.now(timezone.utc).year
+    changes = _transitions(tzid, year - 1, year + 1)
+    if not changes:
+        now = datetime.now(ZoneInfo(tzid))
+        offset = _utc_offset(now.utcoffset())
+        observances = [("STANDARD", datetime(1970, 1, 1), offset, offset, now.tzname(), None)]
+    else:
+        observances = []
+        by_kind: Dict[bool, list] = {}
+        for change in changes:
+            by_kind.setdefault(change[3], []).append(change)
+        for is_dst, group in by_kind.items():
+            first_onset, before, after, _, name = group[0]
+            signatures = {(_yearly_rule(o), o.time(), b, a, n) for o, b, a, _, n in group}
+            kind = "DAYLIGHT" if is_dst else "STANDARD"
+            if len(signatures) == 1 and len(group) == 3:
+                observances.append((kind, first_onset, _utc_offset(before), _utc_offset(after), name, _yearly_rule(first_onset)))
+            else:
+                observances.extend((kind, o, _utc_offset(b), _utc_offset(a), n, None) for o, b, a, _, n in group)
+        observances.sort(key=lambda observance: observance[1])
+
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{tzid}"]
+    for kind, onset, offset_from, offset_to, name, rule in observances:
+        lines += [f"BEGIN:{kind}", f"DTSTART:{onset.strftime(_ICS_STAMP)}"]
+        if rule:
+            lines.append(f"RRULE:{rule}")
+        lines += [f"TZOFFSETFROM:{offset_from}", f"TZOFFSETTO:{offset_to}", f"TZNAME:{name}", f"END:{kind}"]
+    lines.append("END:VTIMEZONE")
+    return lines
+
+
+def iter_calendar(meetings: Iterable[Meeting]) -> Iterator[str]:
+    """Streams an iCalendar document for the given meetings and series, a few lines at a time."""
+    stamp = datetime.now(timezone.utc).strftime(_ICS_STAMP) + "Z"
+    tzid = Config.TIMEZONE
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + "".join(_fold(line) for line in [f"PRODID:{PRODID}"] + _vtimezone(tzid))
+    for meeting in meetings:
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:meeting-{meeting.id}@ai-personal-assistant",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;TZID={tzid}:{_local_stamp(meeting.start_ts)}",
+            f"DURATION:PT{meeting.duration}M",
+            f"SUMMARY:{_escape(meeting.title)}",
+        ]
+        if meeting.rrule:
+            lines.append(f"RRULE:{meeting.rrule}")
+            if meeting.exdates:
+                lines.append(f"EXDATE;TZID={tzid}:" + ",".join(_local_stamp(ts) for ts in sorted(meeting.exdates)))
+        lines.append("END:VEVENT")
+        yield "".join(_fold(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
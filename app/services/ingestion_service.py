@@ -0,0 +1,139 @@
+import os
+import uuid
+import queue
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_JOBS = 200
+
+
+@dataclass
+class IngestionJob:
+    """Status of a queued document ingestion."""
+    id: str
+    files: List[str]
+    collection: Optional[str] = None
+    status: str = "queued"  # queued | running | completed | failed
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    files_total: int = 0
+    files_done: int = 0
+    files_failed: int = 0
+    chunks_parsed: int = 0
+    chunks_embedded: int = 0
+    chunks_deduplicated: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class IngestionService:
+    """
+    Runs document ingestion on a single dedicated worker thread so large
+    uploads never block API request handling. Jobs are processed in order;
+    their progress is readable at any time via get_job().
+    """
+    def __init__(self, upload_dir: str = Config.UPLOAD_DIR):
+        self.upload_dir = upload_dir
+        self.incoming_dir = os.path.join(upload_dir, ".incoming")
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        os.makedirs(self.incoming_dir, exist_ok=True)
+
+    def new_job_dir(self) -> Tuple[str, str]:
+        """Reserves a job id and the staging folder uploads are streamed into."""
+        job_id = uuid.uuid4().hex
+        staging = os.path.join(self.incoming_dir, job_id)
+        os.makedirs(staging, exist_ok=True)
+        return job_id, staging
+
+    def submit(self, job_id: str, filenames: List[str], collection: Optional[str] = None) -> IngestionJob:
+        """Queues an ingestion job for files already staged under the job's folder."""
+        job = IngestionJob(id=job_id, files=filenames, collection=collection, files_total=len(filenames))
+        with self._lock:
+            self.jobs[job_id] = job
+            while len(self.jobs) > MAX_TRACKED_JOBS:
+                self.jobs.popitem(last=False)
+        self._ensure_worker()
+        self._queue.put(job_id)
+        logger.info(f"Queued ingestion job {job_id} with {len(filenames)} files.")
+        return job
+
+    def collection_upload_dir(self, collection: Optional[str]) -> str:
+        """Where a collection's uploaded files are kept (the default collection uses the top folder)."""
+        if not collection or collection == Config.RAG_DEFAULT_COLLECTION:
+            return self.upload_dir
+        return os.path.join(self.upload_dir, collection)
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            job = self.get_job(job_id)
+            if job is not None:
+                self._process(job)
+            self._queue.task_done()
+
+    def _process(self, job: IngestionJob):
+        # Imported lazily: loading the RAG pipeline pulls in the embedding stack.
+        from app.rag.collection_manager import collection_manager
+
+        job.status = "running"
+        job.started_at = datetime.now().isoformat(timespec="seconds")
+        staging = os.path.join(self.incoming_dir, job.id)
+        try:
+            # Publish staged files under their final names; re-uploading a file
+            # with the same name replaces (upserts) its previous version.
+            target_dir = self.collection_upload_dir(job.collection)
+            os.makedirs(target_dir, exist_ok=True)
+            paths = []
+            for name in job.files:
+                target = os.path.join(target_dir, name)
+                os.replace(os.path.join(staging, name), target)
+                paths.append(target)
+
+            def on_progress(progress):
+                job.files_done = progress.files_done
+                job.files_failed = progress.files_failed
+                job.chunks_parsed = progress.chunks_parsed
+                job.chunks_embedded = progress.chunks_embedded
+                job.chunks_deduplicated = progress.chunks_deduplicated
+
+            report = collection_manager.ingest_documents(paths, job.collection, progress=on_progress)
+            job.errors = list(report.errors)
+            job.status = "failed" if report.files_failed == len(paths) and paths else "completed"
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed: {e}")
+            job.errors.append(str(e))
+            job.status = "failed"
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            job.finished_at = datetime.now().isoformat(timespec="seconds")
+            logger.info(f"Ingestion job {job.id} {job.status}: {job.chunks_embedded} chunks embedded.")
+
+
+# Singleton instance
+ingestion_service = IngestionService()
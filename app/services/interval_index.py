@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.services.chunked_collections import ChunkedSortedList, ShardedDict
+
+# Epoch seconds (as the scheduler uses) or datetimes; one kind per index.
+TimePoint = Union[float, datetime]
+
+
+def _entry_start(entry: Tuple) -> TimePoint:
+    return entry[0]
+
+
+class IntervalIndex:
+    """
+    Sorted index of half-open time intervals [start, end) keyed by id.
+
+    Entries are kept ordered by start time and located with bisect.
+    Any interval overlapping [s, e) must start before e and after s minus the
+    longest indexed duration, so overlap and range queries only look at that
+    slice: O(log n + hits) instead of a scan over every meeting.
+
+    Entries and the key lookup live in chunked collections, so copy() shares
+    them with the original and a write after a copy only duplicates the chunk
+    and shard it touches.
+    """
+    def __init__(self):
+        # (start, end, seq, key); the unique seq keeps keys out of comparisons.
+        self._entries = ChunkedSortedList()
+        self._by_key = ShardedDict()  # key -> entry
+        self._seq = 0
+        # Upper bound on any indexed duration (None while empty); may be stale-high after removals, which is safe.
+        self._max_duration = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._by_key
+
+    def copy(self) -> "IntervalIndex":
+        clone = IntervalIndex()
+        clone._entries = self._entries.copy()
+        clone._by_key = self._by_key.copy()
+        clone._seq = self._seq
+        clone._max_duration = self._max_duration
+        return clone
+
+    def _entry(self, key: Hashable, start: TimePoint, end: TimePoint) -> Tuple[TimePoint, TimePoint, int, Hashable]:
+        self._seq += 1
+        entry = (start, end, self._seq, key)
+        self._by_key[key] = entry
+        duration = end - start
+        if self._max_duration is None or duration > self._max_duration:
+            self._max_duration = duration
+        return entry
+
+    def add(self, key: Hashable, start: TimePoint, end: TimePoint):
+        if key in self._by_key:
+            self.remove(key)
+        self._entries.add(self._entry(key, start, end))
+
+    def add_many(self, intervals: Iterable[Tuple[Hashable, TimePoint, TimePoint]]):
+        """Adds (key, start, end) intervals, merging them in one pass when there are many."""
+        entries = []
+        for key, start, end in intervals:
+            if key in self._by_key:
+                self.remove(key)
+            entries.append(self._entry(key, start, end))
+        self._entries.update(entries)
+
+    def remove(self, key: Hashable):
+        entry = self._by_key.pop(key, None)
+        if entry is None:
+            return
+        self._entries.remove(entry)
+        if not self._entries:
+            self._max_duration = None
+
+    def get(self, key: Hashable) -> Optional[Tuple[TimePoint, TimePoint]]:
+        entry = self._by_key.get(key)
+        return (entry[0], entry[1]) if entry else None
+
+    def _first_candidate(self, start: TimePoint) -> int:
+        if self._max_duration is None:
+            return 0
+        return self._entries.bisect_right(start - self._max_duration, key=_entry_start)
+
+    def _candidates(self, start: TimePoint, end: TimePoint) -> Iterator[Tuple[TimePoint, TimePoint, int, Hashable]]:
+        return self._entries.islice(self._first_candidate(start), self._entries.bisect_left(end, key=_entry_start))
+
+    def overlapping(self, start: TimePoint, end: TimePoint, exclude: Optional[Hashable] = None) -> List[Hashable]:
+        """Keys of intervals overlapping [start, end), ordered by start time."""
+        return [key for s, e, seq, key in self._candidates(start, end) if e > start and key != exclude]
+
+    def has_overlap(self, start: TimePoint, end: TimePoint, exclude: Optional[Hashable] = None) -> bool:
+        return any(e > start and key != exclude for s, e, seq, key in self._candidates(start, end))
+
+    def ending_before(self, cutoff: TimePoint) -> List[Hashable]:
+        """Keys of intervals that ended at or before `cutoff`."""
+        high = self._entries.bisect_left(cutoff, key=_entry_start)
+        return [key for s, e, seq, key in self._entries.islice(0, high) if e <= cutoff]
+
+    def keys(self) -> List[Hashable]:
+        """All keys in start-time order."""
+        return [key for _, _, _, key in self._entries]
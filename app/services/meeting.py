@@ -0,0 +1,105 @@
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional
+from zoneinfo import ZoneInfo
+
+from app.config import Config
+
+# Meeting times are wall-clock times in this zone; everything internal uses epoch seconds.
+LOCAL_TZ = ZoneInfo(Config.TIMEZONE)
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def parse_local(value: str) -> datetime:
+    """"YYYY-MM-DD HH:MM" in the configured timezone, as an aware datetime. Raises ValueError."""
+    return datetime.strptime(value, TIME_FORMAT).replace(tzinfo=LOCAL_TZ)
+
+
+def to_timestamp(value: datetime) -> float:
+    """Epoch seconds; naive datetimes are taken as local wall-clock time."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=LOCAL_TZ)
+    return value.timestamp()
+
+
+def local_datetime(ts: float) -> datetime:
+    """Naive local wall-clock time of an epoch (the form recurrence rules and the UI work in)."""
+    return datetime.fromtimestamp(ts, LOCAL_TZ).replace(tzinfo=None)
+
+
+def local_now() -> datetime:
+    """Current local wall-clock time, to the minute, whatever the host's own time zone is."""
+    return local_datetime(time.time()).replace(second=0, microsecond=0)
+
+
+def format_local(ts: float) -> str:
+    return datetime.fromtimestamp(ts, LOCAL_TZ).strftime(TIME_FORMAT)
+
+
+@dataclass(frozen=True, slots=True)
+class Meeting:
+    """
+    A scheduled meeting, a recurring series (rrule set) or one occurrence of
+    a series (series_id set). Times are parsed once, when the meeting is
+    loaded or created, into epoch seconds; strings only exist at the edges
+    (storage, API, messages). Instances are immutable: use with_changes().
+    """
+    id: int
+    title: str
+    start_ts: float
+    duration: int = 30
+    reminded: bool = False
+    rrule: Optional[str] = None
+    exdates: FrozenSet[float] = field(default_factory=frozenset)  # cancelled/overridden occurrence starts
+    reminded_through: Optional[float] = None                       # last occurrence start reminded
+    series_id: Optional[int] = None
+    recurrence_id: Optional[float] = None                          # start of the occurrence it overrides
+
+    @property
+    def end_ts(self) -> float:
+        return self.start_ts + self.duration * 60
+
+    @property
+    def start(self) -> str:
+        """Local "YYYY-MM-DD HH:MM" for display."""
+        return format_local(self.start_ts)
+
+    def with_changes(self, **changes) -> "Meeting":
+        return replace(self, **changes)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Meeting":
+        """Builds a Meeting from the storage/API dict shape (string times)."""
+        return cls(
+            id=data['id'],
+            title=data.get('title', 'Meeting'),
+            start_ts=parse_local(data['start']).timestamp(),
+            duration=int(data.get('duration', 30)),
+            reminded=bool(data.get('reminded', False)),
+            rrule=data.get('rrule'),
+            exdates=frozenset(parse_local(d).timestamp() for d in data.get('exdates') or ()),
+            reminded_through=parse_local(data['reminded_through']).timestamp() if data.get('reminded_through') else None,
+            series_id=data.get('series_id'),
+            recurrence_id=parse_local(data['recurrence_id']).timestamp() if data.get('recurrence_id') else None,
+        )
+
+    def to_dict(self) -> Dict:
+        """JSON/API shape: local time strings; recurrence fields only when set."""
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "start": self.start,
+            "duration": self.duration,
+            "reminded": self.reminded,
+        }
+        if self.rrule:
+            data["rrule"] = self.rrule
+            if self.series_id is None:
+                data["exdates"] = sorted(format_local(ts) for ts in self.exdates)
+                data["reminded_through"] = format_local(self.reminded_through) if self.reminded_through else None
+        if self.series_id is not None:
+            data["series_id"] = self.series_id
+            if self.recurrence_id is not None:
+                data["recurrence_id"] = format_local(self.recurrence_id)
+        return data
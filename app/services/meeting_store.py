@@ -0,0 +1,215 @@
+import os
+import json
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Boolean, Text, Index
+from sqlalchemy.orm import sessionmaker, declarative_base
+
+from app.config import Config
+from app.services.meeting import Meeting, format_local
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+
+class MeetingRow(Base):
+    """SQLAlchemy model for a scheduled meeting."""
+    __tablename__ = 'meetings'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(255), nullable=False)
+    start = Column(String(16), nullable=False)  # "YYYY-MM-DD HH:MM", sorts chronologically
+    duration = Column(Integer, nullable=False, default=30)
+    reminded = Column(Boolean, nullable=False, default=False)
+    # Recurring series: one row holds the rule; `start` is the first occurrence.
+    rrule = Column(String(255), nullable=True)
+    exdates = Column(Text, nullable=True)                # JSON list of cancelled/overridden occurrence starts
+    reminded_through = Column(String(16), nullable=True)  # last occurrence a reminder was sent for
+    # Override of one occurrence: a one-off row pointing at its series.
+    series_id = Column(Integer, nullable=True)
+    recurrence_id = Column(String(16), nullable=True)    # start of the occurrence it replaces
+
+    __table_args__ = (Index('ix_meetings_start', 'start'),)
+
+    def to_meeting(self) -> Meeting:
+        return Meeting.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "start": self.start,
+            "duration": self.duration,
+            "reminded": self.reminded,
+        }
+        if self.rrule:
+            data.update(
+                rrule=self.rrule,
+                exdates=json.loads(self.exdates) if self.exdates else [],
+                reminded_through=self.reminded_through,
+            )
+        if self.series_id is not None:
+            data.update(series_id=self.series_id, recurrence_id=self.recurrence_id)
+        return data
+
+
+def _column_values(**fields) -> Dict:
+    """Converts epoch-second time fields to the stored local "YYYY-MM-DD HH:MM" strings."""
+    values = dict(fields)
+    for name in ('start', 'reminded_through', 'recurrence_id'):
+        if isinstance(values.get(name), (int, float)):
+            values[name] = format_local(values[name])
+    if 'exdates' in values:
+        values['exdates'] = json.dumps(sorted(format_local(ts) for ts in values['exdates']))
+    return values
+
+
+class MeetingStore:
+    """
+    SQLite-backed meeting storage.
+
+    Every change is a single-row statement in its own transaction, so a write
+    costs O(1) regardless of how many meetings exist, and a crash can only
+    lose the change in flight, never the rest of the data. WAL journaling lets
+    the reminder thread read while a write is committing.
+    """
+    def __init__(self, db_path: str = Config.MEETINGS_DB):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.engine = create_engine(
+            f'sqlite:///{db_path}',
+            echo=False,
+            connect_args={"check_same_thread": False},  # used from APScheduler threads
+        )
+        event.listen(self.engine, "connect", self._configure_connection)
+        Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")  # durable at transaction level in WAL mode
+        cursor.close()
+
+    def _add_missing_columns(self):
+        """Adds columns introduced after a database was created (SQLite ADD COLUMN is cheap)."""
+        existing = {c['name'] for c in inspect(self.engine).get_columns(MeetingRow.__tablename__)}
+        with self.engine.begin() as connection:
+            for column in MeetingRow.__table__.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {MeetingRow.__tablename__} ADD COLUMN {column.name} {column_type}"))
+
+    @contextmanager
+    def transaction(self):
+        """Session whose changes commit together, or roll back together on error."""
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def all(self) -> List[Meeting]:
+        """Every meeting and series, ordered by start time."""
+        with self.transaction() as session:
+            rows = session.query(MeetingRow).order_by(MeetingRow.start, MeetingRow.id).all()
+            meetings = []
+            for row in rows:
+                try:
+                    meetings.append(row.to_meeting())
+                except (KeyError, ValueError) as e:
+                    logger.error(f"Skipping meeting {row.id} with an unreadable time: {e}")
+            return meetings
+
+    def count(self) -> int:
+        with self.transaction() as session:
+            return session.query(MeetingRow).count()
+
+    def insert(self, title: str, start_ts: float, duration: int, reminded: bool = False, rrule: Optional[str] = None,
+               series_id: Optional[int] = None, recurrence_id: Optional[float] = None) -> Meeting:
+        with self.transaction() as session:
+            row = MeetingRow(title=title, reminded=reminded, duration=duration, rrule=rrule, series_id=series_id,
+                             **_column_values(start=start_ts, recurrence_id=recurrence_id))
+            session.add(row)
+            session.flush()
+            return row.to_meeting()
+
+    def insert_many(self, meetings: Iterable[Meeting]) -> List[Meeting]:
+        """
+        Inserts meetings and series (their ids are ignored) in one transaction:
+        all of them are stored, or none. Returns them with their new ids.
+        """
+        with self.transaction() as session:
+            rows = [
+                MeetingRow(title=m.title, duration=m.duration, reminded=m.reminded, rrule=m.rrule,
+                           **_column_values(start=m.start_ts, **({'exdates': m.exdates} if m.rrule else {})))
+                for m in meetings
+            ]
+            session.add_all(rows)
+            session.flush()
+            return [row.to_meeting() for row in rows]
+
+    def update(self, meeting_id: int, **fields) -> bool:
+        """
+        Updates the given columns of one meeting (times as epoch seconds).
+        Returns False if it does not exist.
+        """
+        with self.transaction() as session:
+            updated = session.query(MeetingRow).filter(MeetingRow.id == meeting_id).update(_column_values(**fields))
+            return updated > 0
+
+    def add_override(self, series_id: int, recurrence_id: float, exdates: Iterable[float], title: str,
+                     start_ts: float, duration: int) -> Meeting:
+        """Replaces one occurrence of a series with a one-off meeting, atomically."""
+        with self.transaction() as session:
+            session.query(MeetingRow).filter(MeetingRow.id == series_id).update(_column_values(exdates=exdates))
+            row = MeetingRow(title=title, duration=duration, reminded=False, series_id=series_id,
+                             **_column_values(start=start_ts, recurrence_id=recurrence_id))
+            session.add(row)
+            session.flush()
+            return row.to_meeting()
+
+    def delete(self, meeting_ids: Iterable[int]) -> int:
+        ids = list(meeting_ids)
+        if not ids:
+            return 0
+        with self.transaction() as session:
+            return session.query(MeetingRow).filter(MeetingRow.id.in_(ids)).delete(synchronize_session=False)
+
+    def import_json(self, json_path: str) -> int:
+        """
+        One-time import of the legacy meetings.json. Runs only while the table
+        is empty; the file is renamed to *.imported afterwards so it is never
+        applied twice. Returns the number of meetings imported.
+        """
+        if not os.path.exists(json_path) or self.count() > 0:
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                meetings = json.load(f)
+        except Exception as e:
+            logger.error(f"Could not read legacy meetings file {json_path}: {e}")
+            return 0
+
+        with self.transaction() as session:
+            for m in meetings:
+                session.add(MeetingRow(
+                    id=m.get('id'),
+                    title=m.get('title', 'Meeting'),
+                    start=m['start'],
+                    duration=int(m.get('duration', 30)),
+                    reminded=bool(m.get('reminded', False)),
+                ))
+        os.replace(json_path, f"{json_path}.imported")
+        logger.info(f"Imported {len(meetings)} meetings from {json_path} into {self.db_path}.")
+        return len(meetings)
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+from dateutil.rrule import rrule, rrulestr
+
+from app.services.meeting import Meeting, local_datetime, to_timestamp
+
+
+@lru_cache(maxsize=256)
+def _parse(rule: str, dtstart_ts: float) -> rrule:
+    # Rules expand in local wall-clock time, so a 09:00 meeting stays at 09:00 across DST changes.
+    # cache=True memoizes generated occurrences on the rrule object itself.
+    return rrulestr(rule, dtstart=local_datetime(dtstart_ts), cache=True)
+
+
+def validate_rule(rule: str, dtstart_ts: float) -> str:
+    """Normalizes an RRULE ("FREQ=WEEKLY;BYDAY=MO", optionally prefixed "RRULE:"); raises ValueError if invalid."""
+    rule = rule.strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[len("RRULE:"):]
+    try:
+        parsed = _parse(rule, dtstart_ts)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid recurrence rule '{rule}': {e}")
+    if not isinstance(parsed, rrule):
+        raise ValueError("Only a single RRULE is supported; use exceptions for EXDATEs.")
+    return rule
+
+
+def occurrences(series: Meeting, start_ts: float, end_ts: float) -> List[float]:
+    """
+    Start times of the series' occurrences overlapping [start_ts, end_ts),
+    skipping exception dates. Only the queried window is expanded.
+    """
+    rule = _parse(series.rrule, series.start_ts)
+    window_start = local_datetime(start_ts) - timedelta(minutes=series.duration)
+    starts = (to_timestamp(o) for o in rule.between(window_start, local_datetime(end_ts)))
+    return [ts for ts in starts if ts not in series.exdates and start_ts < ts + series.duration * 60 and ts < end_ts]
+
+
+def next_occurrence(series: Meeting, after_ts: float) -> Optional[float]:
+    """First occurrence strictly after `after_ts` that is not an exception date."""
+    rule = _parse(series.rrule, series.start_ts)
+    occurrence: Optional[datetime] = rule.after(local_datetime(after_ts))
+    while occurrence is not None and to_timestamp(occurrence) in series.exdates:
+        occurrence = rule.after(occurrence)
+    return to_timestamp(occurrence) if occurrence is not None else None
+
+
+def occurrence_view(series: Meeting, start_ts: float) -> Meeting:
+    """A single occurrence, shaped like a one-off meeting linked to its series."""
+    return series.with_changes(
+        start_ts=start_ts,
+        reminded=series.reminded_through is not None and start_ts <= series.reminded_through,
+        series_id=series.id,
+        exdates=frozenset(),
+    )
+
+
+def expand(series_list: Iterable[Meeting], start_ts: float, end_ts: float) -> List[Meeting]:
+    """Occurrences of several series overlapping [start_ts, end_ts), in start order."""
+    views = [
+        occurrence_view(series, ts)
+        for series in series_list
+        for ts in occurrences(series, start_ts, end_ts)
+    ]
+    views.sort(key=lambda m: m.start_ts)
+    return views
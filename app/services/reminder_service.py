@@ -1,77 +1,136 @@
+import heapq
 import logging
 import os
 import time
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+import threading
+from typing import Dict, List, Optional, Tuple
 from app.services.whatsapp_service import whatsapp_service
 from app.agent.email_service import email_service
+from app.services.meeting import Meeting
 from app.config import Config
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Using Asia/Kolkata as requested
-LOCAL_TZ = ZoneInfo("Asia/Kolkata")
+# Longest single sleep of the dispatcher thread.
+MAX_SLEEP_SECONDS = 300
 
 class ReminderService:
     """
     Handles reminders for meetings across multiple channels with retry logic and timezone safety.
+    Reminders are dispatched from a min-heap keyed by due time, so the service
+    sleeps until the next reminder instead of scanning all meetings every minute.
     """
     def __init__(self, scheduler_instance):
         self.scheduler = scheduler_instance
         self.config = Config
         self.offset_minutes = self.config.REMINDER_OFFSET_MINUTES
+        self._heap: List[Tuple[float, int, int]] = []  # (due epoch, seq, meeting id)
+        self._due: Dict[int, float] = {}               # meeting id -> current due time
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
         
         logger.info(f"ReminderService initialized with {self.offset_minutes} minute offset.")
 
+    # ------------------------------------------------------------------
+    # Dispatcher: a min-heap of (due time, meeting id), drained by one thread
+    # that sleeps until the earliest reminder is due.
+    # ------------------------------------------------------------------
+    def schedule(self, meeting: Meeting):
+        """(Re)schedules one meeting's reminder; O(log n)."""
+        with self._cond:
+            if meeting.reminded:
+                self._due.pop(meeting.id, None)
+                return
+            due = meeting.start_ts - self.offset_minutes * 60
+            self._due[meeting.id] = due
+            self._seq += 1
+            heapq.heappush(self._heap, (due, self._seq, meeting.id))
+            # Wake the dispatcher only if this is now the earliest reminder.
+            if self._heap[0][2] == meeting.id:
+                self._cond.notify()
+
+    def cancel(self, meeting_id: int):
+        """Drops a meeting's pending reminder (its heap entry is skipped lazily)."""
+        with self._cond:
+            self._due.pop(meeting_id, None)
+
+    def start(self):
+        """Starts the dispatcher thread (meetings are queued by the scheduler as they load)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="reminder-dispatcher", daemon=True)
+            self._thread.start()
+        logger.info(f"Reminder dispatcher started with {len(self._due)} pending reminders.")
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                meeting_id = None
+                while self._running and meeting_id is None:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, _, candidate = self._heap[0]
+                    if self._due.get(candidate) != due:
+                        heapq.heappop(self._heap)  # stale: cancelled or rescheduled
+                        continue
+                    delay = due - time.time()
+                    if delay > 0:
+                        # Re-check periodically in case the wall clock jumps.
+                        self._cond.wait(min(delay, MAX_SLEEP_SECONDS))
+                        continue
+                    heapq.heappop(self._heap)
+                    del self._due[candidate]
+                    meeting_id = candidate
+                if not self._running:
+                    return
+            self._dispatch(meeting_id)
+
+    def _dispatch(self, meeting_id: int):
+        meeting = self.scheduler.get_meeting(meeting_id)
+        if meeting is None or meeting.reminded:
+            return
+        # Moved to a later time after its heap entry was popped: wait for the new due time.
+        if meeting.start_ts - self.offset_minutes * 60 > time.time():
+            self.schedule(meeting)
+            return
+        try:
+            # Server was down through the meeting: mark it reminded silently.
+            if time.time() > meeting.start_ts + 5 * 60:
+                logger.info(f"Skipping past meeting: {meeting.title} at {meeting.start}")
+            else:
+                self._trigger_reminder(meeting)
+            self.scheduler.set_reminded(meeting)
+        except Exception as e:
+            logger.error(f"Error sending reminder for meeting '{meeting.title}': {e}")
+
     def check_reminders(self):
         """
-        Iterates through meetings and sends reminders if within the configured window.
-        Triggered every minute by APScheduler.
+        Full resync of the reminder heap from the meeting list. Not needed in
+        normal operation (changes are scheduled incrementally); kept for manual
+        recovery.
         """
-        now = datetime.now(LOCAL_TZ)
-        logger.info(f"Checking reminders at {now.strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        modified = False
         for meeting in self.scheduler.meetings:
-            try:
-                # Meetings are stored as "YYYY-MM-DD HH:MM" strings.
-                # Use strptime then attach LOCAL_TZ
-                naive_start = datetime.strptime(meeting['start'], "%Y-%m-%d %H:%M")
-                start_dt = naive_start.replace(tzinfo=LOCAL_TZ)
-                
-                # Check for skipped meetings (Server Downtime case)
-                # If meeting is in future or within 1 minute grace period but not reminded
-                # Or if already passed but was recent? Let's stick to the 10-min window logic.
-                
-                reminder_time = start_dt - timedelta(minutes=self.offset_minutes)
-                
-                # Logic:
-                # 1. If start_dt has passed more than a few minutes ago, mark as reminded=True silently (cleanup edge case)
-                if now > (start_dt + timedelta(minutes=5)) and not meeting.get("reminded", False):
-                    logger.info(f"Skipping past meeting: {meeting['title']} at {meeting['start']}")
-                    meeting["reminded"] = True
-                    modified = True
-                    continue
-
-                # 2. Trigger window: current time is at or past reminder_time and meeting hasn't started yet
-                # OR it's currently starting (edge case restart).
-                if now >= reminder_time and now <= start_dt and not meeting.get("reminded", False):
-                    success = self._trigger_reminder(meeting)
-                    if success:
-                        meeting["reminded"] = True
-                        modified = True
-            except Exception as e:
-                logger.error(f"Error checking reminder for meeting '{meeting.get('title')}': {e}")
-                continue
-        
-        if modified:
-            self.scheduler.save_meetings()
+            self.schedule(meeting)
+        for series_id in list(self.scheduler.series):
+            occurrence = self.scheduler.get_meeting(series_id)
+            if occurrence is not None:
+                self.schedule(occurrence)
 
-    def _trigger_reminder(self, meeting: dict) -> bool:
+    def _trigger_reminder(self, meeting: Meeting) -> bool:
         """Sends notifications via multiple channels with simple retry logic."""
-        title = meeting.get("title", "Meeting")
-        start_str = meeting.get("start")
+        title = meeting.title
+        start_str = meeting.start
         
         message = f"🔔 **Meeting Reminder**\n\nYour meeting '{title}' is starting soon at {start_str} (in {self.offset_minutes} minutes)."
         
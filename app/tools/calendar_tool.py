@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from langchain_core.tools import tool
 from app.services.google_calendar_service import calendar_service
 from app.services.whatsapp_service import whatsapp_service
-from app.scheduler import meeting_scheduler # For reminder integration
+from app.scheduler import meeting_scheduler, add_reminder_job # For reminder integration
 
 @tool
 def calendar_tool(action: str, details: str) -> str:
@@ -39,11 +39,12 @@ def calendar_tool(action: str, details: str) -> str:
                 # We can reuse meeting_scheduler logic if compatible
                 reminder_time = start_dt - timedelta(minutes=10)
                 if reminder_time > datetime.now():
-                    meeting_scheduler.scheduler.add_job(
-                        lambda: whatsapp_service.send_message(f"🔔 Reminder: '{summary}' is starting in 10 mins!"),
-                        'date',
-                        run_date=reminder_time,
-                        id=f"gcal_reminder_{start_time}_{summary}"
+                    # Persisted job with a deterministic id, so re-creating the same event replaces it
+                    add_reminder_job(
+                        meeting_scheduler.scheduler,
+                        f"gcal_reminder_{start_time}_{summary}",
+                        reminder_time,
+                        f"🔔 Reminder: '{summary}' is starting in 10 mins!",
                     )
             return res
 
@@ -84,12 +84,23 @@ userInput.addEventListener('keypress', (e) => {
 
 // --- Meetings Logic ---
 
+// ETag and markup of the last meetings response; an unchanged list comes back as 304
+let meetingsEtag = null;
+let meetingsHtml = '';
+
 async function fetchMeetings() {
-    meetingsList.innerHTML = '<div class="empty-state">Loading...</div>';
+    if (!meetingsHtml) {
+        meetingsList.innerHTML = '<div class="empty-state">Loading...</div>';
+    }
 
     try {
-        const response = await fetch(`${API_URL}/meetings`);
+        const headers = meetingsEtag ? { 'If-None-Match': meetingsEtag } : {};
+        const response = await fetch(`${API_URL}/meetings?formatted=false`, { headers, cache: 'no-store' });
+        if (response.status === 304) {
+            return; // Unchanged since the last refresh
+        }
         const data = await response.json();
+        meetingsEtag = response.headers.get('ETag');
 
         meetingsList.innerHTML = ''; // Clear
 
@@ -108,13 +119,16 @@ async function fetchMeetings() {
                 card.classList.add('meeting-card');
                 card.innerHTML = `
                     <div class="meeting-title">${m.title}</div>
-                    <div class="meeting-time">📅 ${m.start_time} (${m.duration}m)</div>
+                    <div class="meeting-time">📅 ${m.start} (${m.duration}m)</div>
                 `;
                 meetingsList.appendChild(card);
             });
         }
+        meetingsHtml = meetingsList.innerHTML;
 
     } catch (error) {
+        meetingsEtag = null;
+        meetingsHtml = '';
         meetingsList.innerHTML = `<div class="empty-state">Error: ${error.message}</div>`;
     }
 }
@@ -0,0 +1,349 @@
+"""
+End-to-end retrieval benchmark for the RAG pipeline.
+
+Builds synthetic corpora (and, optionally, a corpus from real documents) at
+several sizes, loads each into a RAGPipeline per index type and times
+RAGPipeline.retrieve(), i.e. what a question actually goes through: query
+embedding (via the embedding cache), vector search over every segment, BM25,
+Reciprocal Rank Fusion and the per-version results cache.
+
+Each query is derived from one chunk (a few of its words, and for half of
+them its identifier), so recall@k is the share of queries whose source chunk
+is in the top k. Reported per configuration: recall@k, p50/p99 latency of
+uncached calls, p50 of cached repeats, build (ingest) time, resident memory
+(RSS growth from reopening the index and querying it) and size on disk.
+Results are written as JSON so runs can be compared over time.
+
+Synthetic corpora use an embedder that returns precomputed vectors (no model
+inference); real documents go through ingest_documents and the configured model.
+
+Examples:
+    python scripts/benchmarks/rag_benchmark.py --sizes 10000,100000 --output bench.json
+    python scripts/benchmarks/rag_benchmark.py --docs ./my_docs --chunk-sizes 500,1000
+    python scripts/benchmarks/rag_benchmark.py --sizes 10000 --baseline bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timezone
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+# Ensure the project root is in sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import Config
+from app.rag.embedding_cache import CachedEmbeddings
+from app.rag.rag_pipeline import RAGPipeline
+from app.rag.vector_index import INDEX_TYPES
+
+
+def parse_list(value, cast=int):
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux /proc, else psutil if installed, else None)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def disk_bytes(directory):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+
+
+class PrecomputedModel:
+    """Stands in for the embedding model: returns the synthetic vector of each known text."""
+    def __init__(self):
+        self.vectors = {}
+
+    def embed_documents(self, texts):
+        return [self.vectors[t] for t in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def synthetic_corpus(n, dim, n_clusters=256, seed=0):
+    """
+    Clustered Gaussian vectors with matching texts: every chunk has a unique
+    ticket id and words from its cluster's vocabulary, so BM25 and the dense
+    index see related signals, as they do with real embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + 0.35 * rng.normal(size=(n, dim)).astype(np.float32)
+    words = rng.integers(0, 64, size=(n, 12))
+    texts = [
+        f"Ticket TKT-{i:07d} " + " ".join(f"c{label}w{w}" for w in row)
+        for i, (label, row) in enumerate(zip(labels, words))
+    ]
+    return texts, np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def synthetic_queries(texts, vectors, n_queries, seed=1):
+    """(query text, query vector, source chunk id) for random chunks: some of their words, their vector plus noise."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(texts), size=min(n_queries, len(texts)), replace=False)
+    queries = []
+    for q, row in enumerate(rows):
+        words = texts[row].split()
+        picked = list(rng.choice(words[2:], size=4, replace=False))
+        text = " ".join((words[:2] if q % 2 == 0 else []) + picked)
+        vector = vectors[row] + 0.1 * rng.normal(size=vectors.shape[1]).astype(np.float32)
+        queries.append((text, vector, f"chunk-{row}"))
+    return queries
+
+
+def load_synthetic(pipeline, texts, vectors, batches):
+    """
+    Adds the corpus as `batches` ingests (one segment each) through the same
+    clone/commit path ingest_documents uses, without writing source files.
+    """
+    ids = [f"chunk-{i}" for i in range(len(texts))]
+    bounds = np.linspace(0, len(texts), batches + 1, dtype=int)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        docs = [Document(page_content=texts[i], metadata={"chunk_id": ids[i]}) for i in range(lo, hi)]
+        with pipeline._write_lock:
+            work = pipeline._snapshot.clone()
+            work.vector_store.add(docs, vectors[lo:hi], ids[lo:hi])
+            pipeline._commit(work)
+
+
+def document_queries(pipeline, n_queries, seed=1):
+    """(query text, None, source chunk id): eight consecutive words from random ingested chunks."""
+    rng = np.random.default_rng(seed)
+    chunks = [(chunk_id, doc.page_content.split()) for chunk_id, doc in pipeline.vector_store.chunks()]
+    chunks = [(chunk_id, words) for chunk_id, words in chunks if len(words) >= 8]
+    queries = []
+    for row in rng.choice(len(chunks), size=min(n_queries, len(chunks)), replace=False):
+        chunk_id, words = chunks[row]
+        start = int(rng.integers(0, len(words) - 7))
+        queries.append((" ".join(words[start:start + 8]), None, chunk_id))
+    return queries
+
+
+def wait_idle(pipeline):
+    """Background segment merges finish before anything is timed."""
+    while pipeline.is_busy():
+        time.sleep(0.05)
+
+
+def measure(pipeline, queries, ks, label, index_type, build_s, rss_before, directory):
+    """Runs every query for each k, uncached then cached. Returns a list of result rows."""
+    rows = []
+    for k in ks:
+        pipeline.results_cache.clear()
+        pipeline.embeddings.query_cache.clear()
+        latencies, cached_latencies, hits = [], [], 0
+        for text, _, source in queries:
+            t0 = time.perf_counter()
+            results = pipeline.retrieve(text, k)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            hits += any(doc.metadata.get("chunk_id") == source for doc in results)
+        for text, _, _ in queries:
+            t0 = time.perf_counter()
+            pipeline.retrieve(text, k)
+            cached_latencies.append((time.perf_counter() - t0) * 1000)
+
+        rss_after = rss_bytes()
+        store = pipeline.vector_store
+        rows.append({
+            **label,
+            "index_type": index_type,
+            "effective_types": sorted({s.store.index_type for s in store.segments}),
+            "segments": len(store.segments),
+            "hybrid": Config.RAG_HYBRID_SEARCH,
+            "k": k,
+            "nprobe": Config.RAG_NPROBE,
+            "ef_search": Config.RAG_EF_SEARCH,
+            "recall_at_k": round(hits / len(queries), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "cached_p50_ms": round(float(np.percentile(cached_latencies, 50)), 4),
+            "build_s": round(build_s, 3),
+            "resident_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            "estimated_bytes": pipeline.memory_bytes(),
+            "disk_bytes": disk_bytes(directory),
+            "chunks": len(store),
+        })
+        row = rows[-1]
+        resident = f"{row['resident_bytes'] / 1e6:.1f}MB" if row["resident_bytes"] is not None else "n/a"
+        print(f"  {index_type:>8} {row['effective_types']} k={k:<3} recall={row['recall_at_k']:.3f} "
+              f"p50={row['p50_ms']:.2f}ms p99={row['p99_ms']:.2f}ms cached={row['cached_p50_ms']:.3f}ms "
+              f"build={build_s:.1f}s rss={resident} disk={row['disk_bytes'] / 1e6:.1f}MB")
+    return rows
+
+
+def run_config(corpus, ks, label, index_type, n_queries, work_dir):
+    """Builds one collection, reopens it from disk and measures retrieval on it."""
+    Config.RAG_INDEX_TYPE = index_type
+    directory = tempfile.mkdtemp(prefix=f"{index_type}-", dir=work_dir)
+    embeddings = corpus["embeddings"]()
+    try:
+        pipeline = RAGPipeline(directory, embeddings=embeddings, llm=object())
+        start = time.perf_counter()
+        corpus["load"](pipeline)
+        wait_idle(pipeline)
+        build_s = time.perf_counter() - start
+        pipeline.close()
+
+        # Memory is measured on a fresh open, as a restarted server would hold it.
+        rss_before = rss_bytes()
+        pipeline = RAGPipeline(directory, embeddings=embeddings, llm=object())
+        queries = corpus["queries"](pipeline, n_queries)
+        if not queries:
+            print(f"  {index_type:>8} no usable chunks for queries, skipped")
+            return []
+        rows = measure(pipeline, queries, ks, label, index_type, build_s, rss_before, directory)
+        pipeline.close()
+        return rows
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def synthetic_setup(size, dim, n_queries, work_dir):
+    texts, vectors = synthetic_corpus(size, dim)
+    model = PrecomputedModel()
+    model.vectors.update(zip(texts, vectors))
+    queries = synthetic_queries(texts, vectors, n_queries)
+    model.vectors.update((text, vector) for text, vector, _ in queries)
+
+    def embeddings():
+        emb = CachedEmbeddings("precomputed", tempfile.mkdtemp(prefix="embeddings-", dir=work_dir))
+        emb._model = model
+        return emb
+
+    return {
+        "embeddings": embeddings,
+        "load": lambda pipeline: load_synthetic(pipeline, texts, vectors, Config.RAG_MAX_SEGMENTS),
+        "queries": lambda pipeline, n: queries,
+    }
+
+
+def documents_setup(docs_dir, chunk_size, chunk_overlap):
+    """Real documents, ingested with the pipeline's loaders and the configured embedding model."""
+    from app.rag.loaders import SUPPORTED_EXTENSIONS
+    from app.rag.rag_pipeline import create_embeddings
+
+    paths = []
+    for root, _, files in os.walk(docs_dir):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(SUPPORTED_EXTENSIONS))
+
+    def load(pipeline):
+        # Parsed text is cached per file hash, so sweeping chunk sizes parses each document once.
+        Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP = chunk_size, chunk_overlap
+        pipeline.ingest_documents(paths)
+
+    return {"embeddings": create_embeddings, "load": load, "queries": document_queries}
+
+
+def compare(results, baseline_path, tolerance):
+    """Prints recall/latency deltas against a previous run; returns True on regression."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    def key(row):
+        return (row["corpus"], row["chunks"], row.get("chunk_size"), row["index_type"], row["k"])
+
+    previous = {key(r): r for r in baseline}
+    regressed = False
+    print("\n--- Comparison with baseline ---")
+    for row in results:
+        old = previous.get(key(row))
+        if not old:
+            continue
+        d_recall = row["recall_at_k"] - old["recall_at_k"]
+        d_p99 = row["p99_ms"] - old["p99_ms"]
+        flag = ""
+        if d_recall < -tolerance:
+            flag = "  <-- recall regression"
+            regressed = True
+        print(f"{key(row)}: recall {d_recall:+.4f}, p99 {d_p99:+.2f}ms{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end RAG retrieval across index configurations.")
+    parser.add_argument("--sizes", default="10000,100000", help="Synthetic corpus sizes (chunks).")
+    parser.add_argument("--index-types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--k", default="1,4,10", help="Values of k to evaluate.")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension (MiniLM = 384).")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, default=Config.RAG_NPROBE)
+    parser.add_argument("--ef-search", type=int, default=Config.RAG_EF_SEARCH)
+    parser.add_argument("--no-hybrid", action="store_true", help="Vector search only (RAG_HYBRID_SEARCH=false).")
+    parser.add_argument("--docs", help="Folder of real documents to build a sample corpus from.")
+    parser.add_argument("--chunk-sizes", default=str(Config.RAG_CHUNK_SIZE), help="Chunk sizes for the sample corpus.")
+    parser.add_argument("--output", default="rag_benchmark.json")
+    parser.add_argument("--baseline", help="Previous JSON output to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed recall drop before flagging.")
+    args = parser.parse_args()
+
+    ks = parse_list(args.k)
+    index_types = parse_list(args.index_types, str)
+    Config.RAG_NPROBE = args.nprobe
+    Config.RAG_EF_SEARCH = args.ef_search
+    Config.RAG_HYBRID_SEARCH = not args.no_hybrid
+    Config.RAG_DEDUP_MODE = "off"  # every chunk stays retrievable under its own id
+
+    work_dir = tempfile.mkdtemp(prefix="rag-benchmark-")
+    corpora = []
+    for size in parse_list(args.sizes):
+        corpora.append(({"corpus": "synthetic", "chunk_size": None}, lambda size=size: synthetic_setup(size, args.dim, args.queries, work_dir)))
+    if args.docs:
+        for chunk_size in parse_list(args.chunk_sizes):
+            overlap = min(Config.RAG_CHUNK_OVERLAP, chunk_size // 5)
+            corpora.append((
+                {"corpus": os.path.basename(os.path.abspath(args.docs)), "chunk_size": chunk_size},
+                lambda chunk_size=chunk_size, overlap=overlap: documents_setup(args.docs, chunk_size, overlap),
+            ))
+
+    results = []
+    try:
+        for label, make in corpora:
+            corpus = make()
+            print(f"\nCorpus {label['corpus']} (chunk_size={label['chunk_size']})")
+            for index_type in index_types:
+                results.extend(run_config(corpus, ks, label, index_type, args.queries, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "faiss_version": getattr(faiss, "__version__", "unknown"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "queries": args.queries,
+            "dim": args.dim,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
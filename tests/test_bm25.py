@@ -0,0 +1,61 @@
+from app.rag.bm25 import BM25Index, BM25View, tokenize
+from app.rag.retrieval import reciprocal_rank_fusion
+
+
+def test_tokenize_keeps_identifiers():
+    tokens = tokenize("Invoice INV-2041 dated 2024-05-01.")
+    assert "inv-2041" in tokens
+    assert "2024-05-01" in tokens
+    assert "2041" in tokens
+
+
+def test_exact_identifier_ranks_first():
+    index = BM25Index()
+    index.add("a", "Invoice INV-2041 for the cloud hosting bill.")
+    index.add("b", "Invoice INV-2042 for office supplies.")
+    index.add("c", "Team offsite agenda and travel plans.")
+
+    hits = index.search("What is the amount on INV-2041?", k=2)
+    assert hits[0][0] == "a"
+
+
+def test_remove_updates_postings():
+    index = BM25Index()
+    index.add("a", "project chimera launch")
+    index.add("b", "project apollo budget")
+    index.remove("a")
+
+    assert "a" not in index
+    assert index.search("chimera") == []
+    assert index.total_len == index.doc_len["b"]
+
+
+def test_save_and_load(tmp_path):
+    index = BM25Index()
+    index.add("a", "vault code 998877")
+    path = str(tmp_path / "bm25.pkl")
+    index.save(path)
+
+    assert BM25Index.load(path).search("998877")[0][0] == "a"
+
+
+def test_reciprocal_rank_fusion_prefers_consensus():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]])
+    assert fused[0][0] == "y"
+    assert {item for item, _ in fused} == {"x", "y", "z", "w"}
+
+
+def test_view_over_parts_scores_like_one_merged_index():
+    texts = {"a": "invoice INV-2041 paid", "b": "invoice overdue", "c": "meeting notes", "d": "invoice draft"}
+    merged = BM25Index()
+    for chunk_id in ("a", "b", "d"):
+        merged.add(chunk_id, texts[chunk_id])
+
+    first, second = BM25Index(), BM25Index()
+    for chunk_id in ("a", "b", "c"):
+        first.add(chunk_id, texts[chunk_id])
+    second.add("d", texts["d"])
+    view = BM25View([(first, {"c"}), (second, frozenset())])
+
+    assert len(view) == 3 and "c" not in view
+    assert view.search("invoice paid", k=3) == merged.search("invoice paid", k=3)
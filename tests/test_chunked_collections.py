@@ -0,0 +1,59 @@
+import bisect
+import random
+
+from app.services.chunked_collections import ChunkedSortedList, ShardedDict
+
+
+def test_sorted_list_matches_a_plain_sorted_list(monkeypatch):
+    monkeypatch.setattr(ChunkedSortedList, "CHUNK_SIZE", 4)  # many splits and merges
+    rng = random.Random(7)
+    chunked, expected = ChunkedSortedList(key=lambda x: x // 10), []
+    for _ in range(500):
+        value = rng.randrange(300)
+        if expected and rng.random() < 0.4:
+            value = rng.choice(expected)
+            assert chunked.remove(value)
+            expected.remove(value)
+        else:
+            chunked.add(value)
+            bisect.insort_right(expected, value, key=lambda x: x // 10)
+        assert list(chunked) == expected
+
+    assert len(chunked) == len(expected) and chunked[-1] == expected[-1]
+    assert [chunked[i] for i in range(len(expected))] == expected
+    assert list(chunked.islice(5, 20)) == expected[5:20]
+    assert chunked.bisect_left(12) == bisect.bisect_left(expected, 12, key=lambda x: x // 10)
+    assert chunked.bisect_right(12) == bisect.bisect_right(expected, 12, key=lambda x: x // 10)
+    assert not chunked.remove(1000)
+
+    chunked.update(range(300))
+    assert list(chunked) == sorted(expected + list(range(300)), key=lambda x: x // 10)
+
+
+def test_sorted_list_copies_share_untouched_chunks(monkeypatch):
+    monkeypatch.setattr(ChunkedSortedList, "CHUNK_SIZE", 4)
+    original = ChunkedSortedList(range(0, 100, 2))
+    clone = original.copy()
+
+    clone.add(51)
+    clone.remove(0)
+
+    assert list(original) == list(range(0, 100, 2))
+    assert 51 in clone and 0 not in clone
+    shared = {id(c) for c in original._chunks} & {id(c) for c in clone._chunks}
+    assert len(shared) == len(original._chunks) - 2
+
+
+def test_sharded_dict_copies_are_independent():
+    original = ShardedDict({i: str(i) for i in range(1000)})
+    clone = original.copy()
+
+    clone[5] = "five"
+    del clone[6]
+    original[7] = "seven"
+
+    assert (original[5], original[6], clone[7]) == ("5", "6", "7")
+    assert (clone[5], 6 in clone, original[7]) == ("five", False, "seven")
+    assert (len(original), len(clone)) == (1000, 999)
+    unshared = [a is not b for a, b in zip(original._shards, clone._shards)]
+    assert sum(unshared) <= 3
@@ -0,0 +1,54 @@
+import pytest
+
+from app.rag.collection_manager import CollectionManager
+
+
+class IdlePipeline:
+    def __init__(self, busy=False):
+        self.busy = busy
+        self.closed = False
+
+    def is_busy(self):
+        return self.busy
+
+    def close(self):
+        self.closed = True
+
+
+def test_collection_names_are_validated():
+    assert CollectionManager.validate_name("project-x_2") == "project-x_2"
+    with pytest.raises(ValueError):
+        CollectionManager.validate_name("../etc")
+
+
+def test_least_recently_used_idle_collections_are_evicted(tmp_path):
+    manager = CollectionManager(root=str(tmp_path), memory_cap_mb=1)
+    mb = 1024 * 1024
+    for name, busy in (("alice", False), ("bob", True), ("carol", False), ("dave", False)):
+        manager._open[name] = IdlePipeline(busy)
+        manager._sizes[name] = mb // 2
+
+    with manager._lock:
+        manager._evict(keep="dave")
+
+    # alice (LRU) and carol go; bob is mid-ingest and dave was just opened.
+    assert list(manager.loaded()) == ["bob", "dave"]
+
+
+def test_leased_collections_are_not_evicted(tmp_path):
+    manager = CollectionManager(root=str(tmp_path), memory_cap_mb=1)
+    mb = 1024 * 1024
+    for name in ("alice", "bob"):
+        manager._open[name] = IdlePipeline()
+        manager._sizes[name] = mb
+
+    with manager.lease("alice") as pipeline:
+        with manager._lock:
+            manager._evict(keep="bob")
+        # alice is in use: it stays open and is not closed under the caller.
+        assert "alice" in manager.loaded()
+        assert not pipeline.closed
+
+    with manager._lock:
+        manager._evict(keep="bob")
+    assert list(manager.loaded()) == ["bob"]
@@ -0,0 +1,35 @@
+from langchain_core.documents import Document
+
+from app.rag.context_packer import estimate_tokens, overlap_length, pack_context
+
+
+def chunk(text, index, source="policy.txt"):
+    return Document(page_content=text, metadata={"source": source, "chunk_index": index})
+
+
+def test_overlap_length():
+    assert overlap_length("alpha beta gamma", "beta gamma delta", 50) == len("beta gamma")
+    assert overlap_length("abc", "xyz", 50) == 0
+
+
+def test_adjacent_chunks_are_merged_without_overlap():
+    docs = [
+        chunk("Refunds are issued within 14 days. Contact billing.", 1),
+        chunk("Leave policy: 20 days per year. Refunds are issued", 0),
+    ]
+    context = pack_context(docs, token_budget=500, max_overlap=50)
+
+    assert context == "Leave policy: 20 days per year. Refunds are issued within 14 days. Contact billing."
+
+
+def test_spans_ordered_by_rank_and_fit_budget():
+    docs = [
+        chunk("Most relevant fact. " * 5, 0, source="a.txt"),
+        chunk("Second fact. " * 5, 0, source="b.txt"),
+        chunk("Third fact that will not fit. " * 20, 0, source="c.txt"),
+    ]
+    context = pack_context(docs, token_budget=60, max_overlap=50)
+
+    assert context.startswith("Most relevant fact.")
+    assert "Second fact." in context
+    assert estimate_tokens(context) <= 60
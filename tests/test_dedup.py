@@ -0,0 +1,29 @@
+from app.rag.dedup import NearDuplicateIndex, lsh_params, shingles
+
+POLICY = (
+    "Employees may work remotely up to three days per week with manager approval. "
+    "Remote days must be recorded in the HR portal before the start of each month, "
+    "and equipment is provided by the IT department on request."
+)
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Hello, World!", size=5) == shingles("hello world", size=5)
+
+
+def test_lsh_threshold_close_to_requested():
+    bands, rows = lsh_params(0.9, 128)
+    assert bands * rows <= 128
+    assert abs((1 / bands) ** (1 / rows) - 0.9) < 0.05
+
+
+def test_near_duplicate_found_and_distinct_text_not():
+    index = NearDuplicateIndex(threshold=0.8, num_perm=128, shingle_size=3)
+    index.add("policy-v1", POLICY)
+
+    revised = POLICY + " Updated March."
+    assert index.find(index.hasher.signature(revised)) == "policy-v1"
+    assert index.find(index.hasher.signature("Quarterly revenue grew 12% on strong cloud sales.")) is None
+
+    index.remove("policy-v1")
+    assert index.find(index.hasher.signature(POLICY)) is None
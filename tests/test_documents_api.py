@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import main
+from app.services.ingestion_service import IngestionService
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    service = IngestionService(str(tmp_path / "uploads"))
+    monkeypatch.setattr(service, "_ensure_worker", lambda: None)  # jobs stay queued
+    monkeypatch.setattr(main, "ingestion_service", service)
+    return TestClient(main.app), service
+
+
+def test_upload_is_staged_and_queued(client):
+    client, service = client
+    response = client.post("/documents", files=[("files", ("notes.txt", b"Invoice INV-2041", "text/plain"))])
+
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["status"], job["files"], job["collection"], job["files_total"]) == ("queued", ["notes.txt"], "default", 1)
+    with open(f"{service.incoming_dir}/{job['id']}/notes.txt", "rb") as f:
+        assert f.read() == b"Invoice INV-2041"
+
+    status = client.get(f"/documents/jobs/{job['id']}")
+    assert status.status_code == 200 and status.json()["status"] == "queued"
+    assert client.get("/documents/jobs/unknown").status_code == 404
+
+
+def test_explicit_default_collection_is_the_same_as_none(client):
+    client, _ = client
+    upload = [("files", ("a.txt", b"x", "text/plain"))]
+    explicit = client.post("/documents", files=upload, data={"collection": "default"}).json()
+    omitted = client.post("/documents", files=upload).json()
+    assert explicit["collection"] == omitted["collection"] == "default"
+
+
+def test_invalid_uploads_are_rejected(client):
+    client, _ = client
+    assert client.post("/documents", files=[("files", ("a.exe", b"x", "application/octet-stream"))]).status_code == 400
+    bad_name = client.post("/documents", files=[("files", ("a.txt", b"x", "text/plain"))], data={"collection": "../etc"})
+    assert bad_name.status_code == 400
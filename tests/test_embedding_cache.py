@@ -0,0 +1,46 @@
+from app.rag.embedding_cache import CachedEmbeddings
+
+
+class FakeModel:
+    """Deterministic stand-in for HuggingFaceEmbeddings that counts calls."""
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+
+def make_embeddings(cache_dir, batch_size=2):
+    emb = CachedEmbeddings("fake-model", str(cache_dir), batch_size=batch_size)
+    emb._model = FakeModel()
+    return emb
+
+
+def test_batches_and_deduplicates(tmp_path):
+    emb = make_embeddings(tmp_path)
+    vectors = emb.embed_documents(["a", "bb", "a", "ccc"])
+
+    assert vectors[0] == vectors[2] == [1.0, 1.0, 0.5]
+    # Three unique texts with batch_size=2 -> two model calls.
+    assert emb._model.calls == [["a", "bb"], ["ccc"]]
+
+
+def test_cache_survives_restart(tmp_path):
+    make_embeddings(tmp_path).embed_documents(["alpha", "beta"])
+
+    emb = make_embeddings(tmp_path)
+    assert emb.embed_documents(["beta", "alpha"]) == [[4.0, 1.0, 0.5], [5.0, 1.0, 0.5]]
+    assert emb._model.calls == []
+
+
+def test_query_embeddings_are_cached_by_normalized_text(tmp_path):
+    emb = make_embeddings(tmp_path)
+    emb._model.embed_query = lambda text: emb._model.calls.append([text]) or [1.0, 2.0, 3.0]
+
+    first = emb.embed_query("What is the  vault code?")
+    second = emb.embed_query("what is the vault code?  ")
+
+    assert first == second
+    assert len(emb._model.calls) == 1
+    assert emb.query_cache.hits == 1
@@ -0,0 +1,85 @@
+import time as clock
+from datetime import datetime, time, timezone
+
+from app.services.free_slots import (
+    find_conflicts, find_free_slots, format_slots, freebusy_to_local, local_to_utc_iso, merge_intervals,
+    upcoming_window_start,
+)
+
+
+def test_overlapping_busy_intervals_are_merged():
+    busy = [
+        (datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 11, 0)),
+        (datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 10, 30)),
+        (datetime(2030, 1, 7, 11, 0), datetime(2030, 1, 7, 11, 15)),
+        (datetime(2030, 1, 7, 14, 0), datetime(2030, 1, 7, 15, 0)),
+    ]
+    assert merge_intervals(busy) == [
+        (datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 11, 15)),
+        (datetime(2030, 1, 7, 14, 0), datetime(2030, 1, 7, 15, 0)),
+    ]
+
+
+def test_gaps_respect_working_hours_duration_and_weekends():
+    busy = [
+        (datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 11, 15)),
+        (datetime(2030, 1, 7, 12, 0), datetime(2030, 1, 7, 12, 30)),   # leaves a 45-min gap before it
+        (datetime(2030, 1, 7, 16, 0), datetime(2030, 1, 8, 10, 0)),    # spans into the next day
+    ]
+    slots = find_free_slots(busy, datetime(2030, 1, 7), datetime(2030, 1, 9), duration_minutes=60,
+                            day_start=time(9, 0), day_end=time(17, 0))
+
+    assert slots == [
+        (datetime(2030, 1, 7, 12, 30), datetime(2030, 1, 7, 16, 0)),
+        (datetime(2030, 1, 8, 10, 0), datetime(2030, 1, 8, 17, 0)),
+    ]
+    assert "Tue 2030-01-08: 10:00-17:00" in format_slots(slots, 60)
+
+
+def test_weekends_are_skipped():
+    # 2030-01-12 is a Saturday.
+    slots = find_free_slots([], datetime(2030, 1, 12), datetime(2030, 1, 15))
+    assert slots == [(datetime(2030, 1, 14, 9, 0), datetime(2030, 1, 14, 18, 0))]
+
+
+def test_conflicts_are_found_in_one_sweep_against_busy_and_earlier_candidates():
+    busy = [(9, 10), (10, 11), (14, 15)]
+    candidates = [
+        (11, 12, "after-busy"),       # touches the end of busy time: fine
+        (10.5, 10.75, "inside-busy"),
+        (11.5, 13, "overlaps-earlier-candidate"),
+        (13, 14, "before-busy"),
+        (14.5, 16, "overlaps-busy"),
+        (16, 17, "series"),
+        (18, 19, "series"),
+    ]
+    assert find_conflicts(candidates, busy) == {"inside-busy", "overlaps-earlier-candidate", "overlaps-busy"}
+
+
+def test_google_busy_times_are_converted_to_local_time():
+    # Events made in the Google UI come back with any offset; local time is Asia/Kolkata (+05:30).
+    busy = [
+        {"start": "2030-01-07T04:30:00Z", "end": "2030-01-07T05:30:00Z"},
+        {"start": "2030-01-07T09:00:00+02:00", "end": "2030-01-07T10:00:00+02:00"},
+    ]
+    assert freebusy_to_local(busy) == [
+        (datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 11, 0)),
+        (datetime(2030, 1, 7, 12, 30), datetime(2030, 1, 7, 13, 30)),
+    ]
+    assert local_to_utc_iso(datetime(2030, 1, 7, 9, 0)) == "2030-01-07T03:30:00Z"
+
+
+def test_window_is_clamped_to_now_in_the_configured_zone_not_the_hosts(monkeypatch):
+    # The host runs in UTC (as in Docker); it is 04:30Z, i.e. 10:00 in Asia/Kolkata.
+    monkeypatch.setenv("TZ", "UTC")
+    clock.tzset()
+    pinned = datetime(2030, 1, 7, 4, 30, 20, tzinfo=timezone.utc).timestamp()
+    monkeypatch.setattr(clock, "time", lambda: pinned)
+    try:
+        assert upcoming_window_start(datetime(2030, 1, 7)) == datetime(2030, 1, 7, 10, 0)
+        assert upcoming_window_start(datetime(2030, 1, 8)) == datetime(2030, 1, 8)
+        slots = find_free_slots([], upcoming_window_start(datetime(2030, 1, 7)), datetime(2030, 1, 8))
+        assert slots == [(datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 18, 0))]
+    finally:
+        monkeypatch.undo()
+        clock.tzset()
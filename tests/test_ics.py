@@ -0,0 +1,104 @@
+from app.services.ics import IcsError, _vtimezone, iter_calendar, iter_events
+from app.services.meeting import Meeting, format_local, parse_local
+
+SAMPLE = [
+    "BEGIN:VCALENDAR\r\n",
+    "VERSION:2.0\r\n",
+    "BEGIN:VEVENT\r\n",
+    "UID:a@example.com\r\n",
+    "DTSTART:20300107T033000Z\r\n",
+    "DTEND:20300107T043000Z\r\n",
+    "SUMMARY:Design review\\, round 2\\; with a very long title that gets fo\r\n",
+    " lded\r\n",
+    "BEGIN:VALARM\r\n",
+    "DTSTART:20300101T000000Z\r\n",
+    "END:VALARM\r\n",
+    "END:VEVENT\r\n",
+    "BEGIN:VEVENT\r\n",
+    "DTSTART;TZID=Asia/Kolkata:20300108T090000\r\n",
+    "DURATION:PT45M\r\n",
+    "SUMMARY:Standup\r\n",
+    "RRULE:FREQ=WEEKLY;UNTIL=20300301T000000Z\r\n",
+    "EXDATE;TZID=Asia/Kolkata:20300115T090000\r\n",
+    "END:VEVENT\r\n",
+    "BEGIN:VEVENT\r\n",
+    "DTSTART;VALUE=DATE:20300109\r\n",
+    "SUMMARY:Holiday\r\n",
+    "END:VEVENT\r\n",
+    "END:VCALENDAR\r\n",
+]
+
+
+def test_events_are_parsed_with_folding_escapes_and_time_zones():
+    first, second, third = list(iter_events(SAMPLE))
+
+    # 03:30Z is 09:00 in Asia/Kolkata; the nested VALARM's DTSTART is ignored.
+    assert first.title == "Design review, round 2; with a very long title that gets folded"
+    assert format_local(first.start_ts) == "2030-01-07 09:00"
+    assert first.duration == 60
+    assert first.uid == "a@example.com"
+
+    # UNTIL is rewritten from UTC to local time.
+    assert format_local(second.start_ts) == "2030-01-08 09:00"
+    assert second.duration == 45
+    assert second.rrule == "FREQ=WEEKLY;UNTIL=20300301T053000"
+    assert {format_local(ts) for ts in second.exdates} == {"2030-01-15 09:00"}
+
+    assert isinstance(third, IcsError)
+    assert third.line == 20
+
+
+def test_recurring_events_from_a_zone_with_dst_are_rejected():
+    # 09:00 Berlin is 13:30 IST in winter but 12:30 in summer; expanding the rule
+    # in local time would keep every occurrence at 13:30.
+    lines = [
+        "BEGIN:VEVENT\r\n",
+        "DTSTART;TZID=Europe/Berlin:20300304T090000\r\n",
+        "DURATION:PT30M\r\n",
+        "SUMMARY:Weekly sync\r\n",
+        "RRULE:FREQ=WEEKLY;COUNT=8\r\n",
+        "END:VEVENT\r\n",
+        "BEGIN:VEVENT\r\n",
+        "DTSTART;TZID=Europe/Berlin:20300708T090000\r\n",
+        "DURATION:PT30M\r\n",
+        "SUMMARY:One-off in summer\r\n",
+        "END:VEVENT\r\n",
+    ]
+    series, one_off = list(iter_events(lines))
+
+    assert isinstance(series, IcsError)
+    assert "Europe/Berlin" in str(series)
+    # A single event has no rule to drift: it is converted with its own DST offset.
+    assert format_local(one_off.start_ts) == "2030-07-08 12:30"
+
+
+def test_export_round_trips_through_the_parser():
+    meetings = [
+        Meeting(id=1, title="Budget, Q1; draft\nsecond line " + "x" * 80, start_ts=parse_local("2030-01-07 09:00").timestamp(), duration=30),
+        Meeting(id=2, title="Standup", start_ts=parse_local("2030-01-08 10:00").timestamp(), duration=15,
+                rrule="FREQ=DAILY;COUNT=5", exdates=frozenset({parse_local("2030-01-09 10:00").timestamp()})),
+    ]
+    text = "".join(iter_calendar(meetings))
+
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    assert all(len(line.encode("utf-8")) <= 75 for line in text.split("\r\n"))
+    # Every referenced TZID has a VTIMEZONE definition.
+    assert "BEGIN:VTIMEZONE\r\nTZID:Asia/Kolkata\r\n" in text
+    assert "TZOFFSETTO:+0530\r\n" in text
+
+    parsed = list(iter_events(text.splitlines(keepends=True)))
+    assert [(e.title, e.start_ts, e.duration, e.rrule, e.exdates) for e in parsed] == [
+        (m.title, m.start_ts, m.duration, m.rrule, m.exdates) for m in meetings
+    ]
+
+
+def test_vtimezone_describes_both_sides_of_a_dst_zone():
+    lines = _vtimezone("Europe/Berlin")
+    text = "\r\n".join(lines)
+
+    assert lines[:2] == ["BEGIN:VTIMEZONE", "TZID:Europe/Berlin"]
+    assert "BEGIN:DAYLIGHT" in text and "BEGIN:STANDARD" in text
+    assert "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU\r\nTZOFFSETFROM:+0100\r\nTZOFFSETTO:+0200" in text
+    assert "RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU\r\nTZOFFSETFROM:+0200\r\nTZOFFSETTO:+0100" in text
+    # Zones without DST keep a single fixed offset.
+    assert _vtimezone("Asia/Kolkata").count("BEGIN:STANDARD") == 1
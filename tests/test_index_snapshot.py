@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.rag.manifest import IngestManifest
+from app.rag.segments import SegmentedIndex
+from app.rag.snapshot import CURRENT_FILENAME, IndexSnapshot, current_dir, publish_snapshot
+from app.rag.vector_index import IndexSpec
+
+
+def _snapshot(index_path, version):
+    manifest = IngestManifest(str(index_path))
+    manifest.entries = {f"/docs/{version}.txt": {"size": 1, "mtime": 1.0, "sha256": "x", "chunk_ids": []}}
+    store = SegmentedIndex(str(index_path / "segments"), IndexSpec(), mmap=False)
+    return IndexSnapshot(store, manifest, version)
+
+
+def test_publish_moves_current_pointer(tmp_path):
+    publish_snapshot(str(tmp_path), _snapshot(tmp_path, 1))
+    directory = publish_snapshot(str(tmp_path), _snapshot(tmp_path, 2))
+
+    assert current_dir(str(tmp_path)) == directory
+    assert (tmp_path / CURRENT_FILENAME).read_text() == "v00000002"
+    assert "/docs/2.txt" in IngestManifest(directory).entries
+
+
+def test_clone_does_not_touch_published_state(tmp_path):
+    original = _snapshot(tmp_path, 1)
+    work = original.clone()
+    work.manifest.remove("/docs/1.txt")
+    work.vector_store.add([Document(page_content="invoice INV-2041", metadata={"chunk_id": "c1"})],
+                          np.ones((1, 8), dtype=np.float32), ["c1"])
+
+    assert "/docs/1.txt" in original.manifest.entries
+    assert len(original.bm25) == 0
+
+
+def test_old_versions_are_pruned(tmp_path):
+    for version in range(1, 5):
+        publish_snapshot(str(tmp_path), _snapshot(tmp_path, version))
+
+    assert sorted(os.listdir(tmp_path / "versions")) == ["v00000003", "v00000004"]
@@ -0,0 +1,65 @@
+import os
+
+from app.rag import collection_manager as collection_manager_module
+from app.rag.rag_pipeline import IngestProgress
+from app.services.ingestion_service import IngestionService
+
+
+class FakeCollections:
+    """Records ingests instead of embedding; fails files whose name starts with 'bad'."""
+    def __init__(self):
+        self.calls = []
+
+    def ingest_documents(self, paths, collection=None, progress=None):
+        self.calls.append((paths, collection))
+        report = IngestProgress(files_total=len(paths))
+        for path in paths:
+            report.files_done += 1
+            if os.path.basename(path).startswith("bad"):
+                report.files_failed += 1
+                report.errors.append(f"{path}: cannot parse")
+            else:
+                report.chunks_parsed += 2
+                report.chunks_embedded += 2
+            if progress:
+                progress(report)
+        return report
+
+
+def _stage(service, names):
+    job_id, staging = service.new_job_dir()
+    for name in names:
+        with open(os.path.join(staging, name), "w", encoding="utf-8") as f:
+            f.write("text")
+    return job_id
+
+
+def test_job_status_tracks_progress_and_publishes_files(tmp_path, monkeypatch):
+    fake = FakeCollections()
+    monkeypatch.setattr(collection_manager_module, "collection_manager", fake, raising=False)
+    service = IngestionService(str(tmp_path / "uploads"))
+
+    job = service.submit(_stage(service, ["a.txt", "bad.txt"]), ["a.txt", "bad.txt"], "project-x")
+    service._queue.join()
+
+    job = service.get_job(job.id)
+    assert job.status == "completed"
+    assert (job.files_total, job.files_done, job.files_failed, job.chunks_embedded) == (2, 2, 1, 2)
+    assert len(job.errors) == 1 and "bad.txt" in job.errors[0]
+    target = tmp_path / "uploads" / "project-x"
+    assert fake.calls == [([str(target / "a.txt"), str(target / "bad.txt")], "project-x")]
+    assert not os.listdir(tmp_path / "uploads" / ".incoming")
+    assert job.started_at and job.finished_at
+
+
+def test_default_collection_uploads_go_to_the_top_folder_and_total_failure_fails_the_job(tmp_path, monkeypatch):
+    fake = FakeCollections()
+    monkeypatch.setattr(collection_manager_module, "collection_manager", fake, raising=False)
+    service = IngestionService(str(tmp_path / "uploads"))
+
+    job = service.submit(_stage(service, ["bad.txt"]), ["bad.txt"], "default")
+    service._queue.join()
+
+    assert service.get_job(job.id).status == "failed"
+    assert fake.calls == [([str(tmp_path / "uploads" / "bad.txt")], "default")]
+    assert service.collection_upload_dir(None) == service.collection_upload_dir("default")
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from app.services.interval_index import IntervalIndex
+
+BASE = datetime(2026, 3, 2, 9, 0)
+
+
+def _slot(offset_minutes, duration):
+    start = BASE + timedelta(minutes=offset_minutes)
+    return start, start + timedelta(minutes=duration)
+
+
+def test_overlap_is_half_open():
+    index = IntervalIndex()
+    index.add(1, *_slot(0, 30))
+
+    assert index.has_overlap(*_slot(15, 30))
+    assert not index.has_overlap(*_slot(30, 30))  # back-to-back is fine
+    assert not index.has_overlap(*_slot(-30, 30))
+    assert not index.has_overlap(*_slot(0, 30), exclude=1)
+
+
+def test_long_meeting_found_from_far_before():
+    index = IntervalIndex()
+    index.add("offsite", *_slot(0, 8 * 60))
+    index.add("standup", *_slot(7 * 60, 15))
+
+    assert index.overlapping(*_slot(6 * 60, 90)) == ["offsite", "standup"]
+
+
+def test_updates_and_removals_are_incremental():
+    index = IntervalIndex()
+    for key in range(100):
+        index.add(key, *_slot(key * 60, 30))
+
+    index.add(5, *_slot(10_000, 30))  # re-adding a key moves it
+    index.remove(7)
+
+    assert index.overlapping(*_slot(5 * 60, 180)) == [6]
+    assert index.keys()[-1] == 5
+    assert index.ending_before(BASE + timedelta(minutes=3 * 60)) == [0, 1, 2]
+    assert len(index) == 99
+
+
+def test_copy_is_independent():
+    index = IntervalIndex()
+    index.add(1, datetime(2030, 1, 1, 9, 0), datetime(2030, 1, 1, 10, 0))
+    clone = index.copy()
+    clone.remove(1)
+    clone.add(2, datetime(2030, 1, 1, 11, 0), datetime(2030, 1, 1, 12, 0))
+
+    assert index.keys() == [1] and clone.keys() == [2]
@@ -0,0 +1,49 @@
+import json
+
+from app.services.meeting import parse_local
+from app.services.meeting_store import MeetingStore
+
+
+def _ts(value):
+    return parse_local(value).timestamp()
+
+
+def test_row_level_changes_persist(tmp_path):
+    store = MeetingStore(str(tmp_path / "meetings.db"))
+    first = store.insert("Standup", _ts("2030-01-06 09:00"), 15)
+    second = store.insert("Review", _ts("2030-01-05 14:00"), 60)
+
+    assert store.update(first.id, reminded=True)
+    assert store.delete([second.id]) == 1
+    assert not store.update(second.id, title="gone")
+
+    reopened = MeetingStore(str(tmp_path / "meetings.db"))
+    assert reopened.all() == [first.with_changes(reminded=True)]
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "meetings.json"
+    legacy.write_text(json.dumps([
+        {"title": "Planning", "start": "2030-02-01 10:00", "duration": 30, "reminded": False},
+        {"title": "1:1", "start": "2030-01-31 16:00", "duration": 30, "reminded": True},
+    ]))
+    store = MeetingStore(str(tmp_path / "meetings.db"))
+
+    assert store.import_json(str(legacy)) == 2
+    assert not legacy.exists() and (tmp_path / "meetings.json.imported").exists()
+    assert [m.title for m in store.all()] == ["1:1", "Planning"]
+    assert store.import_json(str(legacy)) == 0
+
+
+def test_occurrence_override_updates_series_in_one_transaction(tmp_path):
+    store = MeetingStore(str(tmp_path / "meetings.db"))
+    series = store.insert("Standup", _ts("2030-01-07 09:00"), 15, rrule="FREQ=WEEKLY")
+    moved = _ts("2030-01-14 09:00")
+
+    override = store.add_override(series.id, moved, {moved}, "Standup", _ts("2030-01-14 11:00"), 15)
+
+    rows = {m.id: m for m in MeetingStore(str(tmp_path / "meetings.db")).all()}
+    assert rows[series.id].exdates == {moved}
+    assert rows[override.id].recurrence_id == moved
+    assert rows[override.id].to_dict()["recurrence_id"] == "2030-01-14 09:00"
+    assert rows[override.id].rrule is None
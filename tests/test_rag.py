@@ -1,7 +1,7 @@
 
 import os
 import sys
-from rag.rag_pipeline import rag_pipeline
+from app.rag.collection_manager import collection_manager
 
 def test_rag():
     print("--- Testing RAG System ---")
@@ -14,12 +14,12 @@ def test_rag():
 
     # 2. Ingest Document
     print("Ingesting document...")
-    rag_pipeline.ingest_documents([test_file])
+    collection_manager.ingest_documents([test_file])
 
     # 3. Ask Question
     query = "What is the secret code for the vault?"
     print(f"Query: {query}")
-    answer = rag_pipeline.answer_from_docs(query)
+    answer = collection_manager.answer(query)
     print(f"Answer: {answer}")
 
     # 4. Verify Answer
@@ -0,0 +1,50 @@
+import os
+from app.rag.manifest import IngestManifest, file_sha256
+
+
+def test_manifest_roundtrip(tmp_path):
+    doc = tmp_path / "notes.txt"
+    doc.write_text("Invoice INV-2041 is due on Friday.")
+    stat = os.stat(doc)
+
+    manifest = IngestManifest(str(tmp_path / "index"))
+    assert manifest.get(str(doc)) is None
+
+    manifest.record(str(doc), stat, file_sha256(str(doc)), ["a", "b"])
+    manifest.save()
+
+    reloaded = IngestManifest(str(tmp_path / "index"))
+    assert reloaded.is_unchanged(str(doc), stat)
+    assert reloaded.get(str(doc))["chunk_ids"] == ["a", "b"]
+    assert reloaded.files_under(str(tmp_path)) == [os.path.abspath(doc)]
+
+
+def test_manifest_detects_changes(tmp_path):
+    doc = tmp_path / "notes.txt"
+    doc.write_text("v1")
+    manifest = IngestManifest(str(tmp_path / "index"))
+    manifest.record(str(doc), os.stat(doc), file_sha256(str(doc)), ["a"])
+
+    doc.write_text("version two")
+    assert not manifest.is_unchanged(str(doc), os.stat(doc))
+    assert manifest.remove(str(doc)) == ["a"]
+    assert manifest.get(str(doc)) is None
+
+
+def test_chunk_ids_are_stable_per_source_and_position(tmp_path):
+    from app.rag.manifest import chunk_id_for
+
+    path = str(tmp_path / "policy.txt")
+    assert chunk_id_for(path, 0) == chunk_id_for(path, 0)
+    assert chunk_id_for(path, 0) != chunk_id_for(path, 1)
+    assert chunk_id_for(path, 0) != chunk_id_for(str(tmp_path / "other.txt"), 0)
+
+
+def test_manifest_tracks_chunk_settings(tmp_path):
+    doc = tmp_path / "notes.txt"
+    doc.write_text("v1")
+    manifest = IngestManifest(str(tmp_path / "index"))
+    manifest.record(str(doc), os.stat(doc), file_sha256(str(doc)), ["a"], (1000, 200))
+
+    assert manifest.same_chunking(str(doc), (1000, 200))
+    assert not manifest.same_chunking(str(doc), (500, 50))
@@ -0,0 +1,184 @@
+import os
+import zlib
+
+import numpy as np
+import pytest
+
+from app.config import Config
+from app.rag.embedding_cache import CachedEmbeddings
+from app.rag.manifest import chunk_id_for
+from app.rag.rag_pipeline import RAGPipeline
+
+# Each paragraph becomes one chunk with RAG_CHUNK_SIZE=100.
+PARAGRAPHS = [
+    "Invoice INV-2041 from Acme Corp is due on Friday the twelfth.",
+    "The quarterly budget review moved to the large meeting room.",
+    "Server room access codes rotate every month for security.",
+    "The team offsite is planned for the mountains in September.",
+]
+
+
+class FakeModel:
+    """Deterministic stand-in for HuggingFaceEmbeddings: hashed bag of words."""
+    def _vector(self, text):
+        vector = np.zeros(32, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode("utf-8")) % 32] += 1.0
+        return (vector / max(np.linalg.norm(vector), 1e-9)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+@pytest.fixture
+def make_pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "RAG_CHUNK_SIZE", 100)
+    monkeypatch.setattr(Config, "RAG_CHUNK_OVERLAP", 0)
+    monkeypatch.setattr(Config, "RAG_INGEST_WORKERS", 1)
+    monkeypatch.setattr(Config, "RAG_DEDUP_MODE", "off")
+    monkeypatch.setattr(Config, "RAG_MAX_SEGMENTS", 100)  # no background merges mid-test
+    monkeypatch.setattr(Config, "RAG_SEGMENT_MAX_DELETED", 1.0)
+    monkeypatch.setattr(Config, "PARSED_TEXT_CACHE_DIR", str(tmp_path / "parsed"))
+    opened = []
+
+    def make():
+        embeddings = CachedEmbeddings("fake-model", str(tmp_path / "embeddings"))
+        embeddings._model = FakeModel()
+        pipeline = RAGPipeline(str(tmp_path / "index"), embeddings=embeddings, llm=object())
+        opened.append(pipeline)
+        return pipeline
+
+    yield make
+    for pipeline in opened:
+        pipeline.close()
+
+
+def _write(path, paragraphs):
+    path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+    return str(path)
+
+
+def test_ingest_skips_unchanged_replaces_modified_and_drops_removed_files(make_pipeline, tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    a = _write(docs / "a.txt", PARAGRAPHS[:2])
+    b = _write(docs / "b.txt", PARAGRAPHS[2:3])
+    pipeline = make_pipeline()
+
+    report = pipeline.sync_directory(str(docs))
+    assert (report.files_total, report.files_skipped, report.chunks_embedded) == (2, 0, 3)
+    assert len(pipeline.vector_store) == 3
+    assert set(pipeline.manifest.entries) == {os.path.abspath(a), os.path.abspath(b)}
+    version = pipeline.index_version
+
+    # Same size and mtime: skipped without hashing; no new version is published.
+    report = pipeline.sync_directory(str(docs))
+    assert (report.files_skipped, report.chunks_embedded) == (2, 0)
+    assert pipeline.index_version == version
+
+    # Touched but identical: the sha256 matches, so only size/mtime are refreshed.
+    mtime = os.stat(a).st_mtime + 10
+    os.utime(a, (mtime, mtime))
+    report = pipeline.ingest_documents([a])
+    assert (report.files_skipped, report.chunks_embedded) == (1, 0)
+    assert pipeline.manifest.get(a)["mtime"] == mtime
+    assert len(pipeline.vector_store) == 3
+
+    # Modified: the file's chunks are replaced, the other file is skipped.
+    _write(docs / "a.txt", PARAGRAPHS[3:4])
+    report = pipeline.sync_directory(str(docs))
+    assert (report.files_skipped, report.chunks_embedded) == (1, 1)
+    assert pipeline.manifest.get(a)["chunk_ids"] == [chunk_id_for(a, 0)]
+    assert pipeline.vector_store.get(chunk_id_for(a, 1)) is None
+    assert pipeline.vector_store.get(chunk_id_for(a, 0)).page_content == PARAGRAPHS[3]
+    assert len(pipeline.vector_store) == 2
+
+    # Removed from the directory: its manifest entry and chunks are dropped.
+    os.remove(b)
+    pipeline.sync_directory(str(docs))
+    assert list(pipeline.manifest.entries) == [os.path.abspath(a)]
+    assert pipeline.vector_store.get(chunk_id_for(b, 0)) is None
+    assert len(pipeline.vector_store) == 1
+
+
+def test_upsert_replaces_a_changed_files_chunks(make_pipeline, tmp_path):
+    doc = _write(tmp_path / "notes.txt", PARAGRAPHS[:2])
+    pipeline = make_pipeline()
+
+    assert pipeline.upsert_document(doc).chunks_embedded == 2
+    assert [c for c, _ in pipeline.bm25.search("INV-2041")] == [chunk_id_for(doc, 0)]
+
+    _write(tmp_path / "notes.txt", PARAGRAPHS[2:3])
+    assert pipeline.upsert_document(doc).chunks_embedded == 1
+
+    assert len(pipeline.vector_store) == 1
+    assert pipeline.bm25.search("INV-2041") == []
+    assert pipeline.retrieve("server room access codes", k=1)[0].page_content == PARAGRAPHS[2]
+
+
+def test_delete_removes_vectors_and_bm25_postings(make_pipeline, tmp_path):
+    keep = _write(tmp_path / "keep.txt", PARAGRAPHS[1:2])
+    doc = _write(tmp_path / "invoice.txt", PARAGRAPHS[:1])
+    pipeline = make_pipeline()
+    pipeline.ingest_documents([keep, doc])
+
+    assert pipeline.delete_document(doc)
+
+    assert pipeline.manifest.get(doc) is None
+    assert pipeline.vector_store.get(chunk_id_for(doc, 0)) is None
+    assert chunk_id_for(doc, 0) not in pipeline.bm25
+    assert pipeline.bm25.search("INV-2041 Acme") == []
+    assert [d.page_content for d in pipeline.retrieve("invoice INV-2041", k=4)] == [PARAGRAPHS[1]]
+    assert not pipeline.delete_document(doc)
+
+
+def test_index_state_survives_a_reopen(make_pipeline, tmp_path):
+    first = _write(tmp_path / "a.txt", PARAGRAPHS[:2])
+    second = _write(tmp_path / "b.txt", PARAGRAPHS[2:])
+    pipeline = make_pipeline()
+    pipeline.ingest_documents([first, second])
+    pipeline.delete_document(second)
+    pipeline.rebuild_index()  # merges the segments into one
+    expected = [d.page_content for d in pipeline.retrieve("quarterly budget review", k=2)]
+
+    reopened = make_pipeline()
+
+    assert reopened.index_version == pipeline.index_version
+    assert len(reopened.vector_store) == 2 and len(reopened.vector_store.segments) == 1
+    assert reopened.manifest.entries == pipeline.manifest.entries
+    assert [c for c, _ in reopened.bm25.search("INV-2041")] == [chunk_id_for(first, 0)]
+    assert reopened.bm25.search("offsite mountains") == []
+    assert [d.page_content for d in reopened.retrieve("quarterly budget review", k=2)] == expected
+    assert reopened.ingest_documents([first]).files_skipped == 1
+
+
+def test_reindex_resplits_from_the_parsed_text_cache(make_pipeline, tmp_path, monkeypatch):
+    doc = _write(tmp_path / "notes.txt", PARAGRAPHS)
+    pipeline = make_pipeline()
+    pipeline.ingest_documents([doc])
+    assert len(pipeline.vector_store) == 4
+
+    monkeypatch.setattr(Config, "RAG_CHUNK_SIZE", 1000)
+    report = pipeline.reindex()
+
+    assert (report.files_from_text_cache, report.chunks_embedded) == (1, 1)
+    assert len(pipeline.vector_store) == 1
+    assert pipeline.manifest.get(doc)["chunking"] == [1000, 0]
+
+
+def test_a_file_that_fails_to_parse_is_reported_without_aborting_the_batch(make_pipeline, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "RAG_INGEST_WORKERS", 2)  # spawned worker processes
+    good = _write(tmp_path / "good.txt", PARAGRAPHS[:2])
+    bad = tmp_path / "bad.txt"
+    bad.write_bytes(b"\xff\xfe not utf-8 \xc3\x28")
+    pipeline = make_pipeline()
+
+    report = pipeline.ingest_documents([str(bad), good])
+
+    assert (report.files_total, report.files_done, report.files_failed) == (2, 2, 1)
+    assert len(report.errors) == 1 and report.errors[0].startswith(str(bad))
+    assert report.chunks_embedded == 2 and len(pipeline.vector_store) == 2
+    assert pipeline.manifest.get(str(bad)) is None and pipeline.manifest.get(good) is not None
@@ -0,0 +1,38 @@
+from app.services import recurrence
+from app.services.meeting import Meeting, format_local, parse_local
+
+
+def _ts(value):
+    return parse_local(value).timestamp()
+
+
+def _series(**fields):
+    return Meeting(id=7, title="Standup", start_ts=_ts("2030-01-07 09:00"), duration=30,
+                   rrule="FREQ=WEEKLY;BYDAY=MO", **fields)
+
+
+def test_only_the_queried_window_is_expanded():
+    found = recurrence.occurrences(_series(), _ts("2030-01-14 09:15"), _ts("2030-01-28 09:00"))
+
+    # The 14th is still running at 09:15; the 28th starts exactly at the window end.
+    assert [format_local(ts) for ts in found] == ["2030-01-14 09:00", "2030-01-21 09:00"]
+
+
+def test_exception_dates_are_skipped():
+    series = _series(exdates=frozenset({_ts("2030-01-14 09:00")}))
+
+    assert format_local(recurrence.next_occurrence(series, _ts("2030-01-07 09:00"))) == "2030-01-21 09:00"
+    views = recurrence.expand([series], _ts("2030-01-07 00:00"), _ts("2030-01-22 00:00"))
+    assert [v.start for v in views] == ["2030-01-07 09:00", "2030-01-21 09:00"]
+    assert all(v.series_id == 7 for v in views)
+
+
+def test_invalid_rules_are_rejected():
+    start = _ts("2030-01-07 09:00")
+    assert recurrence.validate_rule("RRULE:FREQ=DAILY;COUNT=3", start) == "FREQ=DAILY;COUNT=3"
+    try:
+        recurrence.validate_rule("FREQ=SOMETIMES", start)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("invalid rule accepted")
@@ -0,0 +1,70 @@
+import time
+import threading
+
+from app.services.meeting import Meeting
+from app.services.reminder_service import ReminderService
+
+
+class FakeScheduler:
+    def __init__(self, meetings):
+        self.meetings = {m.id: m for m in meetings}
+        self.reminded = threading.Event()
+
+    def get_meeting(self, meeting_id):
+        return self.meetings.get(meeting_id)
+
+    def set_reminded(self, meeting, reminded=True):
+        self.meetings[meeting.id] = meeting.with_changes(reminded=reminded)
+        self.reminded.set()
+
+
+def _meeting(meeting_id, minutes_from_now):
+    return Meeting(id=meeting_id, title=f"m{meeting_id}", start_ts=time.time() + minutes_from_now * 60)
+
+
+def test_due_reminder_fires_and_cancelled_one_does_not(monkeypatch):
+    scheduler = FakeScheduler([_meeting(1, 2), _meeting(2, 3), _meeting(3, 24 * 60)])
+    service = ReminderService(scheduler)
+    service.offset_minutes = 5
+    fired = []
+    monkeypatch.setattr(service, "_trigger_reminder", lambda m: fired.append(m.id) or True)
+
+    for meeting in scheduler.meetings.values():
+        service.schedule(meeting)
+    service.start()
+    service.cancel(2)
+    assert scheduler.reminded.wait(5)
+    time.sleep(0.2)
+    service.stop()
+
+    assert fired == [1]
+    assert [m.reminded for m in scheduler.meetings.values()] == [True, False, False]
+
+
+def test_rescheduling_replaces_the_pending_reminder():
+    service = ReminderService(FakeScheduler([]))
+    meeting = _meeting(1, 60)
+
+    service.schedule(meeting)
+    first_due = service._due[1]
+    service.schedule(meeting.with_changes(start_ts=meeting.start_ts + 3600))
+
+    assert service._due[1] == first_due + 3600
+    service.schedule(meeting.with_changes(reminded=True))
+    assert 1 not in service._due
+
+
+def test_meeting_moved_later_after_pop_is_requeued_not_reminded(monkeypatch):
+    meeting = _meeting(1, 2)
+    scheduler = FakeScheduler([meeting])
+    service = ReminderService(scheduler)
+    service.offset_minutes = 5
+    fired = []
+    monkeypatch.setattr(service, "_trigger_reminder", lambda m: fired.append(m.id) or True)
+
+    # The entry was due and popped, but the meeting moved an hour later meanwhile.
+    scheduler.meetings[1] = meeting.with_changes(start_ts=meeting.start_ts + 3600)
+    service._dispatch(1)
+
+    assert fired == [] and not scheduler.meetings[1].reminded
+    assert service._due[1] == scheduler.meetings[1].start_ts - 5 * 60
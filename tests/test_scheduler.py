@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app import scheduler as scheduler_module
+from app.config import Config
+from app.scheduler import MeetingScheduler
+from app.services import recurrence
+from app.services.meeting import parse_local
+from app.services.meeting_store import MeetingStore
+
+
+def _ts(value):
+    return parse_local(value).timestamp()
+
+
+@pytest.fixture
+def make_scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SCHEDULER_JOBS_DB_URL", f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setattr(scheduler_module, "MEETINGS_FILE", str(tmp_path / "meetings.json"))
+    # Background threads are not started: reminders are only queued.
+    return lambda: MeetingScheduler(MeetingStore(str(tmp_path / "meetings.db")))
+
+
+def test_unranged_listing_includes_the_next_occurrence_of_each_series(make_scheduler):
+    scheduler = make_scheduler()
+    assert scheduler.add_meeting("Review", "2030-01-08 14:00", 60).startswith("✅")
+    assert scheduler.add_meeting("Standup", "2030-01-07 09:00", 15, rrule="FREQ=DAILY;COUNT=5").startswith("✅")
+    assert scheduler.add_meeting("Retro", "2030-01-09 16:00", 30).startswith("✅")
+
+    meetings, cursor, _ = scheduler.page()
+    assert [(m.title, m.start) for m in meetings] == [
+        ("Standup", "2030-01-07 09:00"),
+        ("Review", "2030-01-08 14:00"),
+        ("Retro", "2030-01-09 16:00"),
+    ]
+    assert meetings[0].series_id is not None and cursor is None
+
+    # Paging walks both the one-offs and the series occurrences.
+    first, cursor, _ = scheduler.page(limit=2)
+    rest, last_cursor, _ = scheduler.page(after=cursor, limit=2)
+    assert first + rest == meetings and last_cursor is None
+
+
+def test_listing_etag_changes_when_the_clock_passes_an_occurrence(make_scheduler, monkeypatch):
+    scheduler = make_scheduler()
+    scheduler.add_meeting("Standup", "2030-01-07 09:00", 15, rrule="FREQ=DAILY;COUNT=5")
+    assert scheduler.occurrence_boundary() == _ts("2030-01-07 09:00")
+    before = scheduler.etag_for(scheduler.version, "text", scheduler.occurrence_boundary())
+
+    monkeypatch.setattr(scheduler_module.time, "time", lambda: _ts("2030-01-07 09:30"))
+    assert scheduler.occurrence_boundary() == _ts("2030-01-08 09:00")
+    assert scheduler.etag_for(scheduler.version, "text", scheduler.occurrence_boundary()) != before
+    assert scheduler.page()[0][0].start == "2030-01-08 09:00"
+
+
+def test_rescheduled_occurrence_moves_and_is_counted_once(make_scheduler):
+    scheduler = make_scheduler()
+    scheduler.add_meeting("Standup", "2030-01-07 09:00", 30, rrule="FREQ=DAILY;COUNT=3")
+    series_id = next(iter(scheduler.series))
+
+    # Moved by 15 minutes: it overlaps only its own original slot, which is not a conflict.
+    result = scheduler.reschedule_occurrence(series_id, "2030-01-08 09:00", "2030-01-08 09:15")
+    assert result.startswith("✅"), result
+
+    series = scheduler.series[series_id]
+    assert recurrence.occurrences(series, _ts("2030-01-07 00:00"), _ts("2030-01-10 00:00")) == [
+        _ts("2030-01-07 09:00"), _ts("2030-01-09 09:00"),
+    ]
+    day = scheduler.meetings_in_range(_ts("2030-01-08 00:00"), _ts("2030-01-09 00:00"))
+    assert [(m.start, m.series_id, m.recurrence_id) for m in day] == [
+        ("2030-01-08 09:15", series_id, _ts("2030-01-08 09:00")),
+    ]
+
+    # The original slot is free; only the override blocks its new one.
+    assert not scheduler.check_conflicts(datetime(2030, 1, 8, 8, 30), 40)
+    assert scheduler.check_conflicts(datetime(2030, 1, 8, 9, 40), 10)
+    # The override can be moved again within its own slot (by its list index).
+    assert scheduler.update_meeting(1, start_time_str="2030-01-08 09:30").startswith("✅")
+    assert [m.start for m in scheduler.meetings] == ["2030-01-08 09:30"]
+    # The cancelled original cannot be rescheduled a second time.
+    assert scheduler.reschedule_occurrence(series_id, "2030-01-08 09:00", "2030-01-08 10:00").startswith("❌")
+
+
+def test_meetings_imported_from_legacy_json_get_persisted_reminder_jobs(make_scheduler, tmp_path):
+    (tmp_path / "meetings.json").write_text(json.dumps([
+        {"id": 1, "title": "Planning", "start": "2030-02-01 10:00", "duration": 30, "reminded": False},
+        {"id": 2, "title": "1:1", "start": "2030-01-31 16:00", "duration": 30, "reminded": True},
+        {"id": 3, "title": "Old", "start": "2020-01-31 16:00", "duration": 30, "reminded": False},
+    ]))
+    scheduler = make_scheduler()
+    scheduler.scheduler.start(paused=True)  # pending jobs are written to the job store
+    try:
+        jobs = {job.id for job in scheduler.scheduler.get_jobs(jobstore=scheduler_module.PERSISTENT_JOBSTORE)}
+    finally:
+        scheduler.scheduler.shutdown(wait=False)
+
+    # Only the upcoming, not yet reminded meeting needs one.
+    assert jobs == {"meeting_reminder_1"}
+    # A restart does not import (or schedule) anything again.
+    assert not (tmp_path / "meetings.json").exists()
+    assert len(make_scheduler().meetings) == 3
@@ -0,0 +1,89 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from app.rag.segments import SegmentedIndex
+from app.rag.vector_index import IndexSpec
+
+DIM = 8
+
+
+def _chunks(prefix, count, offset):
+    ids = [f"{prefix}{i}" for i in range(count)]
+    docs = [Document(page_content=f"{prefix} chunk {i}", metadata={"chunk_id": c}) for i, c in enumerate(ids)]
+    vectors = np.eye(DIM, dtype=np.float32)[[(offset + i) % DIM for i in range(count)]] * (1 + offset)
+    return docs, vectors, ids
+
+
+def _embed(texts):
+    # Deterministic stand-in for the embedding cache used by merges.
+    return [np.eye(DIM, dtype=np.float32)[int(t.rsplit(" ", 1)[1]) % DIM] for t in texts]
+
+
+def test_each_save_writes_one_segment(tmp_path):
+    index = SegmentedIndex(str(tmp_path / "segments"), IndexSpec(), mmap=False)
+    index.add(*_chunks("a", 3, 0))
+    index.save(str(tmp_path / "v1"))
+    index.add(*_chunks("b", 2, 3))
+    index.save(str(tmp_path / "v2"))
+
+    assert [s.name for s in index.segments] == ["seg-00000001", "seg-00000002"]
+    reloaded = SegmentedIndex.load(str(tmp_path / "segments"), str(tmp_path / "v2"), IndexSpec(), mmap=False)
+    assert len(reloaded) == 5 and len(reloaded.lexical) == 5
+
+
+def test_upsert_and_delete_hide_old_copies(tmp_path):
+    index = SegmentedIndex(str(tmp_path / "segments"), IndexSpec(), mmap=False)
+    docs, vectors, ids = _chunks("a", 3, 0)
+    index.add(docs, vectors, ids)
+    index.save(str(tmp_path / "v1"))
+
+    index.add([Document(page_content="a updated", metadata={"chunk_id": "a0"})], vectors[:1], ["a0"])
+    assert index.delete(["a1"]) == 1
+
+    assert len(index) == 2
+    assert index.get("a0").page_content == "a updated"
+    hits = [doc.metadata["chunk_id"] for doc, _ in index.search(vectors[0], k=3)]
+    assert hits.count("a0") == 1 and "a1" not in hits
+
+
+def test_merge_keeps_deletes_made_during_merge(tmp_path):
+    spec = IndexSpec(max_segments=1)
+    index = SegmentedIndex(str(tmp_path / "segments"), spec, mmap=False)
+    for n, prefix in enumerate("abc"):
+        index.add(*_chunks(prefix, 2, n * 2))
+        index.save(str(tmp_path / f"v{n}"))
+
+    names = index.plan_merge()
+    merged, seen = index.build_merged(names, _embed)
+    index.delete(["a0"])  # arrives while the merge was building
+    assert index.commit_merge(merged, seen)
+
+    assert len(index.segments) == 1
+    assert len(index) == 5 and index.get("a0") is None
+
+
+def test_clones_share_segment_postings_and_hide_deletes_from_bm25(tmp_path):
+    index = SegmentedIndex(str(tmp_path / "segments"), IndexSpec(), mmap=False)
+    index.add(*_chunks("a", 3, 0))
+    index.save(str(tmp_path / "v1"))
+
+    clone = index.copy()
+    clone.delete(["a1"])
+    clone.add([Document(page_content="invoice INV-2041", metadata={"chunk_id": "b0"})], np.eye(DIM, dtype=np.float32)[:1], ["b0"])
+
+    assert clone.segments[0].bm25 is index.segments[0].bm25  # written postings are not copied
+    assert [c for c, _ in clone.lexical.search("chunk 1", k=5)].count("a1") == 0
+    assert clone.lexical.search("INV-2041", k=1)[0][0] == "b0"
+    # The original is untouched.
+    assert "a1" in index.lexical and "b0" not in index.lexical
+
+
+def test_flat_segments_count_their_vectors_as_resident(tmp_path):
+    # FAISS maps only IVF lists; a flat index read with the mmap flag still lives in RAM.
+    index = SegmentedIndex(str(tmp_path / "segments"), IndexSpec(), mmap=True)
+    index.add(*_chunks("a", 3, 0))
+    index.save(str(tmp_path / "v1"))
+
+    store = index.segments[0].store
+    assert not store.mmapped
+    assert store.memory_bytes() >= 3 * DIM * 4
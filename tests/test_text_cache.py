@@ -0,0 +1,17 @@
+from langchain_core.documents import Document
+
+from app.rag.text_cache import ParsedTextCache
+
+
+def test_pages_roundtrip_with_current_source(tmp_path):
+    cache = ParsedTextCache(str(tmp_path))
+    pages = [
+        Document(page_content="Page one", metadata={"source": "/old/policy.pdf", "page": 0}),
+        Document(page_content="Page two", metadata={"source": "/old/policy.pdf", "page": 1}),
+    ]
+    cache.put("ab" * 32, "/old/policy.pdf", pages)
+
+    cached = cache.get("ab" * 32, "/new/policy.pdf")
+    assert [d.page_content for d in cached] == ["Page one", "Page two"]
+    assert cached[1].metadata == {"source": "/new/policy.pdf", "page": 1}
+    assert cache.get("cd" * 32, "/new/policy.pdf") is None